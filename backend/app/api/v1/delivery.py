@@ -2,7 +2,7 @@
 Newsletter delivery endpoints
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header, Response
 from typing import Optional
 from pydantic import BaseModel, EmailStr
 
@@ -97,16 +97,28 @@ async def cancel_scheduled_delivery(job_id: str, user_id: str):
 
 @router.get("/delivery/history")
 async def get_delivery_history(
+    response: Response,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     jwt_token: str = Depends(get_jwt_token)
 ):
-    """Get delivery history for a user"""
+    """
+    Get delivery history for a user, most recently sent first
+    
+    Takes the same `fields` and `cursor` as `/generation/drafts`; the next
+    page's cursor is in the `X-Next-Cursor` header.
+    """
     try:
         delivery_service = DeliveryService(jwt_token=jwt_token)
-        history = await delivery_service.get_delivery_history(user_id, limit)
+        history, next_cursor = await delivery_service.get_delivery_history(user_id, limit, cursor, fields)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return {"delivery_history": history}
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get delivery history: {str(e)}")
 
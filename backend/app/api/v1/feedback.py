@@ -4,6 +4,7 @@ Feedback endpoints for newsletter improvement
 
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
+import logging
 
 from app.models.schemas import (
     FeedbackCreate,
@@ -13,6 +14,7 @@ from app.core.feedback import FeedbackService
 from app.api.v1.auth import get_current_user_id, get_jwt_token
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/feedback", response_model=Feedback)
 async def submit_feedback(
@@ -29,8 +31,13 @@ async def submit_feedback(
         # Create feedback record
         new_feedback = await feedback_service.create_feedback(feedback, user_id)
         
-        # Process feedback for learning (background task)
-        await feedback_service.process_feedback_for_learning(feedback.draft_id)
+        # Update the user's trend weights from this and any pending reactions
+        # (email ones included); a failure here is caught up later by
+        # /feedback/learn, so it must not fail the submission
+        try:
+            await feedback_service.trigger_learning_process(user_id)
+        except Exception as e:
+            logger.warning(f"Deferred learning from feedback {new_feedback.id}: {e}")
         
         return new_feedback
         
@@ -78,6 +85,10 @@ async def submit_public_feedback(
         if not response.data:
             raise ValueError("Failed to create feedback")
         
+        # No learning here: link scanners and prefetchers hit this URL too.
+        # The owner's next learning pass applies the draft's latest email
+        # reaction, once.
+        
         # Return HTML page for better user experience
         html_response = f"""
         <!DOCTYPE html>
@@ -2,19 +2,29 @@
 Newsletter generation endpoints
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
+import logging
 
 from app.models.schemas import (
     GenerationRequest,
     GenerationResponse,
+    SectionRegenerateRequest,
     Draft,
-    DraftCreate
+    DraftCreate,
+    DraftSummary
 )
 from app.core.generation import GenerationService
+from app.core.generation.llm_cache import llm_cache
+from app.core.generation.jobs import generation_jobs
+from app.core.generation.llm_client import get_llm_client
+from app.core.generation.templates import NewsletterTemplate
 from app.api.v1.auth import get_current_user_id, get_jwt_token
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/generation/newsletter")
 async def generate_newsletter(
@@ -26,43 +36,144 @@ async def generate_newsletter(
     Generate AI-powered newsletter from trending content
     """
     try:
+        params = {
+            "title": request.custom_prompt if request.custom_prompt else None,
+            "num_items": len(request.trending_items) if request.trending_items else 5,
+            "time_window_hours": 48,
+            "topics": request.topics or None,
+            "bypass_cache": request.bypass_cache,
+            "parallel_sections": request.parallel_sections,
+            # Pinned item IDs are used as-is, in order, instead of ranking
+            "item_ids": request.trending_items or None
+        }
+        
+        if request.background:
+            # Runs on the worker pool, outliving this request; poll
+            # /generation/status/{job_id} for progress
+            job = await generation_jobs.submit(user_id, jwt_token, params)
+            return {"job_id": job.id, "status": job.status}
+        
         generation_service = GenerationService(jwt_token)
+        result = await generation_service.generate_newsletter(user_id=user_id, **params)
+        
+        return result
         
-        # Generate newsletter synchronously (it's fast enough)
-        result = await generation_service.generate_newsletter(
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate newsletter: {str(e)}")
+
+@router.post("/generation/estimate")
+async def estimate_generation(
+    request: GenerationRequest,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
+    """
+    Dry-run a generation: token count and cost of the prompt it would send.
+    No credits are used and the model is not called.
+    """
+    try:
+        generation_service = GenerationService(jwt_token)
+        return await generation_service.estimate_generation(
             user_id=user_id,
             title=request.custom_prompt if request.custom_prompt else None,
             num_items=len(request.trending_items) if request.trending_items else 5,
-            time_window_hours=48
+            time_window_hours=48,
+            topics=request.topics or None,
+            item_ids=request.trending_items or None
         )
         
-        return result
-        
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate newsletter: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to estimate generation: {str(e)}")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/generation/newsletter/stream")
+async def stream_newsletter(
+    request: GenerationRequest,
+    http_request: Request,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
+    """
+    Generate a newsletter, streaming the body over Server-Sent Events.
+    
+    Emits ``start``, then ``token`` events as text arrives, then ``done``
+    with the saved draft (same payload as /generation/newsletter), or
+    ``error``. Disconnecting cancels generation; nothing is saved.
+    """
+    generation_service = GenerationService(jwt_token)
+    
+    async def event_stream():
+        events = generation_service.stream_newsletter(
+            user_id=user_id,
+            title=request.custom_prompt if request.custom_prompt else None,
+            num_items=len(request.trending_items) if request.trending_items else 5,
+            time_window_hours=48,
+            topics=request.topics or None,
+            bypass_cache=request.bypass_cache,
+            parallel_sections=request.parallel_sections,
+            item_ids=request.trending_items or None
+        )
+        try:
+            async for event in events:
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected, cancelling generation for user {user_id}")
+                    break
+                name = event.pop('event')
+                yield _sse(name, event)
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {e}")
+            yield _sse("error", {"detail": f"Failed to generate newsletter: {str(e)}"})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@router.get("/generation/drafts", response_model=List[Draft])
+@router.get("/generation/drafts", response_model=List[DraftSummary], response_model_exclude_unset=True)
 async def get_drafts(
-    limit: int = 20, 
+    response: Response,
+    limit: int = 20,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     jwt_token: str = Depends(get_jwt_token)
 ):
-    """Get user's newsletter drafts"""
+    """
+    Get user's newsletter drafts, newest first
+    
+    Rows have id, title, status and timestamps; add `fields` (comma-separated:
+    body_md, email_subject, generation_metadata, credits_used) for more. When
+    more drafts follow, the `X-Next-Cursor` header holds the `cursor` for the
+    next page.
+    """
     try:
         generation_service = GenerationService(jwt_token)
-        drafts = await generation_service.get_user_drafts(user_id, limit, status)
+        drafts, next_cursor = await generation_service.get_user_drafts(user_id, limit, status, cursor, fields)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return drafts
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get drafts: {str(e)}")
 
 @router.get("/generation/drafts/{draft_id}", response_model=Draft)
-async def get_draft(draft_id: str, user_id: str):
-    """Get a specific draft by ID"""
+async def get_draft(
+    draft_id: str,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
+    """Get a specific draft by ID, including its full body"""
     try:
-        generation_service = GenerationService()
-        draft = await generation_service.get_draft(draft_id, user_id)
+        generation_service = GenerationService(jwt_token)
+        draft = await generation_service.get_draft(user_id, draft_id)
         
         if not draft:
             raise HTTPException(status_code=404, detail="Draft not found")
@@ -71,6 +182,8 @@ async def get_draft(draft_id: str, user_id: str):
         
     except HTTPException:
         raise
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Draft not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get draft: {str(e)}")
 
@@ -101,23 +214,70 @@ async def delete_draft(
         raise HTTPException(status_code=500, detail=f"Failed to delete draft: {str(e)}")
 
 @router.post("/generation/regenerate/{draft_id}")
-async def regenerate_draft(draft_id: str, user_id: str):
-    """Regenerate a draft with current trending content"""
+async def regenerate_draft(
+    draft_id: str,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
+    """Regenerate a draft from the items it was written from"""
     try:
-        generation_service = GenerationService()
-        new_draft = await generation_service.regenerate_draft(draft_id, user_id)
+        generation_service = GenerationService(jwt_token)
+        new_draft = await generation_service.regenerate_draft(user_id, draft_id)
         return {"message": "Draft regenerated successfully", "draft": new_draft}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to regenerate draft: {str(e)}")
 
+@router.post("/generation/drafts/{draft_id}/sections/{section_id}/regenerate")
+async def regenerate_draft_section(
+    draft_id: str,
+    section_id: str,
+    request: SectionRegenerateRequest,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
+    """Regenerate one section of a draft (e.g. trends_to_watch), keeping the rest"""
+    section_ids = [section["id"] for section in NewsletterTemplate.get_standard_sections()]
+    if section_id not in section_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown section '{section_id}'. Expected one of: {', '.join(section_ids)}"
+        )
+    
+    try:
+        generation_service = GenerationService(jwt_token)
+        return await generation_service.regenerate_section(user_id, draft_id, section_id, request.feedback)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to regenerate section: {str(e)}")
+
+@router.get("/generation/cache/stats")
+async def get_llm_cache_stats():
+    """Get LLM cache, job queue and rate limiter counters"""
+    llm_client = get_llm_client()
+    return {
+        "llm_cache": llm_cache.stats(),
+        "generation_jobs": generation_jobs.stats(),
+        "llm_client": llm_client.stats() if llm_client else None
+    }
+
 @router.get("/generation/status/{job_id}")
-async def get_generation_status(job_id: str):
+async def get_generation_status(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id),
+    jwt_token: str = Depends(get_jwt_token)
+):
     """Get status of a newsletter generation job"""
     try:
-        generation_service = GenerationService()
-        status = await generation_service.get_generation_status(job_id)
+        generation_service = GenerationService(jwt_token)
+        status = await generation_service.get_generation_status(job_id, user_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Generation job not found")
         return status
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get generation status: {str(e)}")
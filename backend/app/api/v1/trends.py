@@ -12,6 +12,8 @@ from app.models.schemas import (
     Item
 )
 from app.core.trends import TrendService
+from app.core.trends.cache import trending_cache
+from app.core.trends.leaderboards import topic_leaderboards
 from app.api.v1.auth import get_current_user_id, get_jwt_token
 
 router = APIRouter()
@@ -32,13 +34,16 @@ async def analyze_trends(
         trending_items = await trend_service.get_trending_items(
             user_id=user_id,
             time_window_hours=request.time_window_hours,
-            limit=request.limit
+            limit=request.limit,
+            diversity=request.diversity,
+            topic=request.topic
         )
         
         # Calculate trend metadata
         analysis_metadata = await trend_service.get_analysis_metadata(
             user_id=user_id,
-            time_window_hours=request.time_window_hours
+            time_window_hours=request.time_window_hours,
+            topic=request.topic
         )
         
         return TrendAnalysisResponse(
@@ -74,11 +79,19 @@ async def recalculate_trends(user_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to recalculate trends: {str(e)}")
 
 @router.get("/trends/keywords")
-async def get_trending_keywords(user_id: str, limit: int = 10):
+async def get_trending_keywords(user_id: str, limit: int = 10, time_window_hours: int = 24):
     """Get trending keywords across user's content"""
     try:
         trend_service = TrendService()
-        keywords = await trend_service.get_trending_keywords(user_id, limit)
+        keywords = await trend_service.get_trending_keywords(user_id, limit, time_window_hours)
         return {"trending_keywords": keywords}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get trending keywords: {str(e)}")
+
+@router.get("/trends/cache/stats")
+async def get_trend_cache_stats():
+    """Get hit/miss counters for the trending results cache"""
+    return {
+        "trending_cache": trending_cache.stats(),
+        "topic_leaderboards": topic_leaderboards.stats()
+    }
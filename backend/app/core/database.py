@@ -2,9 +2,15 @@
 Database configuration and connection management
 """
 
+import asyncio
+import base64
+import binascii
+import json
 import os
+import uuid
+from datetime import datetime
 from supabase import create_client, Client
-from typing import Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,18 +19,33 @@ load_dotenv()
 # Supabase configuration
 SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
+SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
 # Global Supabase client (service account)
 supabase: Optional[Client] = None
 
-async def init_db():
-    """Initialize database connection"""
+# Service-role client for cross-user reads, created on first use
+service_supabase: Optional[Client] = None
+
+async def init_db(use_service_role: bool = False):
+    """
+    Initialize database connection.
+    
+    Batch jobs that work across all users pass ``use_service_role=True`` so
+    the shared client bypasses row level security.
+    """
     global supabase
     
-    if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+    key = SUPABASE_ANON_KEY
+    if use_service_role:
+        if not SUPABASE_SERVICE_ROLE_KEY:
+            raise ValueError("SUPABASE_SERVICE_ROLE_KEY must be provided for batch jobs")
+        key = SUPABASE_SERVICE_ROLE_KEY
+    
+    if not SUPABASE_URL or not key:
         raise ValueError("Supabase URL and Key must be provided")
     
-    supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    supabase = create_client(SUPABASE_URL, key)
     print("✅ Database connection initialized")
 
 def get_supabase() -> Client:
@@ -33,6 +54,13 @@ def get_supabase() -> Client:
         raise RuntimeError("Database not initialized. Call init_db() first.")
     return supabase
 
+def get_service_supabase() -> Optional[Client]:
+    """Client that bypasses row level security, or None without SUPABASE_SERVICE_ROLE_KEY"""
+    global service_supabase
+    if service_supabase is None and SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+        service_supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return service_supabase
+
 def get_user_supabase(jwt_token: str) -> Client:
     """Get Supabase client instance for authenticated user"""
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
@@ -48,6 +76,77 @@ def get_user_supabase(jwt_token: str) -> Client:
     
     return client
 
+async def run_query(query: Any) -> Any:
+    """
+    Execute a Supabase query builder without blocking the event loop.
+    
+    The client is synchronous; running ``execute()`` in a worker thread
+    lets independent queries awaited together actually overlap.
+    """
+    return await asyncio.to_thread(query.execute)
+
+# PostgREST / Postgres codes for calling a function that doesn't exist
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+# Draft lists return only what a list row shows; heavier fields on request
+DRAFT_LIST_COLUMNS = ["id", "user_id", "title", "status", "sent_at", "created_at", "updated_at"]
+DRAFT_EXPANDABLE_FIELDS = {
+    "body_md": "body_md",
+    "email_subject": "email_subject:generation_metadata->>email_subject",
+    "generation_metadata": "generation_metadata",
+    "credits_used": "credits_used"
+}
+
+def encode_cursor(row: Dict[str, Any], column: str) -> str:
+    """Opaque keyset cursor for the position just after ``row`` in ``(column, id)`` order"""
+    raw = json.dumps([row[column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """``(value, id)`` from :func:`encode_cursor`; raises ``ValueError`` for anything else"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        # Both end up inside a filter string, so only accept well-formed values
+        datetime.fromisoformat(value)
+        uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+def apply_keyset(query: Any, column: str, after: Optional[Tuple[str, str]] = None) -> Any:
+    """
+    Order ``query`` newest-first on ``(column, id)`` and, given ``after``,
+    keep only the rows strictly past it.
+    """
+    if after:
+        value, row_id = after
+        # postgrest-py 0.13 (pinned by supabase 2.0.2) has no or_() helper,
+        # so add the filter directly
+        query.params = query.params.add(
+            "or",
+            f'({column}.lt."{value}",and({column}.eq."{value}",id.lt.{row_id}))'
+        )
+    # One order param ("<column>.desc,id.desc"): PostgREST doesn't combine
+    # repeated order params into a compound sort
+    return query.order(f"{column}.desc,id", desc=True)
+
+def select_columns(columns: Iterable[str], expandable: Mapping[str, str], fields: Optional[str] = None) -> str:
+    """
+    Select list of ``columns`` plus the comma-separated ``fields`` asked
+    for, each mapped through ``expandable``; unknown fields raise ``ValueError``.
+    """
+    selected = list(columns)
+    for field in (fields or "").split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in expandable:
+            raise ValueError(f"Unknown field '{field}' (expandable: {', '.join(expandable)})")
+        if expandable[field] not in selected:
+            selected.append(expandable[field])
+    return ", ".join(selected)
+
 # Database table names
 class Tables:
     USERS = "users"
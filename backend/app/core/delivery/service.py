@@ -4,11 +4,14 @@ Email delivery service using Resend
 
 import os
 import resend
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import logging
 
-from app.core.database import get_supabase, get_user_supabase
+from app.core.database import (
+    get_supabase, get_user_supabase, run_query, apply_keyset, decode_cursor, encode_cursor, select_columns,
+    DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS
+)
 from .templates import get_newsletter_html_template, markdown_to_email_html
 
 logger = logging.getLogger(__name__)
@@ -136,16 +139,30 @@ class DeliveryService:
         # TODO: Implement with APScheduler or Celery
         pass
     
-    async def get_delivery_history(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get delivery history for a user"""
+    async def get_delivery_history(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get a page of sent drafts, most recently sent first, and the next page's cursor"""
+        columns = select_columns(DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS, fields)
+        limit = max(1, limit)
+        after = decode_cursor(cursor) if cursor else None
         try:
             # Get sent drafts
-            response = self.supabase.table("drafts").select("*").eq("user_id", user_id).eq("status", "sent").order("sent_at", desc=True).limit(limit).execute()
-            
-            return response.data
+            query = self.supabase.table("drafts").select(columns).eq("user_id", user_id).eq(
+                "status", "sent"
+            ).not_.is_("sent_at", "null")
+            response = await run_query(apply_keyset(query, "sent_at", after).limit(limit + 1))
+            
+            history = response.data[:limit]
+            next_cursor = encode_cursor(history[-1], "sent_at") if len(response.data) > limit else None
+            return history, next_cursor
         except Exception as e:
             logger.error(f"Failed to get delivery history: {str(e)}")
-            return []
+            return [], None
     
     async def send_test_email(self, user_id: str, email: str) -> Dict[str, Any]:
         """Send a test email to verify delivery settings"""
@@ -4,15 +4,29 @@ Feedback collection and analysis service
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.core.database import get_user_supabase
-from app.models.schemas import FeedbackCreate, Feedback
+from app.core.database import get_supabase, get_user_supabase
+from app.core.trends.service import TrendService, TREND_WEIGHTS
+from app.models.schemas import FeedbackCreate, Feedback, Item
 import logging
 
 logger = logging.getLogger(__name__)
 
+POSITIVE_REACTIONS = ("👍", "positive")
+NEGATIVE_REACTIONS = ("👎", "negative")
+
+# Oldest unlearned feedback rows replayed by trigger_learning_process
+LEARNING_BACKLOG_LIMIT = 100
+
+# A row that keeps failing to learn is given up on so it can't block the backlog
+MAX_LEARNING_ATTEMPTS = 3
+
 class FeedbackService:
-    def __init__(self, jwt_token: str):
-        self.supabase = get_user_supabase(jwt_token)
+    def __init__(self, jwt_token: str = None):
+        if jwt_token:
+            self.supabase = get_user_supabase(jwt_token)
+        else:
+            self.supabase = get_supabase()
+        self.trend_service = TrendService(jwt_token)
     
     async def create_feedback(self, feedback: FeedbackCreate, user_id: str) -> Feedback:
         """Create feedback record"""
@@ -43,10 +57,88 @@ class FeedbackService:
             logger.error(f"Error creating feedback: {e}")
             raise
     
-    async def process_feedback_for_learning(self, draft_id: str) -> None:
-        """Process feedback for learning and improvement"""
-        # Placeholder implementation for MVP
-        pass
+    async def process_feedback_for_learning(
+        self,
+        draft_id: str,
+        reaction: str,
+        user_id: str,
+        feedback_id: Optional[str] = None
+    ) -> Optional[Dict[str, float]]:
+        """
+        Update the user's trend weights from one reaction to a draft.
+        
+        Returns the new weights, or None if the reaction carries no signal
+        (such a row is marked skipped so it isn't replayed).
+        """
+        if reaction not in POSITIVE_REACTIONS + NEGATIVE_REACTIONS:
+            if feedback_id:
+                await self._mark_learned(feedback_id, "skipped")
+            return None
+        
+        try:
+            item_components = await self._draft_item_components(draft_id)
+            if not item_components:
+                if feedback_id:
+                    await self._mark_learned(feedback_id, "skipped")
+                return None
+            
+            state = await self.trend_service.learn_from_feedback(
+                user_id, item_components, liked=reaction in POSITIVE_REACTIONS
+            )
+            
+            if feedback_id:
+                await self._mark_learned(feedback_id)
+            return state["weights"]
+            
+        except Exception as e:
+            logger.error(f"Error processing feedback for learning: {e}")
+            raise
+    
+    async def _draft_item_components(self, draft_id: str) -> List[Dict[str, float]]:
+        """Score components of a draft's items, as they were when it was generated"""
+        draft_response = self.supabase.table("drafts").select(
+            "generation_metadata, created_at"
+        ).eq("id", draft_id).execute()
+        if not draft_response.data:
+            return []
+        draft = draft_response.data[0]
+        
+        items_response = self.supabase.table("draft_items").select(
+            "item_id, items!inner(*)"
+        ).eq("draft_id", draft_id).execute()
+        
+        snapshot = (draft.get("generation_metadata") or {}).get("score_components") or {}
+        generated_at = datetime.fromisoformat(draft["created_at"].replace('Z', '+00:00'))
+        
+        components = []
+        for row in items_response.data:
+            if row["item_id"] in snapshot:
+                components.append(snapshot[row["item_id"]])
+            else:
+                # Drafts from before snapshots were recorded: recompute,
+                # judging recency as of when the draft was generated
+                components.append(
+                    self.trend_service.score_components(Item(**row["items"]), as_of=generated_at)
+                )
+        return components
+    
+    async def _mark_learned(self, feedback_id: str, status: Any = True, **extra: Any) -> None:
+        """Set ``metadata.learned`` (True, or why the row was not learned from)"""
+        response = self.supabase.table("feedback").select("metadata").eq("id", feedback_id).execute()
+        metadata = (response.data[0].get("metadata") if response.data else None) or {}
+        changes = {**extra} if status is None else {**extra, "learned": status}
+        self.supabase.table("feedback").update({
+            "metadata": {**metadata, **changes}
+        }).eq("id", feedback_id).execute()
+    
+    async def _drafts_learned_from_email(self, draft_ids: List[str]) -> set:
+        """Drafts that already had an email reaction learned from"""
+        if not draft_ids:
+            return set()
+        response = self.supabase.table("feedback").select("draft_id").in_(
+            "draft_id", draft_ids
+        ).not_.is_("metadata->>source", "null").eq("metadata->>learned", "true").execute()
+        return {row["draft_id"] for row in response.data}
     
     async def get_draft_feedback(self, draft_id: str) -> List[Feedback]:
         """Get all feedback for a specific draft"""
@@ -152,9 +244,75 @@ class FeedbackService:
             raise
     
     async def trigger_learning_process(self, user_id: str) -> Dict[str, Any]:
-        """Trigger learning process from recent feedback"""
-        # Placeholder implementation for MVP
-        return {
-            "feedback_count": 0,
-            "improvements": []
-        }
+        """
+        Apply any feedback that was not learned from when it arrived.
+        
+        Each row is one incremental update, so this only catches up on
+        missed reactions; it never retrains from scratch. Reactions from
+        email links (``metadata.source``) count once per draft: only the
+        latest is learned, so link scanners and repeat clicks can't pile
+        up updates. A row that fails is retried on later runs, up to
+        ``MAX_LEARNING_ATTEMPTS``, without stopping the others.
+        """
+        try:
+            response = self.supabase.table("feedback").select(
+                "id, draft_id, reaction, metadata"
+            ).eq("user_id", user_id).is_("metadata->>learned", "null").order(
+                "created_at"
+            ).limit(LEARNING_BACKLOG_LIMIT).execute()
+            rows = response.data
+            
+            # Rows are oldest first, so the last one per draft wins
+            latest_email = {
+                row["draft_id"]: row["id"] for row in rows if (row.get("metadata") or {}).get("source")
+            }
+            already_learned = await self._drafts_learned_from_email(list(latest_email))
+            
+            processed = 0
+            failed = 0
+            weights = None
+            for row in rows:
+                metadata = row.get("metadata") or {}
+                if metadata.get("source") and (
+                    latest_email[row["draft_id"]] != row["id"] or row["draft_id"] in already_learned
+                ):
+                    await self._mark_learned(row["id"], "duplicate")
+                    continue
+                
+                try:
+                    result = await self.process_feedback_for_learning(
+                        row["draft_id"], row["reaction"], user_id, feedback_id=row["id"]
+                    )
+                except Exception as e:
+                    failed += 1
+                    attempts = int(metadata.get("learn_attempts") or 0) + 1
+                    logger.warning(f"Learning from feedback {row['id']} failed (attempt {attempts}): {e}")
+                    await self._mark_learned(
+                        row["id"],
+                        "failed" if attempts >= MAX_LEARNING_ATTEMPTS else None,
+                        learn_attempts=attempts
+                    )
+                    continue
+                if result is not None:
+                    processed += 1
+                    weights = result
+            
+            if weights is None:
+                weights = (await self.trend_service.load_trend_weights(user_id))["weights"]
+            
+            improvements = [
+                f"{name} weight {TREND_WEIGHTS[name]:.2f} -> {weight:.2f}"
+                for name, weight in weights.items()
+                if abs(weight - TREND_WEIGHTS.get(name, weight)) >= 0.01
+            ]
+            
+            return {
+                "feedback_count": processed,
+                "failed": failed,
+                "improvements": improvements,
+                "weights": weights
+            }
+            
+        except Exception as e:
+            logger.error(f"Error triggering learning process: {e}")
+            raise
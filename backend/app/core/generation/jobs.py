@@ -0,0 +1,183 @@
+"""
+In-process queue for background newsletter generation jobs
+"""
+
+import asyncio
+import os
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+@dataclass
+class GenerationJob:
+    id: str
+    user_id: str
+    jwt_token: Optional[str]
+    params: Dict[str, Any]
+    status: str = "queued"  # queued, running, completed, failed
+    stage: str = "queued"  # queued, preparing, writing, completed, failed
+    chunks: List[str] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def to_status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "partial_output": "".join(self.chunks),
+            "draft_id": (self.result or {}).get("draft_id"),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class GenerationJobQueue:
+    """
+    Runs generation jobs on a fixed pool of worker tasks.
+
+    At most ``workers`` jobs run at once overall and at most
+    ``per_user_limit`` per user; a worker skips past queued jobs of a user
+    who is at their cap. Jobs run independently of the request that
+    submitted them, so a client disconnect or proxy timeout doesn't cancel
+    them. State lives in this process: run a single API instance, or route
+    status polls to the instance that accepted the job.
+    """
+
+    def __init__(self, workers: int = 4, per_user_limit: int = 1, max_finished: int = 1000):
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        self._pending: List[GenerationJob] = []
+        self._running_per_user: Dict[str, int] = defaultdict(int)
+        self._condition: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._condition = asyncio.Condition()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"generation-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} generation workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, user_id: str, jwt_token: Optional[str], params: Dict[str, Any]) -> GenerationJob:
+        if self._condition is None:
+            raise RuntimeError("Generation job queue not started")
+
+        job = GenerationJob(id=str(uuid.uuid4()), user_id=user_id, jwt_token=jwt_token, params=params)
+        async with self._condition:
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._prune()
+            self._condition.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = defaultdict(int)
+        for job in self._jobs.values():
+            statuses[job.status] += 1
+        return {
+            "workers": self.workers,
+            "per_user_limit": self.per_user_limit,
+            "queued": len(self._pending),
+            "jobs": dict(statuses)
+        }
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs beyond the retention bound
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    async def _next_job(self) -> GenerationJob:
+        async with self._condition:
+            while True:
+                for index, job in enumerate(self._pending):
+                    if self._running_per_user[job.user_id] < self.per_user_limit:
+                        del self._pending[index]
+                        self._running_per_user[job.user_id] += 1
+                        return job
+                await self._condition.wait()
+
+    async def _release(self, job: GenerationJob) -> None:
+        async with self._condition:
+            self._running_per_user[job.user_id] -= 1
+            if not self._running_per_user[job.user_id]:
+                del self._running_per_user[job.user_id]
+            self._condition.notify_all()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._next_job()
+            try:
+                await self._run(job)
+            finally:
+                await self._release(job)
+
+    async def _run(self, job: GenerationJob) -> None:
+        from app.core.generation.service import GenerationService
+
+        job.status = "running"
+        job.stage = "preparing"
+        job.started_at = datetime.utcnow()
+        try:
+            service = GenerationService(job.jwt_token)
+            async for event in service.stream_newsletter(user_id=job.user_id, **job.params):
+                name = event.pop("event")
+                if name == "start":
+                    job.stage = "writing"
+                elif name == "token":
+                    job.chunks.append(event["text"])
+                elif name == "done":
+                    job.result = event
+
+            if job.result and job.result.get("success"):
+                job.status = job.stage = "completed"
+            else:
+                job.status = job.stage = "failed"
+                job.error = (job.result or {}).get("message") or "Generation did not produce a draft"
+
+        except asyncio.CancelledError:
+            job.status = job.stage = "failed"
+            job.error = "Generation was interrupted by a server shutdown"
+            raise
+        except Exception as e:
+            logger.error(f"Generation job {job.id} failed: {e}")
+            job.status = job.stage = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.jwt_token = None  # Don't hold credentials longer than needed
+
+
+generation_jobs = GenerationJobQueue(
+    workers=int(os.getenv("GENERATION_WORKERS", "4")),
+    per_user_limit=int(os.getenv("GENERATION_PER_USER_LIMIT", "1"))
+)
@@ -0,0 +1,162 @@
+"""
+Content-addressed cache of LLM completions
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def completion_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+    """SHA-256 of the request parameters that determine a completion"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of completion text keyed by ``completion_key``.
+
+    The memory tier is an LRU with TTL. The optional disk tier (one JSON
+    file per key under ``disk_dir``) survives restarts and is shared by
+    workers on the same host; disk hits are promoted to memory.
+    
+    Identical requests that arrive while the first is still in flight
+    wait for its result instead of making their own call (see ``lead``).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, disk_dir: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.bypasses = 0
+        self.stores = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        content = self._memory.get(key)
+        if content is not None or not self.disk_dir:
+            return content
+
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        remaining = entry.get("expires_at", 0) - time.time()
+        if remaining <= 0:
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self._memory.set(key, entry["content"], ttl_seconds=remaining)
+        return entry["content"]
+
+    def contains(self, key: str) -> bool:
+        """Whether ``key`` would hit, without touching the hit/miss counters"""
+        if self._memory.peek(key) is not None:
+            return True
+        if not self.disk_dir:
+            return False
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                return json.load(handle).get("expires_at", 0) > time.time()
+        except (OSError, ValueError):
+            return False
+
+    def set(self, key: str, content: str) -> None:
+        self._memory.set(key, content)
+        with self._lock:
+            self.stores += 1
+        if not self.disk_dir:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump({"expires_at": time.time() + self.ttl_seconds, "content": content}, handle)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {key}: {e}")
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        """The pending call for ``key``, if one is running; await it for the content"""
+        future = self._inflight.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+        return future
+
+    def lead(self, key: str) -> asyncio.Future:
+        """Register this caller as the one making the call for ``key``; ``finish`` must follow"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def finish(self, key: str, content: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        future = self._inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if isinstance(error, asyncio.CancelledError):
+            future.cancel()  # Waiters make their own call
+        elif error is not None:
+            future.set_exception(error)
+            future.exception()  # Waiters get the error; don't warn if there are none
+        else:
+            future.set_result(content)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self._memory.stats()
+        # A disk hit is also counted as a memory miss; report it as a hit
+        hits = memory["hits"] + self.disk_hits
+        misses = memory["misses"] - self.disk_hits
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "bypasses": self.bypasses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "stores": self.stores,
+            "memory_size": memory["size"],
+            "evictions": memory["evictions"],
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": bool(self.disk_dir)
+        }
+
+
+llm_cache = LLMResponseCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.getenv("LLM_CACHE_DIR") or None
+)
@@ -0,0 +1,251 @@
+"""
+Process-wide LLM client with rate limiting, queueing and retries
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+import logging
+
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError
+)
+
+from app.core.generation.providers import LLMProvider, build_provider
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class LLMQueueFullError(Exception):
+    """Raised when too many completions are already waiting for capacity"""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``capacity`` tokens, refilled continuously at
+    ``capacity / period_seconds``. ``acquire`` sleeps until enough tokens
+    are available; callers are expected to serialise acquisitions.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period_seconds
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        # A single request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return
+            await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + max(amount, 0))
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Rough upper bound on tokens a request consumes (~4 characters per token)"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + 4 * len(messages) + max_tokens
+
+
+def usage_summary(usage: Any) -> Optional[Dict[str, int]]:
+    """Prompt, cached-prompt and completion token counts from a response's ``usage``"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0
+    }
+
+
+class RateLimitedLLMClient:
+    """
+    Wraps one ``LLMProvider`` for the whole process.
+
+    Each call first waits (FIFO) for requests-per-minute and tokens-per-
+    minute budget. At most ``max_waiters`` calls may wait at once and none
+    longer than ``max_wait_seconds``, so a burst queues smoothly without
+    growing unbounded. 429s, timeouts, connection errors and 5xx responses
+    are retried with full-jitter exponential backoff, never sooner than the
+    server's Retry-After.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 40000,
+        max_retries: int = 4,
+        max_waiters: int = 100,
+        max_wait_seconds: float = 120.0,
+        base_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.max_waiters = max_waiters
+        self.max_wait_seconds = max_wait_seconds
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._admission = asyncio.Lock()
+        self._waiting = 0
+        self.stats_counters = {
+            "requests": 0, "retries": 0, "rejected": 0, "wait_seconds": 0.0,
+            "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0
+        }
+
+    async def _admit(self, estimated_tokens: int) -> None:
+        if self._waiting >= self.max_waiters:
+            self.stats_counters["rejected"] += 1
+            raise LLMQueueFullError(f"{self._waiting} completions already waiting for rate limit capacity")
+
+        self._waiting += 1
+        started = time.monotonic()
+        held = {"request": False}
+        try:
+            async def wait_for_capacity():
+                async with self._admission:
+                    await self.requests.acquire(1)
+                    held["request"] = True
+                    await self.tokens.acquire(estimated_tokens)
+
+            await asyncio.wait_for(wait_for_capacity(), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if held["request"]:
+                # Timed out waiting on tokens; the request slot was never used
+                self.requests.refund(1)
+            self.stats_counters["rejected"] += 1
+            raise LLMQueueFullError(f"Waited over {self.max_wait_seconds}s for rate limit capacity")
+        finally:
+            self._waiting -= 1
+            self.stats_counters["wait_seconds"] += time.monotonic() - started
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** attempt))
+
+        response = getattr(error, "response", None) if isinstance(error, APIStatusError) else None
+        if response is not None:
+            retry_after_ms = response.headers.get("retry-after-ms")
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after_ms:
+                    delay = max(delay, float(retry_after_ms) / 1000)
+                elif retry_after:
+                    delay = max(delay, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; fall back to our own backoff
+        return delay
+
+    async def chat_completion(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        """``chat.completions.create`` behind the limiter (streams retry only on connect)"""
+        estimated = estimate_tokens(messages, max_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            await self._admit(estimated)
+            self.stats_counters["requests"] += 1
+            try:
+                response = await self.provider.create(messages=messages, max_tokens=max_tokens, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                # The failed attempt consumed nothing; the next one reserves again
+                self.tokens.refund(estimated)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                self.stats_counters["retries"] += 1
+                logger.warning(f"LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            # Streams have no usage yet; their final chunk goes through record_usage
+            self.record_usage(getattr(response, "usage", None), reserved=estimated)
+            return response
+
+    def record_usage(self, usage: Any, reserved: int = 0) -> Optional[Dict[str, int]]:
+        """
+        Add a response's usage to the totals (streams call this with the final
+        chunk's usage). ``reserved`` is the estimate taken up front for the call,
+        i.e. ``estimate_tokens(messages, max_tokens)``; whatever it over-reserved
+        goes back to the token bucket.
+        """
+        if reserved and getattr(usage, "total_tokens", None):
+            self.tokens.refund(reserved - usage.total_tokens)
+        summary = usage_summary(usage)
+        if summary is not None:
+            self.stats_counters["prompt_tokens"] += summary["prompt_tokens"]
+            self.stats_counters["cached_prompt_tokens"] += summary["cached_tokens"]
+            self.stats_counters["completion_tokens"] += summary["completion_tokens"]
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        prompt_tokens = self.stats_counters["prompt_tokens"]
+        return {
+            "provider": self.provider.name,
+            **self.stats_counters,
+            # Share of prompt tokens served from the provider's prompt cache
+            "prompt_cache_ratio": round(self.stats_counters["cached_prompt_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "wait_seconds": round(self.stats_counters["wait_seconds"], 2),
+            "waiting": self._waiting,
+            "max_waiters": self.max_waiters
+        }
+
+    async def close(self) -> None:
+        await self.provider.close()
+
+
+_llm_client: Optional[RateLimitedLLMClient] = None
+
+
+def init_llm_client() -> Optional[RateLimitedLLMClient]:
+    """Create the shared client for the ``LLM_PROVIDER`` backend (called once at startup)"""
+    global _llm_client
+
+    provider = build_provider()
+    if provider is None:
+        return None
+
+    _llm_client = RateLimitedLLMClient(
+        provider=provider,
+        requests_per_minute=int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+        tokens_per_minute=int(os.getenv("OPENAI_TPM_LIMIT", "40000")),
+        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "4")),
+        max_waiters=int(os.getenv("OPENAI_MAX_QUEUE", "100")),
+        max_wait_seconds=float(os.getenv("OPENAI_QUEUE_TIMEOUT_SECONDS", "120"))
+    )
+    return _llm_client
+
+
+def get_llm_client() -> Optional[RateLimitedLLMClient]:
+    """Shared client; created on first use outside the web app (scripts, tests)"""
+    if _llm_client is None:
+        return init_llm_client()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
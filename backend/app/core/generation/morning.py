@@ -0,0 +1,244 @@
+"""
+Morning batch: draft a newsletter for every opted-in user at their local time
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_TIME = "07:00"
+PROFILE_PAGE_SIZE = 1000
+
+
+def morning_settings(profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The user's ``preferences.morning_draft`` if they opted in, e.g.
+    ``{"enabled": true, "local_time": "07:00", "num_items": 5, "topics": ["ai"]}``
+    """
+    settings = (profile.get("preferences") or {}).get("morning_draft") or {}
+    return settings if settings.get("enabled") else None
+
+
+def due_local_date(profile: Dict[str, Any], now: datetime, catchup_hours: float) -> Optional[date]:
+    """
+    The user's local date if their morning draft is due at ``now``.
+
+    Due from the configured local time until ``catchup_hours`` later, so a
+    tick missed while the runner was down is made up, but not at midnight.
+    """
+    settings = morning_settings(profile)
+    if settings is None:
+        return None
+
+    try:
+        zone = ZoneInfo(profile.get("timezone") or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = ZoneInfo("UTC")
+    try:
+        hour, minute = (int(part) for part in str(settings.get("local_time") or DEFAULT_LOCAL_TIME).split(":")[:2])
+    except ValueError:
+        hour, minute = (int(part) for part in DEFAULT_LOCAL_TIME.split(":"))
+
+    local_now = now.astimezone(zone)
+    scheduled = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if scheduled <= local_now < scheduled + timedelta(hours=catchup_hours):
+        return local_now.date()
+    return None
+
+
+class MorningBatchRunner:
+    """
+    One pass finds the users whose local draft time has come and who have
+    no draft for that local date yet, then generates for them.
+
+    At most ``concurrency`` generations run at once across all users; LLM
+    calls additionally go through the shared rate-limited client, and
+    identical completions in flight are coalesced by the LLM cache. Each
+    user is retried with backoff on errors without affecting the others.
+    A draft is tagged with ``morning_batch: <local date>``, which makes
+    re-runs idempotent.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 30.0,
+        catchup_hours: float = 6.0
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.catchup_hours = catchup_hours
+        self.progress: Dict[str, Any] = {"runs": 0}
+
+    async def _opted_in_profiles(self, user_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        from app.core.database import get_supabase, run_query
+
+        supabase = get_supabase()
+        profiles: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = supabase.table("user_profiles").select("id, timezone, preferences").eq(
+                "preferences->morning_draft->>enabled", "true"
+            )
+            if user_ids:
+                query = query.in_("id", user_ids)
+            page = await run_query(query.order("id").range(start, start + PROFILE_PAGE_SIZE - 1))
+            profiles.extend(page.data)
+            if len(page.data) < PROFILE_PAGE_SIZE:
+                return profiles
+            start += PROFILE_PAGE_SIZE
+
+    async def _already_drafted(self, user_ids: List[str], since: datetime) -> set:
+        """(user_id, local date) pairs that already have a morning draft"""
+        from app.core.database import get_supabase, run_query
+
+        done = set()
+        for offset in range(0, len(user_ids), PROFILE_PAGE_SIZE):
+            response = await run_query(get_supabase().table("drafts").select(
+                "user_id, morning_batch:generation_metadata->>morning_batch"
+            ).in_("user_id", user_ids[offset:offset + PROFILE_PAGE_SIZE]).gte("created_at", since.isoformat()))
+            done.update((row["user_id"], row["morning_batch"]) for row in response.data if row.get("morning_batch"))
+        return done
+
+    async def _has_draft(self, user_id: str, local_date: date) -> bool:
+        """Whether the user already has the morning draft for ``local_date``"""
+        from app.core.database import get_supabase, run_query
+
+        response = await run_query(get_supabase().table("drafts").select("id").eq("user_id", user_id).eq(
+            "generation_metadata->>morning_batch", local_date.isoformat()
+        ).limit(1))
+        return bool(response.data)
+
+    async def due_users(
+        self,
+        now: Optional[datetime] = None,
+        user_ids: Optional[List[str]] = None
+    ) -> List[Tuple[Dict[str, Any], date]]:
+        now = now or datetime.now(timezone.utc)
+        candidates = []
+        for profile in await self._opted_in_profiles(user_ids):
+            local_date = due_local_date(profile, now, self.catchup_hours)
+            if local_date is not None:
+                candidates.append((profile, local_date))
+        if not candidates:
+            return []
+
+        # Local dates span at most a day either side of UTC
+        done = await self._already_drafted([profile["id"] for profile, _ in candidates], now - timedelta(days=2))
+        return [
+            (profile, local_date) for profile, local_date in candidates
+            if (profile["id"], local_date.isoformat()) not in done
+        ]
+
+    async def run_once(
+        self,
+        now: Optional[datetime] = None,
+        user_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Generate every due draft; returns the totals (also kept in ``progress``)"""
+        due = await self.due_users(now, user_ids)
+        started = time.perf_counter()
+        self.progress = {
+            "runs": self.progress.get("runs", 0) + 1,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "total": len(due),
+            "completed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "retries": 0,
+            "in_flight": 0,
+            "errors": {}
+        }
+        if not due:
+            self.progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+            return self.progress
+
+        logger.info(f"Morning batch: {len(due)} drafts due, {self.concurrency} at a time")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*[
+            self._run_user(semaphore, profile, local_date) for profile, local_date in due
+        ])
+
+        seconds = time.perf_counter() - started
+        self.progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+        self.progress["seconds"] = round(seconds, 1)
+        self.progress["drafts_per_minute"] = round(self.progress["completed"] / seconds * 60, 2) if seconds else 0.0
+        logger.info(
+            f"Morning batch finished: {self.progress['completed']} drafted, {self.progress['skipped']} skipped, "
+            f"{self.progress['failed']} failed in {self.progress['seconds']}s"
+        )
+        return self.progress
+
+    async def _run_user(self, semaphore: asyncio.Semaphore, profile: Dict[str, Any], local_date: date) -> None:
+        from app.core.generation.service import GenerationService
+
+        user_id = profile["id"]
+        settings = morning_settings(profile) or {}
+        for attempt in range(self.max_attempts):
+            try:
+                # A failed attempt may still have saved (and charged for) the
+                # draft; never generate it a second time
+                if attempt and await self._has_draft(user_id, local_date):
+                    self.progress["completed"] += 1
+                    logger.info(f"Morning draft for user {user_id} was saved by a failed attempt")
+                    return
+
+                async with semaphore:
+                    self.progress["in_flight"] += 1
+                    try:
+                        result = await GenerationService().generate_newsletter(
+                            user_id=user_id,
+                            num_items=int(settings.get("num_items") or 5),
+                            topics=settings.get("topics") or None,
+                            extra_metadata={"morning_batch": local_date.isoformat()}
+                        )
+                    finally:
+                        self.progress["in_flight"] -= 1
+
+                if result.get("success"):
+                    self.progress["completed"] += 1
+                else:
+                    # Nothing to retry: no credits or nothing ingested yet
+                    self.progress["skipped"] += 1
+                    self.progress["errors"][user_id] = result.get("error") or result.get("message")
+                done = self.progress["completed"] + self.progress["skipped"] + self.progress["failed"]
+                logger.info(f"Morning batch: {done}/{self.progress['total']} users processed")
+                return
+
+            except Exception as e:  # Includes a full LLM queue: back off and retry
+                if attempt + 1 == self.max_attempts:
+                    logger.error(f"Morning draft for user {user_id} failed after {self.max_attempts} attempts: {e}")
+                    self.progress["failed"] += 1
+                    self.progress["errors"][user_id] = str(e)
+                    return
+                delay = self.retry_base_seconds * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning(f"Morning draft for user {user_id} failed ({e}), retrying in {delay:.0f}s")
+                self.progress["retries"] += 1
+                await asyncio.sleep(delay)
+
+
+def start_scheduler(runner: MorningBatchRunner, interval_minutes: float):
+    """Run ``runner.run_once`` every ``interval_minutes`` (never two passes at once)"""
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    scheduler.add_job(
+        runner.run_once,
+        "interval",
+        minutes=interval_minutes,
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+        id="morning_batch"
+    )
+    scheduler.start()
+    return scheduler
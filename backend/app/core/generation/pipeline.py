@@ -0,0 +1,87 @@
+"""
+Dependency-ordered async stages with per-stage timings
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageAbort(Exception):
+    """Raised by a stage to stop the pipeline with a result for the caller"""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("message") or result.get("error") or "aborted")
+        self.result = result
+
+
+class StagePipeline:
+    """
+    Runs named async stages as soon as the stages they depend on finish.
+
+    Independent stages overlap. A stage receives a dict of its dependencies'
+    results. The first stage to fail (or abort) cancels every other stage
+    still running, and its exception is raised from ``run``.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[StageFn, Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, fn: StageFn, depends_on: Iterable[str] = ()) -> "StagePipeline":
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage {name!r} depends on unknown stage {dependency!r}")
+        self._stages[name] = (fn, depends_on)
+        return self
+
+    async def run(self, only: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Run the graph (or just ``only`` and their dependencies); return every result"""
+        wanted = self._closure(only) if only is not None else list(self._stages)
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str) -> Any:
+            fn, depends_on = self._stages[name]
+            inputs = {dependency: await tasks[dependency] for dependency in depends_on}
+            stage_start = time.perf_counter()
+            try:
+                return await fn(inputs)
+            finally:
+                self.timings[name] = {
+                    "start_ms": round((stage_start - started) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - stage_start) * 1000, 1)
+                }
+
+        # Stages were added dependencies-first, so creation order is topological
+        for name in wanted:
+            tasks[name] = asyncio.create_task(run_stage(name), name=f"stage:{name}")
+
+        try:
+            done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            failed = next(
+                (task for task in done if not task.cancelled() and task.exception() is not None),
+                None
+            )
+            if failed is not None:
+                raise failed.exception()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        self.timings["total"] = {"start_ms": 0.0, "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+        return {name: task.result() for name, task in tasks.items()}
+
+    def _closure(self, names: Iterable[str]):
+        wanted = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(self._stages[name][1])
+        return [name for name in self._stages if name in wanted]
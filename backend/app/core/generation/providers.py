@@ -0,0 +1,310 @@
+"""
+LLM providers behind the shared client: OpenAI, a deterministic local
+backend for load tests and CI, and record/replay of real responses
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+import httpx
+from openai import AsyncOpenAI, InternalServerError, RateLimitError
+
+from app.core.generation.llm_cache import completion_key
+from app.core.generation.tokens import count_message_tokens, count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProvider(ABC):
+    """
+    A chat completion backend.
+
+    ``create`` takes the ``chat.completions.create`` arguments and returns
+    an OpenAI-shaped response (``choices[0].message.content``, ``usage``)
+    or, with ``stream=True``, an async iterator of delta chunks that has an
+    async ``close()``. Rate limiting and retries are left to the client
+    wrapping the provider, so every provider goes through them.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def create(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str):
+        # Retries are handled by the client so they also go through the limiter
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    async def create(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        return await self.client.chat.completions.create(messages=messages, max_tokens=max_tokens, **kwargs)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def _usage(messages: List[Dict[str, str]], content: str, model: str) -> SimpleNamespace:
+    prompt_tokens = count_message_tokens(messages, model)
+    completion_tokens = count_tokens(content, model)
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+    )
+
+
+def _response(content: str, usage: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content), finish_reason="stop")],
+        usage=usage
+    )
+
+
+class _ChunkStream:
+    """Async iterator of delta chunks, paced at ``tokens_per_second``"""
+
+    def __init__(self, pieces: List[str], usage: Any, include_usage: bool, tokens_per_second: float = 0):
+        self._pieces = pieces
+        self._usage = usage
+        self._include_usage = include_usage
+        self._delay = 1 / tokens_per_second if tokens_per_second > 0 else 0
+        self._closed = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[Any]:
+        for piece in self._pieces:
+            if self._closed:
+                return
+            if self._delay:
+                await asyncio.sleep(self._delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+        if self._include_usage and not self._closed:
+            yield SimpleNamespace(choices=[], usage=self._usage)
+
+    async def close(self) -> None:
+        self._closed = True
+
+
+def _split_tokens(text: str) -> List[str]:
+    # Word-sized pieces, whitespace kept, so joined chunks equal the text
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+WORDS = (
+    "signal launch growth model platform market research startup funding release "
+    "open source benchmark adoption pipeline infrastructure agents chips regulation"
+).split()
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic offline backend for load tests and CI.
+
+    The same request always gets the same text. Newsletter requests are
+    answered with the section layout they ask for, so parsing and
+    validation behave as in production; anything else gets
+    pseudo-random words. ``latency_ms`` is the time to first token, then
+    text arrives at ``tokens_per_second``. ``failure_rate`` injects 429s
+    (with Retry-After) and 500s from a seeded RNG, exercising the
+    client's retry path.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency_ms: float = 200,
+        tokens_per_second: float = 50,
+        failure_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.injected_failures = 0
+
+    def _content(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        prompt = messages[-1].get("content") or ""
+        system = messages[0].get("content") or ""
+        if "**Your sections:**" in prompt:
+            text = prompt.split("**Your sections:**", 1)[1].rsplit("\n\n", 1)[0]
+        elif "following this EXACT structure:" in system:
+            text = system.split("following this EXACT structure:", 1)[1].split("**Important Guidelines:**", 1)[0]
+        else:
+            digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+            words = [WORDS[byte % len(WORDS)] for byte in digest]
+            count = min(max_tokens, len(words)) if max_tokens < 100 else len(words) * 4
+            text = " ".join((words * 4)[:count]).capitalize()
+        # Honour max_tokens like a real model would (roughly)
+        pieces = _split_tokens(text.strip())
+        return "".join(pieces[:max_tokens])
+
+    def _maybe_fail(self) -> None:
+        if self._rng.random() >= self.failure_rate:
+            return
+        self.injected_failures += 1
+        request = httpx.Request("POST", "http://local-llm/v1/chat/completions")
+        if self._rng.random() < 0.5:
+            response = httpx.Response(429, headers={"retry-after-ms": "200"}, request=request)
+            raise RateLimitError("Injected rate limit", response=response, body=None)
+        raise InternalServerError("Injected server error", response=httpx.Response(500, request=request), body=None)
+
+    async def create(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        self._maybe_fail()
+
+        model = kwargs.get("model", "gpt-4")
+        content = self._content(messages, max_tokens)
+        usage = _usage(messages, content, model)
+        if kwargs.get("stream"):
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            return _ChunkStream(_split_tokens(content), usage, include_usage, self.tokens_per_second)
+
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(usage.completion_tokens / self.tokens_per_second)
+        return _response(content, usage)
+
+
+class _RecordingStream:
+    """Passes a real stream through and saves the text once it completes"""
+
+    def __init__(self, stream: Any, on_complete):
+        self._stream = stream
+        self._on_complete = on_complete
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[Any]:
+        pieces, usage = [], None
+        async for chunk in self._stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                pieces.append(chunk.choices[0].delta.content)
+            yield chunk
+        self._on_complete("".join(pieces), usage)
+
+    async def close(self) -> None:
+        await self._stream.close()
+
+
+class RecordReplayProvider(LLMProvider):
+    """
+    ``record`` passes requests to ``inner`` and saves each response under
+    ``directory`` keyed by the request's content hash; ``replay`` answers
+    from those files only (a request that was never recorded fails), so a
+    real generation run can be re-played offline at full speed or with
+    ``tokens_per_second`` pacing.
+    """
+
+    def __init__(self, directory: str, mode: str, inner: Optional[LLMProvider] = None, tokens_per_second: float = 0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Recording needs a provider to record from")
+        self.directory = directory
+        self.mode = mode
+        self.name = mode
+        self.inner = inner
+        self.tokens_per_second = tokens_per_second
+
+    def _path(self, messages: List[Dict[str, str]], max_tokens: int, kwargs: Dict[str, Any]) -> str:
+        key = completion_key(kwargs.get("model", ""), messages, kwargs.get("temperature", 1.0), max_tokens)
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _save(self, path: str, messages: List[Dict[str, str]], content: str, usage: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        record = {
+            "messages": messages,
+            "content": content,
+            "usage": {
+                "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                "completion_tokens": getattr(usage, "completion_tokens", None),
+                "cached_tokens": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            } if usage is not None else None
+        }
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    async def create(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        path = self._path(messages, max_tokens, kwargs)
+
+        if self.mode == "record":
+            result = await self.inner.create(messages=messages, max_tokens=max_tokens, **kwargs)
+            if kwargs.get("stream"):
+                return _RecordingStream(result, lambda content, usage: self._save(path, messages, content, usage))
+            self._save(path, messages, result.choices[0].message.content, getattr(result, "usage", None))
+            return result
+
+        try:
+            with open(path, encoding="utf-8") as handle:
+                record = json.load(handle)
+        except FileNotFoundError:
+            raise LookupError(f"No recorded response for this request in {self.directory}")
+
+        content = record["content"]
+        stored = record.get("usage") or {}
+        usage = _usage(messages, content, kwargs.get("model", "gpt-4"))
+        usage.prompt_tokens = stored.get("prompt_tokens") or usage.prompt_tokens
+        usage.completion_tokens = stored.get("completion_tokens") or usage.completion_tokens
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+        usage.prompt_tokens_details.cached_tokens = stored.get("cached_tokens") or 0
+        if kwargs.get("stream"):
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            return _ChunkStream(_split_tokens(content), usage, include_usage, self.tokens_per_second)
+        return _response(content, usage)
+
+    async def close(self) -> None:
+        if self.inner is not None:
+            await self.inner.close()
+
+
+def build_provider() -> Optional[LLMProvider]:
+    """Provider selected by ``LLM_PROVIDER`` (openai, local, record or replay)"""
+    kind = os.getenv("LLM_PROVIDER", "openai").lower()
+    record_dir = os.getenv("LLM_RECORD_DIR", ".llm_recordings")
+
+    if kind == "local":
+        return LocalProvider(
+            latency_ms=float(os.getenv("LOCAL_LLM_LATENCY_MS", "200")),
+            tokens_per_second=float(os.getenv("LOCAL_LLM_TOKENS_PER_SECOND", "50")),
+            failure_rate=float(os.getenv("LOCAL_LLM_FAILURE_RATE", "0")),
+            seed=int(os.getenv("LOCAL_LLM_SEED", "0"))
+        )
+    if kind == "replay":
+        return RecordReplayProvider(
+            record_dir, "replay", tokens_per_second=float(os.getenv("LOCAL_LLM_TOKENS_PER_SECOND", "0"))
+        )
+    if kind not in ("openai", "record"):
+        raise ValueError(f"Unknown LLM_PROVIDER: {kind}")
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.warning("OPENAI_API_KEY not set - generation will fail")
+        return None
+    provider = OpenAIProvider(api_key)
+    return RecordReplayProvider(record_dir, "record", inner=provider) if kind == "record" else provider
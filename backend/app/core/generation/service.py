@@ -2,20 +2,46 @@
 AI-powered newsletter generation service
 """
 
+import asyncio
+import os
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import logging
-import os
 
-from openai import AsyncOpenAI
+from postgrest.exceptions import APIError
 
-from app.core.database import get_supabase, get_user_supabase
+from app.core.database import (
+    get_supabase, get_user_supabase, run_query, apply_keyset, decode_cursor, encode_cursor, select_columns,
+    DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS, MISSING_FUNCTION_CODES
+)
+from app.models.schemas import Item
 from app.core.trends.service import TrendService
 from app.core.style.service import StyleService
-from app.core.generation.templates import NewsletterTemplate
+from app.core.generation.templates import (
+    NewsletterTemplate,
+    DEFAULT_PROMPT_TOKEN_BUDGET,
+    TEMPLATE_VERSION,
+    SECTION_GROUPS,
+    section_max_tokens
+)
+from app.core.generation.tokens import count_message_tokens, estimate_cost, MODEL_CONTEXT_TOKENS
+from app.core.generation.pipeline import StagePipeline, StageAbort
+from app.core.generation.llm_cache import llm_cache, completion_key
+from app.core.generation.llm_client import estimate_tokens, get_llm_client, usage_summary
 
 logger = logging.getLogger(__name__)
 
+# Newsletter slots are scarce: down-rank repeat coverage of the same story
+GENERATION_DIVERSITY = 0.3
+
+GENERATION_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+BODY_TEMPERATURE = 0.7
+BODY_MAX_TOKENS = 1500
+
+# Rewrite sections a generated body is missing instead of discarding it
+AUTO_REPAIR_SECTIONS = os.getenv("AUTO_REPAIR_SECTIONS", "true").lower() == "true"
+
 
 class GenerationService:
     """Service for generating newsletters using AI."""
@@ -30,24 +56,26 @@ class GenerationService:
             self.trend_service = TrendService()
             self.style_service = StyleService()
         
-        # Initialize OpenAI client
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            logger.warning('OPENAI_API_KEY not set - generation will fail')
-        self.openai_client = AsyncOpenAI(api_key=api_key) if api_key else None
+        # Shared, rate-limited OpenAI client (None without an API key)
+        self.openai_client = get_llm_client()
     
     async def check_user_credits(self, user_id: str) -> Dict[str, Any]:
         """Check if user has enough credits for generation"""
         try:
-            result = self.supabase.rpc('user_has_credits', {
-                'user_uuid': user_id,
-                'required_credits': 1
-            }).execute()
+            # The two reads are independent; run them side by side
+            result, profile_result = await asyncio.gather(
+                run_query(self.supabase.rpc('user_has_credits', {
+                    'user_uuid': user_id,
+                    'required_credits': 1
+                })),
+                run_query(
+                    self.supabase.table('user_profiles').select('credits, total_generations').eq('id', user_id)
+                )
+            )
             
             has_credits = result.data if result.data is not None else False
             
             # Get current credit count
-            profile_result = self.supabase.table('user_profiles').select('credits, total_generations').eq('id', user_id).execute()
             profile = profile_result.data[0] if profile_result.data else {}
             
             return {
@@ -69,250 +97,623 @@ class GenerationService:
         user_id: str,
         title: Optional[str] = None,
         num_items: int = 5,
-        time_window_hours: int = 48
+        time_window_hours: int = 48,
+        topics: Optional[List[str]] = None,
+        bypass_cache: bool = False,
+        parallel_sections: bool = False,
+        item_ids: Optional[List[str]] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate a newsletter for a user based on trending content and their voice.
+        
+        With ``topics`` the picks are drawn from each topic's leaderboard in
+        turn instead of from one mixed ranking. ``bypass_cache`` forces fresh
+        LLM calls even when an identical prompt was answered recently.
+        ``parallel_sections`` writes groups of sections concurrently and
+        stitches them, so the body takes about as long as its longest group.
+        ``item_ids`` pins the items (in that order) and skips trend ranking.
+        ``extra_metadata`` is merged into the draft's generation metadata.
         """
         try:
             if not self.openai_client:
-                raise ValueError('OpenAI API key not configured')
+                raise ValueError('LLM provider not configured (set OPENAI_API_KEY or LLM_PROVIDER)')
+            
+            pipeline = self._generation_pipeline(
+                user_id, title, num_items, time_window_hours, topics, bypass_cache, parallel_sections, item_ids
+            )
+            try:
+                results = await pipeline.run()
+            except StageAbort as abort:
+                return abort.result
+            
+            context = self._generation_context(user_id, time_window_hours, topics, results, pipeline.timings)
+            context['llm_usage'] = results['body']['usage']
+            context['generation_mode'] = 'sections' if parallel_sections else 'single'
+            context['extra_metadata'] = extra_metadata or {}
+            return await self._finalize_draft(context, results['title'], results['body']['body_md'])
+            
+        except Exception as e:
+            logger.error(f"Error generating newsletter: {str(e)}")
+            raise
+    
+    async def stream_newsletter(
+        self,
+        user_id: str,
+        title: Optional[str] = None,
+        num_items: int = 5,
+        time_window_hours: int = 48,
+        topics: Optional[List[str]] = None,
+        bypass_cache: bool = False,
+        parallel_sections: bool = False,
+        item_ids: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a newsletter, yielding body tokens as the model produces them.
+        
+        Yields ``{"event": "token", "text": ...}`` chunks and finally one
+        ``{"event": "done", ...}`` carrying the same result as
+        ``generate_newsletter``. Closing the generator early (client went
+        away) aborts the model stream, and no draft is saved. With
+        ``parallel_sections`` each section group arrives as one ``token``
+        event, in document order, as soon as it and those before it are done.
+        """
+        context = await self._prepare_generation(user_id, title, num_items, time_window_hours, topics, item_ids)
+        if 'result' in context:
+            yield {'event': 'done', **context['result']}
+            return
+        
+        yield {
+            'event': 'start',
+            'items_included': len(context['trending_items']),
+            'title': title
+        }
+        
+        # The title is a separate short completion; run it alongside the body
+        title_task = None
+        if not title:
+            title_task = asyncio.create_task(self._generate_newsletter_title(
+                context['trending_items'], context['trending_keywords'], bypass_cache=bypass_cache
+            ))
+        
+        if parallel_sections:
+            async for event in self._stream_sections(context, title, title_task, bypass_cache):
+                yield event
+            return
+        
+        chunks: List[str] = []
+        stream = None
+        usage_recorded = False
+        body_start = time.perf_counter()
+        first_token_ms = None
+        messages = self._newsletter_messages(context['prompt'])
+        reserved = estimate_tokens(messages, BODY_MAX_TOKENS)
+        cache_key = completion_key(GENERATION_MODEL, messages, BODY_TEMPERATURE, BODY_MAX_TOKENS)
+        cached = None if bypass_cache else llm_cache.get(cache_key)
+        if bypass_cache:
+            llm_cache.record_bypass()
+        try:
+            if cached is not None:
+                # Identical prompt answered recently: send the body in one go
+                chunks.append(cached)
+                first_token_ms = round((time.perf_counter() - body_start) * 1000, 1)
+                yield {'event': 'token', 'text': cached}
+            else:
+                stream = await self.openai_client.chat_completion(
+                    model=GENERATION_MODEL,
+                    messages=messages,
+                    temperature=BODY_TEMPERATURE,
+                    max_tokens=BODY_MAX_TOKENS,
+                    stream=True,
+                    # Final chunk carries usage, including cached prompt tokens
+                    stream_options={"include_usage": True}
+                )
+                async for chunk in stream:
+                    if getattr(chunk, 'usage', None) is not None:
+                        context['llm_usage'] = self.openai_client.record_usage(chunk.usage, reserved=reserved)
+                        usage_recorded = True
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - body_start) * 1000, 1)
+                        chunks.append(text)
+                        yield {'event': 'token', 'text': text}
+                llm_cache.set(cache_key, "".join(chunks))
+            
+            context['stage_timings']['body'] = {
+                'first_token_ms': first_token_ms,
+                'duration_ms': round((time.perf_counter() - body_start) * 1000, 1),
+                'cached': cached is not None
+            }
+            draft_title = await title_task if title_task else title
+            result = await self._finalize_draft(context, draft_title, "".join(chunks).strip())
+            yield {'event': 'done', **result}
+            
+        finally:
+            # Runs on completion, error, and cancellation (generator closed)
+            if title_task and not title_task.done():
+                title_task.cancel()
+            if stream is not None:
+                if not usage_recorded:
+                    # Cancelled or failed before the usage chunk: nothing to settle against
+                    self.openai_client.tokens.refund(reserved)
+                await stream.close()
+    
+    async def _stream_sections(
+        self,
+        context: Dict[str, Any],
+        title: Optional[str],
+        title_task: Optional[asyncio.Task],
+        bypass_cache: bool
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Body of ``stream_newsletter`` in section-parallel mode"""
+        body_start = time.perf_counter()
+        usage: Dict[str, int] = {}
+        tasks = [
+            asyncio.create_task(self._generate_section_group(context['prompt'], group, bypass_cache, usage))
+            for group in SECTION_GROUPS
+        ]
+        try:
+            parts = []
+            first_token_ms = None
+            for group, task in zip(SECTION_GROUPS, tasks):
+                text = await task
+                parts.append((group['sections'], text))
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - body_start) * 1000, 1)
+                yield {'event': 'token', 'text': text + "\n\n---\n\n"}
+            
+            context['stage_timings']['body'] = {
+                'first_token_ms': first_token_ms,
+                'duration_ms': round((time.perf_counter() - body_start) * 1000, 1)
+            }
+            context['llm_usage'] = usage or None
+            context['generation_mode'] = 'sections'
+            draft_title = await title_task if title_task else title
+            newsletter_md = NewsletterTemplate.stitch_sections(parts)
+            result = await self._finalize_draft(context, draft_title, newsletter_md)
+            yield {'event': 'done', **result}
             
-            # 0. Check user credits first
+        finally:
+            for task in tasks:
+                task.cancel()
+            if title_task and not title_task.done():
+                title_task.cancel()
+    
+    def _generation_pipeline(
+        self,
+        user_id: str,
+        title: Optional[str],
+        num_items: int,
+        time_window_hours: int,
+        topics: Optional[List[str]],
+        bypass_cache: bool = False,
+        parallel_sections: bool = False,
+        item_ids: Optional[List[str]] = None
+    ) -> StagePipeline:
+        """
+        Generation as a stage graph.
+        
+        The credit check, item selection, voice profile and keywords don't
+        depend on each other and run together; the title and body LLM calls
+        then run side by side. Neither LLM call starts before credits are
+        confirmed, and a failed or aborted stage cancels the rest.
+        """
+        async def credits(_):
             logger.info(f"Checking credits for user {user_id}")
             credit_check = await self.check_user_credits(user_id)
             if not credit_check["has_credits"]:
-                return {
+                raise StageAbort({
                     "success": False,
                     "error": "insufficient_credits",
                     "message": f"You need at least 1 credit to generate a newsletter. You currently have {credit_check['current_credits']} credits.",
                     "current_credits": credit_check["current_credits"],
                     "total_generations": credit_check["total_generations"]
-                }
+                })
+            return credit_check
+        
+        async def items(_):
+            if item_ids:
+                # Pinned items: one batched fetch, no trend scoring
+                trending_items = await self.trend_service.get_items_by_ids(user_id, item_ids)
+                if not trending_items:
+                    raise StageAbort({
+                        'success': False,
+                        'message': 'None of the selected items were found.'
+                    })
+                return trending_items
             
-            # 1. Get top trending items
             logger.info(f"Fetching top {num_items} trending items for user {user_id}")
-            trending_items = await self.trend_service.get_trending_items(
-                user_id=user_id,
-                time_window_hours=time_window_hours,
-                limit=num_items
-            )
-            
+            trending_items = await self._select_items(user_id, num_items, time_window_hours, topics)
             if not trending_items:
-                return {
+                raise StageAbort({
                     'success': False,
                     'message': 'No trending items found. Please add sources and fetch content first.'
-                }
-            
-            # 2. Get user's voice profile
-            logger.info(f"Fetching voice profile for user {user_id}")
+                })
+            return trending_items
+        
+        async def voice(_):
             voice_profile = await self.style_service.get_voice_profile(user_id)
-            voice_traits = voice_profile.get('traits', [])
-            
-            # 3. Get trending keywords for insights section
-            trending_keywords = await self.trend_service.get_trending_keywords(
+            return voice_profile.get('traits', [])
+        
+        async def keywords(_):
+            return await self.trend_service.get_trending_keywords(
                 user_id=user_id,
-                limit=5
+                limit=5,
+                time_window_hours=time_window_hours
             )
-            
-            # 4. Build the prompt using standardized template
-            prompt = NewsletterTemplate.build_generation_prompt(
-                trending_items=trending_items,
-                voice_traits=voice_traits,
-                trending_keywords=trending_keywords,
-                newsletter_title=title
+        
+        async def prompt(inputs):
+            # As many items as fit the input budget; the rest are left out
+            return NewsletterTemplate.build_budgeted_prompt(
+                trending_items=inputs['items'],
+                voice_traits=inputs['voice'],
+                trending_keywords=inputs['keywords'],
+                newsletter_title=title,
+                topics=topics,
+                input_token_budget=DEFAULT_PROMPT_TOKEN_BUDGET,
+                model=GENERATION_MODEL
             )
-            
-            # 5. Generate newsletter title if not provided
-            if not title:
-                logger.info("Generating dynamic newsletter title")
-                draft_title = await self._generate_newsletter_title(trending_items, trending_keywords)
-            else:
-                draft_title = title
-            
-            # 6. Generate newsletter using OpenAI
+        
+        async def draft_title(inputs):
+            if title:
+                return title
+            logger.info("Generating dynamic newsletter title")
+            return await self._generate_newsletter_title(
+                inputs['items'], inputs['keywords'], bypass_cache=bypass_cache
+            )
+        
+        async def body(inputs):
             logger.info("Generating newsletter with OpenAI")
-            newsletter_md = await self._generate_with_llm(prompt)
-            
-            # 7. Validate and parse newsletter structure
-            validation = NewsletterTemplate.validate_newsletter_structure(newsletter_md)
-            sections = NewsletterTemplate.parse_newsletter_sections(newsletter_md)
-            
-            # 8. Generate email subject
-            email_subject = NewsletterTemplate.generate_email_subject(
-                newsletter_title=draft_title,
-                trending_topics=[kw.get('keyword', '') for kw in trending_keywords[:3]],
-                user_name=None  # Could be fetched from user profile
+            usage = {}
+            if parallel_sections:
+                body_md = await self._generate_sections(inputs['prompt']['prompt'], bypass_cache=bypass_cache, usage=usage)
+            else:
+                body_md = await self._generate_with_llm(inputs['prompt']['prompt'], bypass_cache=bypass_cache, usage=usage)
+            return {'body_md': body_md, 'usage': usage or None}
+        
+        return (
+            StagePipeline()
+            .add("credits", credits)
+            .add("items", items)
+            .add("voice", voice)
+            .add("keywords", keywords)
+            .add("prompt", prompt, depends_on=["items", "voice", "keywords"])
+            .add("title", draft_title, depends_on=["credits", "items", "keywords"])
+            .add("body", body, depends_on=["credits", "prompt"])
+        )
+    
+    def _generation_context(
+        self,
+        user_id: str,
+        time_window_hours: int,
+        topics: Optional[List[str]],
+        results: Dict[str, Any],
+        timings: Dict[str, Dict[str, float]]
+    ) -> Dict[str, Any]:
+        budgeted = results['prompt']
+        return {
+            'user_id': user_id,
+            'time_window_hours': time_window_hours,
+            'topics': topics or [],
+            'credit_check': results['credits'],
+            # Only the items that made it into the prompt are linked to the draft
+            'trending_items': results['items'][:budgeted['items_included']],
+            'voice_traits': results['voice'],
+            'trending_keywords': results['keywords'],
+            'prompt': budgeted['prompt'],
+            'prompt_tokens': budgeted['prompt_tokens'],
+            'stage_timings': timings
+        }
+    
+    async def _prepare_generation(
+        self,
+        user_id: str,
+        title: Optional[str],
+        num_items: int,
+        time_window_hours: int,
+        topics: Optional[List[str]],
+        item_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the stages up to the prompt (credits included).
+        
+        Returns the generation context, or ``{"result": ...}`` when generation
+        can't proceed (no credits, no items).
+        """
+        if not self.openai_client:
+            raise ValueError('LLM provider not configured (set OPENAI_API_KEY or LLM_PROVIDER)')
+        
+        pipeline = self._generation_pipeline(
+            user_id, title, num_items, time_window_hours, topics, item_ids=item_ids
+        )
+        try:
+            results = await pipeline.run(only=["credits", "prompt"])
+        except StageAbort as abort:
+            return {'result': abort.result}
+        
+        return self._generation_context(user_id, time_window_hours, topics, results, pipeline.timings)
+    
+    async def estimate_generation(
+        self,
+        user_id: str,
+        title: Optional[str] = None,
+        num_items: int = 5,
+        time_window_hours: int = 48,
+        topics: Optional[List[str]] = None,
+        item_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Dry run: build the prompt a generation would send and price it.
+        
+        No credits are checked or spent and no LLM call is made. Completion
+        tokens are priced at the ``max_tokens`` cap, so the cost is an upper
+        bound for the body call (the title call is small and not included).
+        """
+        try:
+            pipeline = self._generation_pipeline(
+                user_id, title, num_items, time_window_hours, topics, item_ids=item_ids
             )
+            try:
+                results = await pipeline.run(only=["prompt"])
+            except StageAbort as abort:
+                return abort.result
             
-            draft_data = {
-                'user_id': user_id,
-                'title': draft_title,
-                'body_md': newsletter_md,
-                'status': 'draft',
-                'credits_used': 1,  # Track credit usage
-                'generation_metadata': {
-                    'item_count': len(trending_items),
-                    'time_window_hours': time_window_hours,
-                    'voice_traits': voice_traits,
-                    'model': 'gpt-4',
-                    'generated_at': datetime.utcnow().isoformat(),
-                    'email_subject': email_subject,
-                    'sections': sections,
-                    'validation': validation
-                },
-                'created_at': datetime.utcnow().isoformat()
-            }
-            
-            draft_response = self.supabase.table('drafts').insert(draft_data).execute()
-            
-            if not draft_response.data:
-                raise Exception('Failed to create draft')
-            
-            draft_id = draft_response.data[0]['id']
-            
-            # 7. Link items to draft
-            for idx, item in enumerate(trending_items):
-                self.supabase.table('draft_items').insert({
-                    'draft_id': draft_id,
-                    'item_id': item.id,
-                    'position': idx
-                }).execute()
-            
-            logger.info(f"Successfully generated newsletter draft {draft_id}")
+            budgeted = results['prompt']
+            messages = self._newsletter_messages(budgeted['prompt'])
+            prompt_tokens = count_message_tokens(messages, GENERATION_MODEL)
+            cache_key = completion_key(GENERATION_MODEL, messages, BODY_TEMPERATURE, BODY_MAX_TOKENS)
             
             return {
                 'success': True,
-                'draft_id': draft_id,
-                'title': draft_title,
-                'body_md': newsletter_md,
-                'email_subject': email_subject,
-                'items_included': len(trending_items),
-                'word_count': len(newsletter_md.split()),
-                'sections': sections,
-                'validation': validation,
-                'credits_remaining': credit_check["current_credits"] - 1,
-                'credits_used': 1
+                'model': GENERATION_MODEL,
+                'prompt_tokens': prompt_tokens,
+                'max_completion_tokens': BODY_MAX_TOKENS,
+                'context_window': MODEL_CONTEXT_TOKENS.get(GENERATION_MODEL),
+                'input_token_budget': budgeted['input_token_budget'],
+                'items_included': budgeted['items_included'],
+                'items_available': budgeted['items_available'],
+                'token_count_mode': 'exact' if budgeted['exact_token_count'] else 'estimated',
+                'estimated_cost': estimate_cost(prompt_tokens, BODY_MAX_TOKENS, GENERATION_MODEL),
+                # A cached prompt is answered without an API call
+                'cached': llm_cache.contains(cache_key)
             }
             
         except Exception as e:
-            logger.error(f"Error generating newsletter: {str(e)}")
+            logger.error(f"Error estimating generation: {str(e)}")
             raise
     
-    def _build_generation_prompt(
+    async def _finalize_draft(
         self,
-        trending_items: List[Any],
-        voice_traits: List[str],
-        trending_keywords: List[Dict[str, Any]]
+        context: Dict[str, Any],
+        draft_title: str,
+        newsletter_md: str
+    ) -> Dict[str, Any]:
+        """Validate a generated body, save it as a draft and link its items"""
+        trending_items = context['trending_items']
+        
+        # 7. Validate and parse newsletter structure
+        validation = NewsletterTemplate.validate_newsletter_structure(newsletter_md)
+        repaired_sections = []
+        if validation['missing_sections'] and AUTO_REPAIR_SECTIONS:
+            usage = context.get('llm_usage') or {}
+            newsletter_md, repaired_sections = await self._repair_sections(
+                context['prompt'], newsletter_md, validation['missing_sections'], usage
+            )
+            context['llm_usage'] = usage or None
+            validation = NewsletterTemplate.validate_newsletter_structure(newsletter_md)
+        sections = NewsletterTemplate.parse_newsletter_sections(newsletter_md)
+        
+        # 8. Generate email subject
+        email_subject = NewsletterTemplate.generate_email_subject(
+            newsletter_title=draft_title,
+            trending_topics=[kw.get('keyword', '') for kw in context['trending_keywords'][:3]],
+            user_name=None  # Could be fetched from user profile
+        )
+        
+        draft_data = {
+            'user_id': context['user_id'],
+            'title': draft_title,
+            'body_md': newsletter_md,
+            'status': 'draft',
+            'credits_used': 1,  # Track credit usage
+            'generation_metadata': {
+                'item_count': len(trending_items),
+                'time_window_hours': context['time_window_hours'],
+                'topics': context['topics'],
+                'voice_traits': context['voice_traits'],
+                'model': GENERATION_MODEL,
+                'generated_at': datetime.utcnow().isoformat(),
+                'email_subject': email_subject,
+                'sections': sections,
+                'validation': validation,
+                'repaired_sections': repaired_sections,
+                'stage_timings': context.get('stage_timings', {}),
+                'prompt_tokens': context.get('prompt_tokens'),
+                'template_version': TEMPLATE_VERSION,
+                'generation_mode': context.get('generation_mode', 'single'),
+                # Provider-reported usage; cached_tokens shows prompt-prefix cache hits
+                'llm_usage': context.get('llm_usage'),
+                # Signals at generation time, replayed when the reader reacts
+                'score_components': {
+                    item.id: self.trend_service.score_components(item) for item in trending_items
+                },
+                **context.get('extra_metadata', {})
+            },
+            'created_at': datetime.utcnow().isoformat()
+        }
+        
+        # 9. Save the draft and link its items
+        draft_id = await self._create_draft(draft_data, [item.id for item in trending_items])
+        
+        logger.info(f"Successfully generated newsletter draft {draft_id}")
+        
+        credit_check = context['credit_check']
+        return {
+            'success': True,
+            'draft_id': draft_id,
+            'title': draft_title,
+            'body_md': newsletter_md,
+            'email_subject': email_subject,
+            'items_included': len(trending_items),
+            'word_count': len(newsletter_md.split()),
+            'sections': sections,
+            'validation': validation,
+            'credits_remaining': credit_check["current_credits"] - 1,
+            'credits_used': 1
+        }
+    
+    async def _create_draft(self, draft_data: Dict[str, Any], item_ids: List[str]) -> str:
+        """Insert a draft and its item links atomically; returns the draft id"""
+        try:
+            response = await run_query(self.supabase.rpc('create_draft_with_items', {
+                'draft': draft_data,
+                'item_ids': item_ids
+            }))
+        except APIError as e:
+            # Only a database without migration 00000000000010 falls back; any
+            # other error may come after the RPC committed (and charged a credit)
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            logger.warning(f"create_draft_with_items RPC unavailable, inserting separately: {e}")
+            return await self._create_draft_fallback(draft_data, item_ids)
+        
+        draft = response.data[0] if isinstance(response.data, list) else response.data
+        if not draft:
+            raise Exception('Failed to create draft')
+        return draft['id']
+    
+    async def _create_draft_fallback(self, draft_data: Dict[str, Any], item_ids: List[str]) -> str:
+        draft_response = await run_query(self.supabase.table('drafts').insert(draft_data))
+        if not draft_response.data:
+            raise Exception('Failed to create draft')
+        
+        draft_id = draft_response.data[0]['id']
+        if not item_ids:
+            return draft_id
+        try:
+            await run_query(self.supabase.table('draft_items').insert([
+                {'draft_id': draft_id, 'item_id': item_id, 'position': idx}
+                for idx, item_id in enumerate(item_ids)
+            ]))
+        except Exception as e:
+            # The insert has already been charged, so keep the draft rather
+            # than delete it or have the caller generate (and pay) again
+            logger.error(f"Draft {draft_id} saved without its item links: {e}")
+        return draft_id
+    
+    async def _select_items(
+        self,
+        user_id: str,
+        num_items: int,
+        time_window_hours: int,
+        topics: Optional[List[str]] = None
+    ) -> List[Any]:
+        """Trending items for a newsletter, interleaved across topics when given"""
+        if not topics:
+            return await self.trend_service.get_trending_items(
+                user_id=user_id,
+                time_window_hours=time_window_hours,
+                limit=num_items,
+                diversity=GENERATION_DIVERSITY
+            )
+        
+        # Each topic is an O(K) leaderboard read, so fetch them side by side
+        per_topic = await asyncio.gather(*[
+            self.trend_service.get_trending_items(
+                user_id=user_id,
+                time_window_hours=time_window_hours,
+                limit=num_items,
+                diversity=GENERATION_DIVERSITY,
+                topic=topic
+            )
+            for topic in topics
+        ])
+        
+        # Round-robin so every topic gets a pick before any gets a second
+        selected, seen = [], set()
+        for rank in range(num_items):
+            for items in per_topic:
+                if rank < len(items) and items[rank].id not in seen:
+                    seen.add(items[rank].id)
+                    selected.append(items[rank])
+        return selected[:num_items]
+    
+    @staticmethod
+    def _newsletter_messages(prompt: str) -> List[Dict[str, str]]:
+        return NewsletterTemplate.build_generation_messages(prompt)
+    
+    async def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        model: str = GENERATION_MODEL,
+        bypass_cache: bool = False,
+        usage: Optional[Dict[str, int]] = None
     ) -> str:
-        """Build the prompt for LLM newsletter generation."""
-        
-        # Format trending items
-        items_text = ""
-        for idx, item in enumerate(trending_items, 1):
-            items_text += f"\n{idx}. **{item.title}**\n"
-            items_text += f"   - URL: {item.url}\n"
-            items_text += f"   - Summary: {item.summary[:200] if item.summary else 'No summary'}...\n"
-            items_text += f"   - Published: {item.published_at}\n"
-            # Include image URL if available
-            if hasattr(item, 'image_url') and item.image_url:
-                items_text += f"   - Image: {item.image_url}\n"
-        
-        # Format voice traits
-        voice_description = "conversational and engaging"
-        if voice_traits:
-            voice_description = ", ".join(voice_traits)
-        
-        # Format trending keywords
-        keywords_text = ", ".join([kw.get('keyword', '') for kw in trending_keywords[:5]])
-        
-        # Build the prompt
-        prompt = f"""You are a newsletter writer tasked with creating an engaging, informative newsletter.
-
-**Writing Style/Voice:**
-{voice_description}
-
-**Trending Topics to Cover:**
-{keywords_text}
-
-**Top Content to Feature:**
-{items_text}
-
-**Instructions:**
-Create a well-structured newsletter in Markdown format with the following sections:
-
-1. **📝 Executive Summary** (2-3 sentences)
-   - Quick overview of this week's most important developments
-   - Highlight key trends and themes
-   - Set expectations for what readers will learn
-
-2. **Introduction** (2-3 sentences)
-   - Hook the reader with what's trending
-   - Set the tone for the newsletter
-
-3. **Top Picks** (3-5 items)
-   - Feature the most interesting items from the list above
-   - Include the title as a link: [Title](URL)
-   - If an item has an Image URL, include it using markdown: ![alt text](image_url)
-   - Place images BEFORE the article title for visual impact
-   - Add 2-3 sentences explaining why each item matters
-   - Make it engaging and relevant
-
-4. **Trends to Watch** (2-3 quick insights)
-   - Identify emerging patterns from the content
-   - Brief bullet points about what's gaining traction
-
-5. **💡 Did You Know?** (Fun trivia)
-   - Share an interesting fact or trivia related to the newsletter's topics
-   - Make it surprising, educational, or thought-provoking
-   - Keep it concise (1-2 sentences)
-
-6. **📊 By The Numbers** (Optional: 3-5 statistics)
-   - Quick data points or metrics related to the content
-   - Present as a simple list with numbers and context
-   - Example: "🚀 143% - Growth in AI adoption this quarter"
-
-7. **Closing**
-   - Warm sign-off
-   - Call-to-action or thought-provoking question
-
-**Important:**
-- Write in the specified voice/tone
-- Keep it scannable with headers and bullets
-- Include all URLs from the items
-- IMPORTANT: Include images from items using markdown syntax ![](image_url)
-- Place images prominently to make the newsletter visually engaging
-- Aim for 400-600 words total
-- Use Markdown formatting with emojis for section headers
-- Be authentic and engaging
-- Make the Executive Summary actionable and compelling
-- Ensure trivia is relevant and interesting
-- Use visual elements (images, emojis, formatting) to break up text
-
-Generate the newsletter now:"""
+        """
+        Single entry point for completions, served from the LLM cache when possible.
         
-        return prompt
+        Pass a dict as ``usage`` to receive the call's token usage (left
+        empty on a cache hit).
+        """
+        key = completion_key(model, messages, temperature, max_tokens)
+        if bypass_cache:
+            llm_cache.record_bypass()
+        else:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+            # Same request already on its way (e.g. batch users with identical inputs)
+            pending = llm_cache.inflight(key)
+            if pending is not None:
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise  # This caller was cancelled, not the leader
+            llm_cache.lead(key)
+        
+        try:
+            response = await self.openai_client.chat_completion(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            content = response.choices[0].message.content
+        except BaseException as e:
+            if not bypass_cache:
+                llm_cache.finish(key, error=e)
+            raise
+        
+        if usage is not None:
+            usage.update(usage_summary(getattr(response, 'usage', None)) or {})
+        llm_cache.set(key, content)
+        if not bypass_cache:
+            llm_cache.finish(key, content)
+        return content
     
-    async def _generate_with_llm(self, prompt: str) -> str:
+    async def _generate_with_llm(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        usage: Optional[Dict[str, int]] = None
+    ) -> str:
         """Generate newsletter content using OpenAI."""
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert newsletter writer who creates engaging, well-structured content that matches the writer's voice and style."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=1500
+            response_text = await self._chat_completion(
+                self._newsletter_messages(prompt),
+                temperature=BODY_TEMPERATURE,
+                max_tokens=BODY_MAX_TOKENS,
+                bypass_cache=bypass_cache,
+                usage=usage
             )
             
-            newsletter_md = response.choices[0].message.content.strip()
+            newsletter_md = response_text.strip()
             
             return newsletter_md
             
@@ -320,24 +721,113 @@ Generate the newsletter now:"""
             logger.error(f"Error calling OpenAI API: {str(e)}")
             raise
     
+    async def _generate_section_group(
+        self,
+        prompt: str,
+        group: Dict[str, Any],
+        bypass_cache: bool = False,
+        usage: Optional[Dict[str, int]] = None
+    ) -> str:
+        """Write one group of sections from the shared per-issue prompt"""
+        group_usage = {}
+        text = await self._chat_completion(
+            NewsletterTemplate.build_section_messages(prompt, group['sections']),
+            temperature=BODY_TEMPERATURE,
+            max_tokens=group['max_tokens'],
+            bypass_cache=bypass_cache,
+            usage=group_usage
+        )
+        if usage is not None:
+            for key, value in group_usage.items():
+                usage[key] = usage.get(key, 0) + value
+        return text.strip()
+    
+    async def _write_section(
+        self,
+        prompt: str,
+        section_id: str,
+        feedback: Optional[str] = None,
+        bypass_cache: bool = False,
+        usage: Optional[Dict[str, int]] = None
+    ) -> str:
+        """Write one standard section; returns '' if the model didn't produce it"""
+        section_usage = {}
+        text = await self._chat_completion(
+            NewsletterTemplate.build_section_messages(prompt, [section_id], feedback=feedback),
+            temperature=BODY_TEMPERATURE,
+            max_tokens=section_max_tokens(section_id),
+            bypass_cache=bypass_cache,
+            usage=section_usage
+        )
+        if usage is not None:
+            for key, value in section_usage.items():
+                usage[key] = usage.get(key, 0) + value
+        # Keep only the requested section, whatever else came back
+        return NewsletterTemplate.stitch_sections([([section_id], text)])
+    
+    async def _repair_sections(
+        self,
+        prompt: str,
+        newsletter_md: str,
+        missing_sections: List[str],
+        usage: Optional[Dict[str, int]] = None
+    ) -> Tuple[str, List[str]]:
+        """Write missing sections side by side and splice them in; returns (body, repaired ids)"""
+        logger.info(f"Repairing missing sections: {', '.join(missing_sections)}")
+        written = await asyncio.gather(*[
+            self._write_section(prompt, section_id, usage=usage) for section_id in missing_sections
+        ], return_exceptions=True)
+        
+        repaired = []
+        for section_id, section_md in zip(missing_sections, written):
+            if isinstance(section_md, Exception):
+                logger.warning(f"Failed to repair section {section_id}: {section_md}")
+                continue
+            if section_md:
+                newsletter_md = NewsletterTemplate.replace_section(newsletter_md, section_id, section_md)
+                repaired.append(section_id)
+        return newsletter_md, repaired
+    
+    async def _generate_sections(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        usage: Optional[Dict[str, int]] = None
+    ) -> str:
+        """Write all section groups concurrently and stitch them in order"""
+        try:
+            texts = await asyncio.gather(*[
+                self._generate_section_group(prompt, group, bypass_cache, usage)
+                for group in SECTION_GROUPS
+            ])
+            return NewsletterTemplate.stitch_sections([
+                (group['sections'], text) for group, text in zip(SECTION_GROUPS, texts)
+            ])
+            
+        except Exception as e:
+            logger.error(f"Error generating newsletter sections: {str(e)}")
+            raise
+    
     async def _generate_newsletter_title(
         self,
         trending_items: List[Any],
-        trending_keywords: List[Dict[str, Any]]
+        trending_keywords: List[Dict[str, Any]],
+        bypass_cache: bool = False
     ) -> str:
         """Generate a dynamic, catchy newsletter title based on content."""
         try:
-            # Extract main topics from items and keywords
-            topics = set()
+            # Extract main topics from items and keywords (insertion-ordered,
+            # so the same items always produce the same prompt and cache key)
+            topics = {}
             for item in trending_items[:3]:  # Focus on top 3 items
                 title_words = item.title.split()
                 # Extract meaningful words (skip common words)
                 skip_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-                topics.update([word for word in title_words if word.lower() not in skip_words and len(word) > 3][:2])
+                topics.update(dict.fromkeys([word for word in title_words if word.lower() not in skip_words and len(word) > 3][:2]))
             
             # Add trending keywords
             for kw in trending_keywords[:2]:
-                topics.add(kw.get('keyword', ''))
+                topics[kw.get('keyword', '')] = None
             
             topics_text = ", ".join(list(topics)[:5])
             
@@ -360,17 +850,17 @@ Examples:
 
 Generate ONE title only, no quotes or explanations:"""
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
+            response_text = await self._chat_completion(
+                [
                     {"role": "system", "content": "You are a expert at creating catchy newsletter titles."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.8,
-                max_tokens=50
+                max_tokens=50,
+                bypass_cache=bypass_cache
             )
             
-            title = response.choices[0].message.content.strip()
+            title = response_text.strip()
             # Remove quotes if AI added them
             title = title.strip('"\'')
             
@@ -405,40 +895,45 @@ Generate ONE title only, no quotes or explanations:"""
             draft = draft_response.data[0]
             metadata = draft.get('generation_metadata', {})
             
-            # Get the items that were used
-            items_response = self.supabase.table('draft_items').select("""
-                item_id,
-                items!inner(*)
-            """).eq('draft_id', draft_id).execute()
-            
-            item_ids = [item['item_id'] for item in items_response.data]
-            
-            # Get fresh trending items or use the same ones
-            trending_items = await self.trend_service.get_trending_items(
-                user_id=user_id,
-                time_window_hours=metadata.get('time_window_hours', 48),
-                limit=metadata.get('item_count', 5)
-            )
+            # Reuse the draft's own items; rank fresh ones only if it has none
+            trending_items = await self._draft_items(user_id, draft_id)
+            if not trending_items:
+                trending_items = await self._select_items(
+                    user_id,
+                    metadata.get('item_count', 5),
+                    metadata.get('time_window_hours', 48),
+                    metadata.get('topics')
+                )
             
             # Get voice profile
             voice_profile = await self.style_service.get_voice_profile(user_id)
             voice_traits = voice_profile.get('traits', [])
             
             # Get trending keywords
-            trending_keywords = await self.trend_service.get_trending_keywords(user_id, limit=5)
+            trending_keywords = await self.trend_service.get_trending_keywords(
+                user_id,
+                limit=5,
+                time_window_hours=metadata.get('time_window_hours', 48)
+            )
             
-            # Build prompt with feedback
-            prompt = self._build_generation_prompt(
+            # Build prompt with feedback (feedback goes last, after the shared prefix)
+            prompt = NewsletterTemplate.build_generation_prompt(
                 trending_items=trending_items,
                 voice_traits=voice_traits,
-                trending_keywords=trending_keywords
+                trending_keywords=trending_keywords,
+                newsletter_title=draft.get('title'),
+                topics=metadata.get('topics'),
+                max_items=len(trending_items),
+                model=GENERATION_MODEL
             )
             
             if feedback:
                 prompt += f"\n\n**User Feedback on Previous Draft:**\n{feedback}\n\nPlease incorporate this feedback in the regenerated newsletter."
             
             # Generate new version
-            newsletter_md = await self._generate_with_llm(prompt)
+            # A regenerate is a request for a different draft, so never reuse
+            usage = {}
+            newsletter_md = await self._generate_with_llm(prompt, bypass_cache=True, usage=usage)
             
             # Update the draft
             update_data = {
@@ -448,7 +943,12 @@ Generate ONE title only, no quotes or explanations:"""
                     **metadata,
                     'regenerated': True,
                     'regenerated_at': datetime.utcnow().isoformat(),
-                    'feedback': feedback
+                    'feedback': feedback,
+                    'template_version': TEMPLATE_VERSION,
+                    'llm_usage': usage or None,
+                    'score_components': {
+                        item.id: self.trend_service.score_components(item) for item in trending_items
+                    }
                 }
             }
             
@@ -467,6 +967,103 @@ Generate ONE title only, no quotes or explanations:"""
             logger.error(f"Error regenerating draft: {str(e)}")
             raise
     
+    async def regenerate_section(
+        self,
+        user_id: str,
+        draft_id: str,
+        section_id: str,
+        feedback: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Rewrite one section of a draft and splice it into ``body_md``.
+        
+        The prompt carries the draft's own items, the voice and the trending
+        keywords plus that one section's layout, so it costs a fraction of a
+        full regenerate. The rest of the draft is left unchanged.
+        """
+        try:
+            draft_response = self.supabase.table('drafts').select('*').eq('id', draft_id).eq('user_id', user_id).execute()
+            
+            if not draft_response.data:
+                raise ValueError('Draft not found')
+            
+            draft = draft_response.data[0]
+            metadata = draft.get('generation_metadata') or {}
+            
+            items, voice_profile, trending_keywords = await asyncio.gather(
+                self._draft_items(user_id, draft_id),
+                self.style_service.get_voice_profile(user_id),
+                self.trend_service.get_trending_keywords(
+                    user_id, limit=5, time_window_hours=metadata.get('time_window_hours', 48)
+                )
+            )
+            
+            prompt = NewsletterTemplate.build_generation_prompt(
+                trending_items=items,
+                voice_traits=voice_profile.get('traits', []),
+                trending_keywords=trending_keywords,
+                newsletter_title=draft.get('title'),
+                topics=metadata.get('topics'),
+                max_items=len(items),
+                model=GENERATION_MODEL
+            )
+            
+            # A regenerate asks for a different version, so never reuse
+            usage = {}
+            section_md = await self._write_section(prompt, section_id, feedback, bypass_cache=True, usage=usage)
+            if not section_md:
+                raise Exception(f'Model did not return a {section_id} section')
+            
+            body_md = NewsletterTemplate.replace_section(draft['body_md'], section_id, section_md)
+            validation = NewsletterTemplate.validate_newsletter_structure(body_md)
+            
+            self.supabase.table('drafts').update({
+                'body_md': body_md,
+                'updated_at': datetime.utcnow().isoformat(),
+                'generation_metadata': {
+                    **metadata,
+                    'sections': NewsletterTemplate.parse_newsletter_sections(body_md),
+                    'validation': validation,
+                    'regenerated_sections': metadata.get('regenerated_sections', []) + [{
+                        'section_id': section_id,
+                        'feedback': feedback,
+                        'llm_usage': usage or None,
+                        'regenerated_at': datetime.utcnow().isoformat()
+                    }]
+                }
+            }).eq('id', draft_id).eq('user_id', user_id).execute()
+            
+            logger.info(f"Regenerated section {section_id} of draft {draft_id}")
+            
+            return {
+                'success': True,
+                'draft_id': draft_id,
+                'section_id': section_id,
+                'section_md': section_md,
+                'body_md': body_md,
+                'validation': validation
+            }
+            
+        except Exception as e:
+            logger.error(f"Error regenerating section: {str(e)}")
+            raise
+    
+    async def _draft_items(self, user_id: str, draft_id: str) -> List[Item]:
+        """Items linked to a draft, in their newsletter order"""
+        links = await run_query(
+            self.supabase.table('draft_items').select('item_id').eq('draft_id', draft_id).order('position')
+        )
+        return await self.trend_service.get_items_by_ids(user_id, [link['item_id'] for link in links.data])
+    
+    async def get_generation_status(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Stage, partial output and draft ID of a background generation job"""
+        from app.core.generation.jobs import generation_jobs
+        
+        job = generation_jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job.to_status()
+    
     async def get_draft(self, user_id: str, draft_id: str) -> Dict[str, Any]:
         """Get a specific draft with its items."""
         try:
@@ -496,18 +1093,33 @@ Generate ONE title only, no quotes or explanations:"""
         self,
         user_id: str,
         status: Optional[str] = None,
-        limit: int = 20
-    ) -> List[Dict[str, Any]]:
-        """List drafts for a user."""
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        A page of a user's drafts, newest first, and the cursor for the next
+        page (``None`` on the last one).
+        
+        Rows carry ``DRAFT_LIST_COLUMNS`` plus any comma-separated ``fields``
+        from ``DRAFT_EXPANDABLE_FIELDS``. Raises ``ValueError`` for a bad
+        cursor or field.
+        """
+        columns = select_columns(DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS, fields)
+        limit = max(1, limit)
+        after = decode_cursor(cursor) if cursor else None
         try:
-            query = self.supabase.table('drafts').select('*').eq('user_id', user_id)
+            query = self.supabase.table('drafts').select(columns).eq('user_id', user_id)
             
             if status:
                 query = query.eq('status', status)
             
-            response = query.order('created_at', desc=True).limit(limit).execute()
+            # One extra row tells whether another page follows
+            response = await run_query(apply_keyset(query, 'created_at', after).limit(limit + 1))
             
-            return response.data
+            drafts = response.data[:limit]
+            next_cursor = encode_cursor(drafts[-1], 'created_at') if len(response.data) > limit else None
+            return drafts, next_cursor
             
         except Exception as e:
             logger.error(f"Error listing drafts: {str(e)}")
@@ -531,7 +1143,9 @@ Generate ONE title only, no quotes or explanations:"""
         self, 
         user_id: str, 
         limit: int = 20, 
-        status: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """Get drafts for a user (alias for list_drafts for API compatibility)."""
-        return await self.list_drafts(user_id, status, limit)
+        return await self.list_drafts(user_id, status, limit, cursor, fields)
@@ -2,145 +2,27 @@
 Standardized newsletter templates and email subject generation
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+import os
 import re
 
+from app.core.generation.tokens import count_tokens, truncate_to_tokens, exact_counts_available
 
-class NewsletterTemplate:
-    """Standardized newsletter template with consistent sections"""
-    
-    @staticmethod
-    def get_standard_sections() -> List[Dict[str, str]]:
-        """Get the standard newsletter sections based on sample format"""
-        return [
-            {
-                "id": "header",
-                "title": "Newsletter Header",
-                "description": "Title, subtitle, and branding",
-                "required": True
-            },
-            {
-                "id": "big_picture",
-                "title": "🧠 Big Picture",
-                "description": "High-level overview and theme",
-                "required": True
-            },
-            {
-                "id": "executive_summary",
-                "title": "🔍 Executive Summary",
-                "description": "Key developments and highlights",
-                "required": True
-            },
-            {
-                "id": "top_picks",
-                "title": "🚀 Top Picks of the Week",
-                "description": "Featured articles with analysis",
-                "required": True
-            },
-            {
-                "id": "trends_to_watch",
-                "title": "🌐 Trends to Watch",
-                "description": "Trending topics in table format",
-                "required": True
-            },
-            {
-                "id": "quick_bytes",
-                "title": "💡 Quick Bytes",
-                "description": "Quick news snippets",
-                "required": True
-            },
-            {
-                "id": "data_pulse",
-                "title": "📊 Data Pulse",
-                "description": "Statistics and metrics",
-                "required": True
-            },
-            {
-                "id": "featured_tool",
-                "title": "🧭 Featured Tool",
-                "description": "Tool or resource spotlight",
-                "required": True
-            },
-            {
-                "id": "did_you_know",
-                "title": "🧩 Did You Know?",
-                "description": "Fun trivia or interesting fact",
-                "required": True
-            },
-            {
-                "id": "from_editor",
-                "title": "💬 From the Editor",
-                "description": "Personal note from the editor",
-                "required": True
-            },
-            {
-                "id": "coming_next",
-                "title": "📅 Coming Next Week",
-                "description": "Preview of upcoming content",
-                "required": True
-            },
-            {
-                "id": "wrap_up",
-                "title": "📨 Wrap-Up",
-                "description": "Closing message and call-to-action",
-                "required": True
-            }
-        ]
-    
-    @staticmethod
-    def build_generation_prompt(
-        trending_items: List[Any],
-        voice_traits: List[str],
-        trending_keywords: List[Dict[str, Any]],
-        newsletter_title: Optional[str] = None
-    ) -> str:
-        """Build standardized generation prompt"""
-        
-        # Format trending keywords
-        keywords_text = ", ".join([kw.get('keyword', '') for kw in trending_keywords[:5]])
-        
-        # Format trending items with enhanced image handling
-        items_text = ""
-        hero_images = []  # Collect potential hero images
-        
-        for i, item in enumerate(trending_items[:5], 1):
-            title = getattr(item, 'title', 'Untitled')
-            url = getattr(item, 'url', '#')
-            summary = getattr(item, 'summary', '') or ''
-            image_url = getattr(item, 'image_url', '') or ''
-            
-            items_text += f"{i}. **{title}**\n"
-            items_text += f"   URL: {url}\n"
-            if summary:
-                items_text += f"   Summary: {summary[:200]}...\n"
-            if image_url:
-                items_text += f"   Image: {image_url}\n"
-                # Collect high-quality images for potential hero use
-                if i <= 3 and image_url:  # Use top 3 items' images as hero candidates
-                    hero_images.append(image_url)
-            items_text += "\n"
-        
-        # Build voice description
-        voice_description = "Professional, engaging, and informative" if not voice_traits else ", ".join(voice_traits)
-        
-        # Build the comprehensive prompt based on sample format
-        hero_image_1 = hero_images[0] if hero_images else 'https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=800&h=400&fit=crop&crop=center'
-        hero_image_2 = hero_images[1] if len(hero_images) > 1 else 'https://images.unsplash.com/photo-1551288049-bebda4e38f71?w=800&h=400&fit=crop&crop=center'
-        hero_image_3 = hero_images[2] if len(hero_images) > 2 else 'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=400&fit=crop&crop=center'
-        
-        prompt = f"""You are a professional newsletter writer creating a comprehensive weekly newsletter. Follow the EXACT format and structure provided below.
+# Input-token budget for the generation prompt; items are added until it is reached
+DEFAULT_PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
 
-**Newsletter Title:** {newsletter_title or "Weekly Tech Newsletter"}
+# Longest item summary quoted in the prompt
+SUMMARY_TOKEN_LIMIT = 60
 
-**Writing Style/Voice:**
-{voice_description}
 
-**Trending Topics to Cover:**
-{keywords_text}
+# Bump when the static instructions change. The system prefix is identical
+# byte-for-byte across requests of one version, which lets the provider
+# serve it from its prompt cache; everything per-issue goes after it.
+TEMPLATE_VERSION = "2"
 
-**Top Content to Feature:**
-{items_text}
+_SYSTEM_PREFIX_V2 = """You are a professional newsletter writer creating a comprehensive weekly newsletter. Follow the EXACT format and structure provided below.
 
 **Instructions:**
 Create a comprehensive newsletter in Markdown format following this EXACT structure:
@@ -171,21 +53,21 @@ This week, [newsletter name] dives into [key themes from the content]. Plus, [ad
 ## 🚀 Top Picks of the Week
 
 ### 🧩 [Article Title 1](URL)
-![Hero Image]({hero_image_1})
+![Hero Image]([HERO IMAGE 1])
 [Brief description of why this matters].  
 *Why it matters:* [2-3 sentences explaining the impact and relevance].
 
 ---
 
 ### 💰 [Article Title 2](URL)
-![Article Image]({hero_image_2})
+![Article Image]([HERO IMAGE 2])
 [Brief description of why this matters].  
 *Why it matters:* [2-3 sentences explaining the impact and relevance].
 
 ---
 
 ### 🧮 [Article Title 3](URL)
-![Article Image]({hero_image_3})
+![Article Image]([HERO IMAGE 3])
 [Brief description of why this matters].  
 *Why it matters:* [2-3 sentences explaining the impact and relevance].
 
@@ -275,7 +157,411 @@ Feedback? Reply to this email — we actually read them 💬
 - Use visual elements (images, emojis, formatting) to break up text
 - Each section should flow naturally into the next
 
-Generate the newsletter now:"""
+The newsletter title, voice, topics, source items and hero images for this issue follow in the next message."""
+
+_SYSTEM_PREFIXES = {
+    "2": _SYSTEM_PREFIX_V2,
+}
+
+
+# Section-parallel mode: each group is written by its own completion, all
+# groups at once, then stitched in this (document) order
+SECTION_GROUPS = [
+    {"sections": ["header", "big_picture", "executive_summary"], "max_tokens": 350},
+    {"sections": ["top_picks"], "max_tokens": 500},
+    {"sections": ["trends_to_watch", "quick_bytes", "data_pulse"], "max_tokens": 400},
+    {"sections": ["featured_tool", "did_you_know"], "max_tokens": 250},
+    {"sections": ["from_editor", "coming_next", "wrap_up"], "max_tokens": 300},
+]
+
+_SECTION_SYSTEM_PREFIX_V2 = """You are a professional newsletter writer. Several writers draft one newsletter in parallel, each writing only the sections assigned to them; the parts are joined in order afterwards.
+
+**Instructions:**
+- Write ONLY the sections you are assigned, in the order given, in Markdown
+- Use the EXACT section headers and layout shown for each section
+- Do not add any other section, preamble, or closing remark of your own
+- Separate sections with a line containing only ---
+- Write in the specified voice/tone
+- Use the provided URLs and hero images where the layout calls for them
+- Keep it engaging, informative, and concise"""
+
+_SECTION_SYSTEM_PREFIXES = {
+    "2": _SECTION_SYSTEM_PREFIX_V2,
+}
+
+GENERATE_INSTRUCTION = "Generate the newsletter now:"
+
+
+def section_max_tokens(section_id: str) -> int:
+    """Completion cap when writing a single section (its group's cap)"""
+    return next(group["max_tokens"] for group in SECTION_GROUPS if section_id in group["sections"])
+
+
+def _header_key(text: str) -> str:
+    """Section header reduced to lowercase words (emoji and punctuation dropped)"""
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", text.lower()).split())
+
+
+@lru_cache(maxsize=16)
+def _section_templates(version: str) -> Dict[str, str]:
+    """Layout of each standard section, cut from the full template's structure"""
+    prefix = _SYSTEM_PREFIXES[version]
+    structure = prefix.split("following this EXACT structure:", 1)[1].split("**Important Guidelines:**", 1)[0]
+    return {
+        section_id: chunk
+        for section_id, chunk in NewsletterTemplate.split_sections(structure)
+        if section_id
+    }
+
+
+@lru_cache(maxsize=16)
+def _system_prefix_tokens(version: str, model: str) -> int:
+    return count_tokens(_SYSTEM_PREFIXES[version], model)
+
+
+class NewsletterTemplate:
+    """Standardized newsletter template with consistent sections"""
+    
+    @staticmethod
+    def get_standard_sections() -> List[Dict[str, str]]:
+        """Get the standard newsletter sections based on sample format"""
+        return [
+            {
+                "id": "header",
+                "title": "Newsletter Header",
+                "description": "Title, subtitle, and branding",
+                "required": True
+            },
+            {
+                "id": "big_picture",
+                "title": "🧠 Big Picture",
+                "description": "High-level overview and theme",
+                "required": True
+            },
+            {
+                "id": "executive_summary",
+                "title": "🔍 Executive Summary",
+                "description": "Key developments and highlights",
+                "required": True
+            },
+            {
+                "id": "top_picks",
+                "title": "🚀 Top Picks of the Week",
+                "description": "Featured articles with analysis",
+                "required": True
+            },
+            {
+                "id": "trends_to_watch",
+                "title": "🌐 Trends to Watch",
+                "description": "Trending topics in table format",
+                "required": True
+            },
+            {
+                "id": "quick_bytes",
+                "title": "💡 Quick Bytes",
+                "description": "Quick news snippets",
+                "required": True
+            },
+            {
+                "id": "data_pulse",
+                "title": "📊 Data Pulse",
+                "description": "Statistics and metrics",
+                "required": True
+            },
+            {
+                "id": "featured_tool",
+                "title": "🧭 Featured Tool",
+                "description": "Tool or resource spotlight",
+                "required": True
+            },
+            {
+                "id": "did_you_know",
+                "title": "🧩 Did You Know?",
+                "description": "Fun trivia or interesting fact",
+                "required": True
+            },
+            {
+                "id": "from_editor",
+                "title": "💬 From the Editor",
+                "description": "Personal note from the editor",
+                "required": True
+            },
+            {
+                "id": "coming_next",
+                "title": "📅 Coming Next Week",
+                "description": "Preview of upcoming content",
+                "required": True
+            },
+            {
+                "id": "wrap_up",
+                "title": "📨 Wrap-Up",
+                "description": "Closing message and call-to-action",
+                "required": True
+            }
+        ]
+    
+    @staticmethod
+    def system_prefix(version: str = TEMPLATE_VERSION) -> str:
+        """Static formatting instructions, sent as the system message"""
+        return _SYSTEM_PREFIXES[version]
+    
+    @staticmethod
+    def build_generation_messages(prompt: str, version: str = TEMPLATE_VERSION) -> List[Dict[str, str]]:
+        """Chat messages for a generation: static prefix first, per-issue prompt last"""
+        return [
+            {"role": "system", "content": _SYSTEM_PREFIXES[version]},
+            {"role": "user", "content": prompt}
+        ]
+    
+    @staticmethod
+    def build_section_messages(
+        prompt: str,
+        section_ids: List[str],
+        feedback: Optional[str] = None,
+        version: str = TEMPLATE_VERSION
+    ) -> List[Dict[str, str]]:
+        """
+        Messages that write only ``section_ids`` (section-parallel groups,
+        single-section regeneration and repair).
+        
+        Every call shares the static prefix and the per-issue context
+        (``prompt`` from ``build_generation_prompt``); only the trailing
+        assignment differs.
+        """
+        context = prompt[:-len(GENERATE_INSTRUCTION)] if prompt.endswith(GENERATE_INSTRUCTION) else prompt
+        layouts = _section_templates(version)
+        assignment = "\n\n".join(layouts[section_id].strip().rstrip("-").strip() for section_id in section_ids)
+        if feedback:
+            assignment += f"\n\n**Reader feedback on the previous version:**\n{feedback}"
+        return [
+            {"role": "system", "content": _SECTION_SYSTEM_PREFIXES[version]},
+            {"role": "user", "content": f"{context.rstrip()}\n\n**Your sections:**\n\n{assignment}\n\nWrite these sections now:"}
+        ]
+    
+    @staticmethod
+    def split_sections(content: str) -> List[Tuple[Optional[str], str]]:
+        """
+        Split markdown into ``(section_id, text)`` chunks at each ``## `` header.
+        
+        Text before the first ``## `` is the ``header`` section; chunks whose
+        header isn't a standard section get ``None``.
+        """
+        sections = NewsletterTemplate.get_standard_sections()
+        keys = [(section["id"], _header_key(section["title"])) for section in sections if section["id"] != "header"]
+        
+        chunks = re.split(r"(?m)^(?=##\s)", content)
+        result = []
+        for index, chunk in enumerate(chunks):
+            if not chunk.strip():
+                continue
+            if index == 0 and not chunk.startswith("##"):
+                result.append(("header", chunk))
+                continue
+            key = _header_key(chunk.split("\n", 1)[0])
+            section_id = next(
+                (sid for sid, title_key in keys if key and (key.startswith(title_key) or title_key.startswith(key))),
+                None
+            )
+            result.append((section_id, chunk))
+        return result
+    
+    @staticmethod
+    def stitch_sections(parts: List[Tuple[List[str], str]]) -> str:
+        """
+        Join section-group outputs in order, with a consistency pass.
+        
+        Each part keeps only the sections it was assigned (a writer that
+        strayed into another group's section is trimmed), a section
+        written twice is kept once, and separators are normalised.
+        """
+        seen = set()
+        pieces = []
+        for section_ids, text in parts:
+            current = None
+            for section_id, chunk in NewsletterTemplate.split_sections(text):
+                if section_id is not None:
+                    current = section_id if section_id in section_ids and section_id not in seen else None
+                    if current is None:
+                        continue
+                    seen.add(current)
+                elif current is None:
+                    continue  # Unknown header outside any assigned section
+                if section_id == "header":
+                    # Drop any chatter before the title line
+                    title_line = re.search(r"(?m)^#\s", chunk)
+                    chunk = chunk[title_line.start():] if title_line else chunk
+                chunk = re.sub(r"(?:\n\s*-{3,}\s*)+$", "", chunk.strip()).strip()
+                chunk = re.sub(r"^(?:-{3,}\s*\n)+", "", chunk).strip()
+                if chunk:
+                    if section_id is None and pieces:
+                        pieces[-1] += f"\n\n{chunk}"
+                    else:
+                        pieces.append(chunk)
+        return "\n\n---\n\n".join(pieces)
+    
+    @staticmethod
+    def replace_section(content: str, section_id: str, section_md: str) -> str:
+        """
+        Splice ``section_md`` into ``content`` as ``section_id``.
+        
+        An existing section is replaced in place; a missing one is inserted
+        after the nearest section that precedes it in the template. The
+        rest of the newsletter is left byte-for-byte unchanged.
+        """
+        section_md = section_md.strip()
+        chunks = NewsletterTemplate.split_sections(content)
+        for index, (chunk_id, chunk) in enumerate(chunks):
+            if chunk_id == section_id:
+                # Keep whatever separator followed the old section
+                tail = re.search(r"(?:\n\s*-{3,})?\s*$", chunk).group(0)
+                chunks[index] = (chunk_id, section_md + (tail or "\n\n"))
+                return "".join(chunk for _, chunk in chunks)
+        
+        order = [section["id"] for section in NewsletterTemplate.get_standard_sections()]
+        position = order.index(section_id)
+        insert_at = 0
+        for index, (chunk_id, _) in enumerate(chunks):
+            if chunk_id is not None and order.index(chunk_id) < position:
+                insert_at = index + 1
+            elif chunk_id is None and insert_at == index:
+                insert_at = index + 1  # Keep unknown trailing text with its section
+        
+        if insert_at and not chunks[insert_at - 1][1].endswith("\n"):
+            chunks[insert_at - 1] = (chunks[insert_at - 1][0], chunks[insert_at - 1][1] + "\n")
+        chunks.insert(insert_at, (section_id, f"{section_md}\n\n---\n\n"))
+        return "".join(chunk for _, chunk in chunks)
+    
+    @staticmethod
+    def format_prompt_item(index: int, item: Any, model: str = "gpt-4") -> str:
+        """One numbered item block of the prompt's content list"""
+        title = getattr(item, 'title', 'Untitled')
+        url = getattr(item, 'url', '#')
+        summary = getattr(item, 'summary', '') or ''
+        key_points = getattr(item, 'key_points', None) or []
+        image_url = getattr(item, 'image_url', '') or ''
+        
+        block = f"{index}. **{title}**\n"
+        block += f"   URL: {url}\n"
+        if key_points:
+            # Extracted at ingest: whole sentences, boilerplate already removed
+            block += "   Key points:\n" + "".join(f"   - {point}\n" for point in key_points)
+        elif summary:
+            block += f"   Summary: {truncate_to_tokens(summary, SUMMARY_TOKEN_LIMIT, model)}\n"
+        if image_url:
+            block += f"   Image: {image_url}\n"
+        return block + "\n"
+    
+    @staticmethod
+    def build_budgeted_prompt(
+        trending_items: List[Any],
+        voice_traits: List[str],
+        trending_keywords: List[Dict[str, Any]],
+        newsletter_title: Optional[str] = None,
+        topics: Optional[List[str]] = None,
+        input_token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+        model: str = "gpt-4"
+    ) -> Dict[str, Any]:
+        """
+        Build the generation prompt with as many items as fit the token budget.
+        
+        Items are taken in rank order until the next one would push the
+        system prefix plus prompt past ``input_token_budget`` (at least one
+        is always kept). Returns the prompt with the total token count.
+        """
+        def render(count: int) -> str:
+            return NewsletterTemplate.build_generation_prompt(
+                trending_items, voice_traits, trending_keywords,
+                newsletter_title=newsletter_title, topics=topics, max_items=count, model=model
+            )
+        
+        prefix_tokens = _system_prefix_tokens(TEMPLATE_VERSION, model)
+        used = prefix_tokens + count_tokens(render(0), model)
+        count = 0
+        for index, item in enumerate(trending_items, 1):
+            item_tokens = count_tokens(NewsletterTemplate.format_prompt_item(index, item, model), model)
+            if count and used + item_tokens > input_token_budget:
+                break
+            used += item_tokens
+            count += 1
+        
+        # Hero image URLs replace the fallbacks once items carry images, so
+        # re-count the rendered prompt and back off if that tipped it over
+        prompt = render(count)
+        prompt_tokens = prefix_tokens + count_tokens(prompt, model)
+        while count > 1 and prompt_tokens > input_token_budget:
+            count -= 1
+            prompt = render(count)
+            prompt_tokens = prefix_tokens + count_tokens(prompt, model)
+        
+        return {
+            "prompt": prompt,
+            "prompt_tokens": prompt_tokens,
+            "prefix_tokens": prefix_tokens,
+            "template_version": TEMPLATE_VERSION,
+            "items_included": count,
+            "items_available": len(trending_items),
+            "input_token_budget": input_token_budget,
+            "exact_token_count": exact_counts_available()
+        }
+    
+    @staticmethod
+    def build_generation_prompt(
+        trending_items: List[Any],
+        voice_traits: List[str],
+        trending_keywords: List[Dict[str, Any]],
+        newsletter_title: Optional[str] = None,
+        topics: Optional[List[str]] = None,
+        max_items: int = 5,
+        model: str = "gpt-4"
+    ) -> str:
+        """
+        Build the per-issue part of the generation prompt.
+        
+        The formatting instructions live in ``system_prefix()``; send both
+        with ``build_generation_messages``.
+        """
+        
+        # Format trending keywords
+        keywords_text = ", ".join([kw.get('keyword', '') for kw in trending_keywords[:5]])
+        if topics:
+            # Items arrive interleaved by topic; ask for picks that span them
+            keywords_text += f"\n(Feature at least one Top Pick from each topic: {', '.join(topics)})"
+        
+        # Format trending items with enhanced image handling
+        items_text = ""
+        hero_images = []  # Collect potential hero images
+        
+        for i, item in enumerate(trending_items[:max_items], 1):
+            image_url = getattr(item, 'image_url', '') or ''
+            items_text += NewsletterTemplate.format_prompt_item(i, item, model)
+            # Collect high-quality images for potential hero use
+            if i <= 3 and image_url:  # Use top 3 items' images as hero candidates
+                hero_images.append(image_url)
+        
+        # Build voice description
+        voice_description = "Professional, engaging, and informative" if not voice_traits else ", ".join(voice_traits)
+        
+        # Build the comprehensive prompt based on sample format
+        hero_image_1 = hero_images[0] if hero_images else 'https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=800&h=400&fit=crop&crop=center'
+        hero_image_2 = hero_images[1] if len(hero_images) > 1 else 'https://images.unsplash.com/photo-1551288049-bebda4e38f71?w=800&h=400&fit=crop&crop=center'
+        hero_image_3 = hero_images[2] if len(hero_images) > 2 else 'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=400&fit=crop&crop=center'
+        
+        prompt = f"""**Newsletter Title:** {newsletter_title or "Weekly Tech Newsletter"}
+
+**Writing Style/Voice:**
+{voice_description}
+
+**Trending Topics to Cover:**
+{keywords_text}
+
+**Top Content to Feature:**
+{items_text}
+**Hero Images (for [HERO IMAGE 1-3] in Top Picks):**
+1. {hero_image_1}
+2. {hero_image_2}
+3. {hero_image_3}
+
+{GENERATE_INSTRUCTION}"""
         
         return prompt
     
@@ -318,47 +604,34 @@ Generate the newsletter now:"""
     
     @staticmethod
     def parse_newsletter_sections(content: str) -> Dict[str, str]:
-        """Parse newsletter content into standardized sections"""
-        sections = {
-            "executive_summary": "",
-            "introduction": "",
-            "top_picks": "",
-            "trends_to_watch": "",
-            "did_you_know": "",
-            "by_the_numbers": "",
-            "closing": "",
-            "raw_content": content
-        }
-        
-        # Define section patterns
-        section_patterns = {
-            "executive_summary": r"##\s*📝\s*Executive Summary\s*\n([\s\S]*?)(?=\n##|$)",
-            "introduction": r"##\s*Introduction\s*\n([\s\S]*?)(?=\n##|$)",
-            "top_picks": r"##\s*🔥\s*Top Picks\s*\n([\s\S]*?)(?=\n##|$)",
-            "trends_to_watch": r"##\s*📈\s*Trends to Watch\s*\n([\s\S]*?)(?=\n##|$)",
-            "did_you_know": r"##\s*💡\s*Did You Know\?\s*\n([\s\S]*?)(?=\n##|$)",
-            "by_the_numbers": r"##\s*📊\s*By The Numbers\s*\n([\s\S]*?)(?=\n##|$)",
-            "closing": r"##\s*Closing\s*\n([\s\S]*?)(?=\n##|$)"
-        }
+        """Parse newsletter content into the standard sections (keyed by section id)"""
+        sections = {section["id"]: "" for section in NewsletterTemplate.get_standard_sections()}
         
-        # Extract sections
-        for section_id, pattern in section_patterns.items():
-            match = re.search(pattern, content, re.IGNORECASE | re.MULTILINE)
-            if match:
-                sections[section_id] = match.group(1).strip()
+        for section_id, chunk in NewsletterTemplate.split_sections(content):
+            if section_id is None or sections[section_id]:
+                continue
+            if section_id == "header":
+                sections[section_id] = chunk.strip()
+            else:
+                # Body without the header line or trailing separator
+                body = chunk.split("\n", 1)[1] if "\n" in chunk else ""
+                sections[section_id] = re.sub(r"(?:\n\s*-{3,}\s*)+$", "", body.strip()).strip()
         
+        sections["raw_content"] = content
         return sections
     
     @staticmethod
     def validate_newsletter_structure(content: str) -> Dict[str, Any]:
         """Validate that newsletter has required sections"""
         sections = NewsletterTemplate.parse_newsletter_sections(content)
-        required_sections = ["executive_summary", "introduction", "top_picks", "trends_to_watch", "closing"]
+        required_sections = [
+            section["id"] for section in NewsletterTemplate.get_standard_sections() if section["required"]
+        ]
         
         validation_result = {
             "is_valid": True,
             "missing_sections": [],
-            "section_count": len([s for s in sections.values() if s.strip()]),
+            "section_count": len([v for k, v in sections.items() if k != "raw_content" and v.strip()]),
             "word_count": len(content.split()),
             "has_images": bool(re.search(r'!\[.*?\]\(.*?\)', content)),
             "has_links": bool(re.search(r'\[.*?\]\(.*?\)', content))
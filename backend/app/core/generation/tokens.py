@@ -0,0 +1,96 @@
+"""
+Token counting and cost estimation for LLM prompts
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Average characters per token for English text, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Per-message framing tokens in the chat format, plus the reply primer
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# USD per 1K tokens (input, output) and context window per model
+MODEL_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+}
+
+
+def exact_counts_available() -> bool:
+    return tiktoken is not None
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Tokens in ``text`` for ``model`` (exact with tiktoken, else estimated)"""
+    if not text:
+        return 0
+    if tiktoken is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(_encoding(model).encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens, marking the cut with '...'"""
+    if not text or max_tokens <= 0:
+        return ""
+    if tiktoken is None:
+        limit = max_tokens * CHARS_PER_TOKEN
+        return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+    tokens = _encoding(model).encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _encoding(model).decode(tokens[:max_tokens]).rstrip() + "..."
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-4") -> int:
+    """Prompt tokens a chat request is billed for"""
+    return sum(
+        TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "", model)
+        for message in messages
+    ) + TOKENS_PER_REPLY
+
+
+def estimate_cost(
+    prompt_tokens: int,
+    completion_tokens: int,
+    model: str = "gpt-4"
+) -> Optional[Dict[str, Any]]:
+    """USD cost of a call, or None for models without known pricing"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    input_cost = prompt_tokens / 1000 * pricing[0]
+    output_cost = completion_tokens / 1000 * pricing[1]
+    return {
+        "input_usd": round(input_cost, 5),
+        "output_usd": round(output_cost, 5),
+        "total_usd": round(input_cost + output_cost, 5)
+    }
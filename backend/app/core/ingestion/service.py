@@ -11,6 +11,12 @@ import logging
 
 from app.core.database import get_supabase, get_user_supabase
 from app.models.schemas import Source, SourceCreate, Item, ItemCreate, SourceType
+from app.core.trends.keywords import keyword_engine
+from app.core.trends.cache import trending_cache
+from app.core.trends.coverage import coverage_index
+from app.core.trends.leaderboards import topic_leaderboards
+from app.core.trends.service import TrendService
+from app.core.ingestion.summarizer import summarize_batch, clean_text
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +26,9 @@ class IngestionService:
             self.supabase = get_user_supabase(jwt_token)
         else:
             self.supabase = get_supabase()
+        
+        # Scores new items for the per-topic leaderboards
+        self.trend_service = TrendService(jwt_token)
     
     async def process_feeds(self, source_ids: List[str], force_refresh: bool = False) -> Dict[str, Any]:
         """Process multiple feeds concurrently"""
@@ -106,7 +115,7 @@ class IngestionService:
                 if feed.bozo:
                     logger.warning(f"RSS feed parsing warning: {feed.bozo_exception}")
                 
-                new_items = 0
+                candidates = []
                 for entry in feed.entries[:20]:  # Limit to 20 most recent items
                     # Extract item data
                     item_data = {
@@ -119,16 +128,12 @@ class IngestionService:
                         "image_url": self._extract_image_from_rss(entry),
                         "image_alt": entry.get("title", "")  # Use title as alt text
                     }
-                    
-                    # Check if item already exists
-                    existing = self.supabase.table("items").select("id").eq("url", item_data["url"]).execute()
-                    if existing.data:
-                        continue  # Skip duplicate
-                    
-                    # Insert new item
-                    result = self.supabase.table("items").insert(item_data).execute()
-                    if result.data:
-                        new_items += 1
+                    candidates.append((item_data, self._entry_text(entry)))
+                
+                new_items = await self._store_new_items(source, candidates)
+                
+                if new_items:
+                    trending_cache.invalidate_user(source["user_id"])
                 
                 # Update source last_fetched_at timestamp
                 self.supabase.table("sources").update({
@@ -161,7 +166,7 @@ class IngestionService:
                 # Parse RSS feed (YouTube uses standard RSS)
                 feed = feedparser.parse(response.text)
                 
-                new_items = 0
+                candidates = []
                 for entry in feed.entries[:10]:  # Limit to 10 most recent videos
                     # Extract video ID from URL and generate thumbnail
                     video_id = self._extract_youtube_video_id(entry.get("link", ""))
@@ -177,16 +182,12 @@ class IngestionService:
                         "image_url": thumbnail_url,
                         "image_alt": f"Thumbnail for {entry.get('title', '')}"
                     }
-                    
-                    # Check for duplicates
-                    existing = self.supabase.table("items").select("id").eq("url", item_data["url"]).execute()
-                    if existing.data:
-                        continue
-                    
-                    # Insert new item
-                    result = self.supabase.table("items").insert(item_data).execute()
-                    if result.data:
-                        new_items += 1
+                    candidates.append((item_data, self._entry_text(entry)))
+                
+                new_items = await self._store_new_items(source, candidates)
+                
+                if new_items:
+                    trending_cache.invalidate_user(source["user_id"])
                 
                 # Update source timestamp
                 self.supabase.table("sources").update({
@@ -204,6 +205,86 @@ class IngestionService:
         # For now, return a placeholder
         return {"new_items": 0, "message": "Twitter integration not yet implemented"}
     
+    async def _store_new_items(
+        self,
+        source: Dict[str, Any],
+        candidates: List[tuple]
+    ) -> int:
+        """
+        Insert the ``(item_data, full_text)`` candidates not stored yet.
+        
+        Key points are extracted once here, for the new items only, in the
+        summarizer's worker pool; generation prompts then quote them instead
+        of a truncated raw summary.
+        """
+        fresh = []
+        for item_data, text in candidates:
+            # Check if item already exists
+            existing = self.supabase.table("items").select("id").eq("url", item_data["url"]).execute()
+            if existing.data:
+                continue  # Skip duplicate
+            fresh.append((item_data, text))
+        
+        key_points = await summarize_batch([
+            {"title": item_data["title"], "text": text} for item_data, text in fresh
+        ])
+        
+        if fresh and source.get("topic"):
+            # Offer items to the topic board with the same weights and
+            # authority overrides the user's reads rank with
+            user_id = source["user_id"]
+            await self.trend_service.load_trend_weights(user_id)
+            self.trend_service.authority_overrides = await self.trend_service._load_authority_overrides(user_id)
+        
+        new_items = 0
+        for (item_data, _), points in zip(fresh, key_points):
+            if points:
+                item_data["key_points"] = points
+            
+            # Insert new item
+            result = self.supabase.table("items").insert(item_data).execute()
+            if result.data:
+                new_items += 1
+                self._index_new_item(item_data, result.data[0], source.get("topic"))
+        return new_items
+    
+    def _index_new_item(
+        self,
+        item_data: Dict[str, Any],
+        row: Optional[Dict[str, Any]] = None,
+        topic: Optional[str] = None
+    ) -> None:
+        """Feed a newly inserted item into the in-memory trend indexes"""
+        try:
+            keyword_engine.record_item(
+                item_data["user_id"],
+                item_data.get("title"),
+                item_data.get("summary"),
+                item_data.get("published_at")
+            )
+            coverage_index.record_item(
+                item_data["user_id"],
+                item_data.get("url"),
+                item_data.get("title"),
+                item_data.get("published_at")
+            )
+            if row and topic:
+                topic_leaderboards.record_item(
+                    item_data["user_id"], topic, Item(**row), self.trend_service._trend_score
+                )
+        except Exception as e:
+            # Indexing is best-effort; it must never fail an ingestion run
+            logger.warning(f"Failed to index item {item_data.get('url')}: {e}")
+    
+    def _entry_text(self, entry: Dict[str, Any]) -> str:
+        """Full plain text of an entry (content over summary) for key point extraction"""
+        content = entry.get("content") or []
+        if content and isinstance(content, list):
+            text = content[0].get("value", "")
+        else:
+            text = entry.get("summary", "") or entry.get("description", "")
+        return clean_text(text)
+    
     def _extract_summary(self, entry: Dict[str, Any]) -> str:
         """Extract summary from RSS entry"""
         # Try different fields for summary
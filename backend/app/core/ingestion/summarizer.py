@@ -0,0 +1,151 @@
+"""
+Extractive key-point summarizer for ingested items (CPU-only, no models)
+"""
+
+import asyncio
+import html
+import math
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import logging
+
+from app.core.trends.keywords import extract_terms
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_POINTS = 3
+MAX_POINT_CHARS = 240
+MIN_SENTENCE_WORDS = 5
+
+# PageRank damping and iterations for the sentence graph
+DAMPING = 0.85
+ITERATIONS = 30
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[A-Z0-9\"'(\[])")
+HTML_TAG = re.compile(r"<[^>]+>")
+
+# Feed footers and calls to action that carry no content
+BOILERPLATE = re.compile(
+    r"(appeared first on|continue reading|read more|read the full|click here|subscribe|"
+    r"sign up for|follow us|all rights reserved|the post .* appeared|\[…\]|\[\.\.\.\])",
+    re.IGNORECASE
+)
+
+
+def clean_text(text: str) -> str:
+    """Plain text from feed HTML: tags stripped, entities decoded, whitespace collapsed"""
+    text = html.unescape(HTML_TAG.sub(" ", text or ""))
+    return " ".join(text.split())
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+def _tfidf_vectors(sentences: List[List[str]]) -> List[Dict[str, float]]:
+    document_frequency = Counter(term for terms in sentences for term in set(terms))
+    count = len(sentences)
+    vectors = []
+    for terms in sentences:
+        frequencies = Counter(terms)
+        vector = {
+            term: (frequency / len(terms)) * math.log(1 + count / document_frequency[term])
+            for term, frequency in frequencies.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def _textrank(vectors: List[Dict[str, float]]) -> List[float]:
+    """PageRank over the cosine-similarity graph of sentences"""
+    count = len(vectors)
+    similarity = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            shared = vectors[i].keys() & vectors[j].keys()
+            if shared:
+                similarity[i][j] = similarity[j][i] = sum(vectors[i][t] * vectors[j][t] for t in shared)
+
+    out_weight = [sum(row) for row in similarity]
+    scores = [1.0 / count] * count
+    for _ in range(ITERATIONS):
+        scores = [
+            (1 - DAMPING) / count + DAMPING * sum(
+                similarity[j][i] / out_weight[j] * scores[j]
+                for j in range(count) if similarity[j][i] and out_weight[j]
+            )
+            for i in range(count)
+        ]
+    return scores
+
+
+def extract_key_points(text: str, title: str = "", max_points: int = MAX_KEY_POINTS) -> List[str]:
+    """
+    The ``max_points`` most central sentences of ``text``, in reading order.
+
+    Sentences are ranked with TextRank over TF-IDF vectors; overlap with
+    the title breaks ties towards on-topic sentences. Boilerplate and
+    fragments are dropped first, and sentences repeating the title are
+    skipped since the title is already in the prompt.
+    """
+    title_terms = set(extract_terms(title))
+    candidates = []
+    for sentence in split_sentences(clean_text(text)):
+        if len(sentence.split()) < MIN_SENTENCE_WORDS or BOILERPLATE.search(sentence):
+            continue
+        terms = extract_terms(sentence)
+        if not terms or (title_terms and set(terms) <= title_terms):
+            continue
+        candidates.append((sentence, terms))
+
+    if len(candidates) > max_points:
+        scores = _textrank(_tfidf_vectors([terms for _, terms in candidates]))
+        for index, (_, terms) in enumerate(candidates):
+            if title_terms:
+                scores[index] *= 1 + 0.5 * len(title_terms & set(terms)) / len(title_terms)
+        keep = sorted(sorted(range(len(candidates)), key=lambda i: -scores[i])[:max_points])
+        candidates = [candidates[i] for i in keep]
+
+    return [
+        sentence if len(sentence) <= MAX_POINT_CHARS else sentence[:MAX_POINT_CHARS].rsplit(" ", 1)[0] + "..."
+        for sentence, _ in candidates
+    ]
+
+
+def summarize_texts(documents: List[Dict[str, str]]) -> List[List[str]]:
+    """Key points for each ``{"title", "text"}``; runs inside a pool worker"""
+    return [extract_key_points(doc.get("text", ""), doc.get("title", "")) for doc in documents]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Created on first use so importing the app doesn't fork workers
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.getenv("SUMMARIZER_PROCESSES", "2")))
+    return _pool
+
+
+async def summarize_batch(documents: List[Dict[str, str]]) -> List[List[str]]:
+    """Key points for a batch of items, computed off the event loop in the worker pool"""
+    if not documents:
+        return []
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), summarize_texts, documents)
+    except Exception as e:
+        # Summaries are an optimisation; never fail ingestion over them
+        logger.warning(f"Key point extraction failed for {len(documents)} items: {e}")
+        return [[] for _ in documents]
+
+
+def shutdown_summarizer() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -8,7 +8,7 @@ import logging
 import re
 from collections import Counter
 
-from app.core.database import get_supabase, get_user_supabase
+from app.core.database import get_supabase, get_user_supabase, run_query
 
 logger = logging.getLogger(__name__)
 
@@ -303,7 +303,9 @@ class StyleService:
     async def get_voice_profile(self, user_id: str) -> Dict[str, Any]:
         """Get the current voice profile for a user."""
         try:
-            response = self.supabase.table('user_profiles').select('voice_traits, confidence, created_at, updated_at').eq('id', user_id).execute()
+            response = await run_query(
+                self.supabase.table('user_profiles').select('voice_traits, confidence, created_at, updated_at').eq('id', user_id)
+            )
             
             if not response.data:
                 return {
@@ -0,0 +1,135 @@
+"""
+Domain authority registry with reversed-label suffix trie lookup
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Any
+from urllib.parse import urlsplit
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTHORITY_FILE = os.path.join(os.path.dirname(__file__), "data", "domain_authority.json")
+
+# Score for domains the registry knows nothing about
+UNKNOWN_AUTHORITY = 0.5
+
+
+@dataclass(frozen=True)
+class DomainAuthority:
+    domain: Optional[str]
+    score: float
+    quality: bool = False
+
+
+UNKNOWN = DomainAuthority(domain=None, score=UNKNOWN_AUTHORITY)
+
+
+class _TrieNode:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.entry: Optional[DomainAuthority] = None
+
+
+class DomainAuthorityRegistry:
+    """
+    Authority scores keyed by domain, stored in a trie of reversed labels.
+
+    ``feeds.bbc.co.uk`` walks uk -> co -> bbc -> feeds and returns the deepest
+    node carrying an entry (``bbc.co.uk``), so any subdomain resolves to its
+    registered domain in O(labels).
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    @staticmethod
+    def _labels(domain: str):
+        return reversed(domain.lower().strip(".").split("."))
+
+    def register(self, domain: str, score: float, quality: bool = False) -> None:
+        """Add or replace the authority score for a domain and its subdomains"""
+        node = self._root
+        for label in self._labels(domain):
+            node = node.children.setdefault(label, _TrieNode())
+        node.entry = DomainAuthority(
+            domain=domain.lower().strip("."),
+            score=min(max(float(score), 0.0), 1.0),
+            quality=quality
+        )
+
+    def load_file(self, path: str) -> int:
+        """Register every domain listed in a JSON data file"""
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+
+        domains = data.get("domains", {})
+        for domain, spec in domains.items():
+            if isinstance(spec, dict):
+                self.register(domain, spec.get("score", UNKNOWN_AUTHORITY), spec.get("quality", False))
+            else:
+                self.register(domain, spec)
+        return len(domains)
+
+    @staticmethod
+    def host_of(url: Any) -> str:
+        """Hostname of a URL (accepts plain hosts and pydantic URL objects)"""
+        text = str(url or "")
+        if "//" not in text:
+            return text.split("/")[0].split(":")[0].lower()
+        return (urlsplit(text).hostname or "").lower()
+
+    def lookup(self, url: Any, overrides: Optional[Dict[str, float]] = None) -> DomainAuthority:
+        """
+        Resolve the authority of a URL or host.
+
+        ``overrides`` maps domains to per-user scores; they take precedence
+        over registry entries at the same or a shallower depth.
+        """
+        host = self.host_of(url)
+        if not host:
+            return UNKNOWN
+
+        labels = host.split(".")
+        best = UNKNOWN
+        node = self._root
+        for depth in range(len(labels) - 1, -1, -1):
+            node = node.children.get(labels[depth]) if node is not None else None
+            if node is not None and node.entry is not None:
+                best = node.entry
+            if overrides:
+                suffix = ".".join(labels[depth:])
+                if suffix in overrides:
+                    best = DomainAuthority(
+                        domain=suffix,
+                        score=min(max(float(overrides[suffix]), 0.0), 1.0),
+                        quality=best.quality if best.domain == suffix else False
+                    )
+            if node is None and not overrides:
+                break
+
+        return best
+
+
+def _build_default_registry() -> DomainAuthorityRegistry:
+    registry = DomainAuthorityRegistry()
+    registry.load_file(DEFAULT_AUTHORITY_FILE)
+
+    # Deployments can extend or override the bundled list with their own file
+    extra_file = os.getenv("DOMAIN_AUTHORITY_FILE")
+    if extra_file:
+        try:
+            count = registry.load_file(extra_file)
+            logger.info(f"Loaded {count} domain authority entries from {extra_file}")
+        except Exception as e:
+            logger.error(f"Failed to load domain authority file {extra_file}: {e}")
+
+    return registry
+
+
+# Loaded once per process
+authority_registry = _build_default_registry()
@@ -0,0 +1,185 @@
+"""
+Batch trend score recalculation across all users
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+USER_PAGE_SIZE = 1000
+
+
+def load_checkpoint(checkpoint_dir: str) -> Set[str]:
+    """User IDs already rescored by a previous (possibly interrupted) run"""
+    done: Set[str] = set()
+    if not os.path.isdir(checkpoint_dir):
+        return done
+
+    for name in os.listdir(checkpoint_dir):
+        if not name.endswith(".jsonl"):
+            continue
+        with open(os.path.join(checkpoint_dir, name), encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn final line from a crash mid-write
+                if record.get("status") == "done":
+                    done.add(record["user_id"])
+    return done
+
+
+def clear_checkpoint(checkpoint_dir: str) -> None:
+    if not os.path.isdir(checkpoint_dir):
+        return
+    for name in os.listdir(checkpoint_dir):
+        if name.endswith(".jsonl"):
+            os.remove(os.path.join(checkpoint_dir, name))
+
+
+def shard_users(user_ids: Iterable[str], shards: int) -> List[List[str]]:
+    """Round-robin users into at most ``shards`` non-empty lists"""
+    buckets: List[List[str]] = [[] for _ in range(max(shards, 1))]
+    for index, user_id in enumerate(user_ids):
+        buckets[index % len(buckets)].append(user_id)
+    return [bucket for bucket in buckets if bucket]
+
+
+async def list_user_ids() -> List[str]:
+    """Every user with a profile, paged so large tenants don't hit row limits"""
+    from app.core.database import get_supabase
+
+    supabase = get_supabase()
+    user_ids: List[str] = []
+    start = 0
+    while True:
+        result = supabase.table("user_profiles").select("id").order("id").range(
+            start, start + USER_PAGE_SIZE - 1
+        ).execute()
+        rows = result.data or []
+        user_ids.extend(row["id"] for row in rows)
+        if len(rows) < USER_PAGE_SIZE:
+            return user_ids
+        start += USER_PAGE_SIZE
+
+
+def _rescore_user(user_id: str, page_size: int) -> Dict[str, Any]:
+    from app.core.trends.service import TrendService
+
+    # Each thread drives its own event loop; the Supabase client is shared
+    return asyncio.run(TrendService().recalculate_all_scores(user_id, page_size))
+
+
+def rescore_shard(
+    shard_index: int,
+    user_ids: List[str],
+    checkpoint_dir: str,
+    db_concurrency: int,
+    page_size: int
+) -> Dict[str, Any]:
+    """
+    Worker process entry point: rescore one shard of users.
+
+    At most ``db_concurrency`` users are in flight at once. Each finished
+    user is appended to the shard's checkpoint file and flushed, so a crash
+    loses at most the users that were mid-flight.
+    """
+    from app.core.database import get_supabase, init_db
+    from app.core.trends.coverage import warm_coverage_index
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(init_db(use_service_role=True))
+    # Score with the same cross-source coverage the API ranks with
+    asyncio.run(warm_coverage_index(get_supabase()))
+
+    summary = {"shard": shard_index, "users": 0, "failed": 0, "items": 0}
+    path = os.path.join(checkpoint_dir, f"shard-{shard_index}.jsonl")
+
+    with open(path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=db_concurrency) as pool:
+        futures = {pool.submit(_rescore_user, user_id, page_size): user_id for user_id in user_ids}
+        for future in as_completed(futures):
+            user_id = futures[future]
+            try:
+                result = future.result()
+                record = {"user_id": user_id, "status": "done", "items": result["items_processed"]}
+                summary["users"] += 1
+                summary["items"] += result["items_processed"]
+            except Exception as e:
+                logger.error(f"Error rescoring user {user_id}: {e}")
+                record = {"user_id": user_id, "status": "failed", "error": str(e)}
+                summary["failed"] += 1
+
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+    return summary
+
+
+def run_batch(
+    user_ids: List[str],
+    checkpoint_dir: str,
+    processes: int = 4,
+    db_concurrency: int = 4,
+    page_size: int = 500,
+    resume: bool = True
+) -> Dict[str, Any]:
+    """
+    Rescore ``user_ids`` across a process pool and report throughput.
+
+    Users recorded as done in ``checkpoint_dir`` are skipped when resuming.
+    The checkpoint is cleared once every user has been rescored, so the
+    next scheduled run starts from scratch instead of skipping everyone.
+    """
+    from app.core.trends.service import RECALC_PAGE_SIZE
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    if not resume:
+        clear_checkpoint(checkpoint_dir)
+
+    done = load_checkpoint(checkpoint_dir)
+    pending = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in done]
+    shards = shard_users(pending, processes)
+
+    totals = {"users": 0, "failed": 0, "items": 0, "skipped": len(set(user_ids)) - len(pending)}
+    start = time.perf_counter()
+    crashed_shards = 0
+
+    if shards:
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            futures = [
+                pool.submit(
+                    rescore_shard, index, shard, checkpoint_dir,
+                    db_concurrency, page_size or RECALC_PAGE_SIZE
+                )
+                for index, shard in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # A dead worker's finished users are still checkpointed
+                    logger.error(f"Shard worker failed: {e}")
+                    crashed_shards += 1
+                    continue
+                for key in ("users", "failed", "items"):
+                    totals[key] += summary[key]
+
+    elapsed = time.perf_counter() - start
+    totals["complete"] = not totals["failed"] and not crashed_shards
+    if totals["complete"]:
+        clear_checkpoint(checkpoint_dir)
+    totals["seconds"] = round(elapsed, 2)
+    totals["items_per_second"] = round(totals["items"] / elapsed, 1) if elapsed > 0 else 0.0
+    return totals
+
+
+def default_checkpoint_dir() -> str:
+    return os.getenv("RECALC_CHECKPOINT_DIR", ".recalc_checkpoint")
@@ -0,0 +1,77 @@
+"""
+Per-user cache of computed trending rankings and analysis metadata
+"""
+
+import os
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+
+
+class TrendingCache:
+    """
+    Caches trending rankings per (user, time window, variant).
+
+    Only the largest ranking computed for a window is kept: a request for a
+    smaller limit is served as a prefix of it, so the dashboard's top-20 and
+    a generation's top-5 share one computation. Entries are dropped when
+    ingestion inserts new items for the user, or when their TTL lapses.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 512):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def _ranking_key(user_id: str, time_window_hours: int, variant: Tuple) -> Tuple:
+        return ("ranking", user_id, time_window_hours) + tuple(variant)
+
+    def get_ranking(
+        self,
+        user_id: str,
+        time_window_hours: int,
+        limit: int,
+        variant: Tuple = ()
+    ) -> Optional[List[Any]]:
+        entry = self._cache.get(self._ranking_key(user_id, time_window_hours, variant))
+        if entry is None:
+            return None
+
+        cached_limit, items = entry
+        if cached_limit < limit:
+            return None
+        return list(items[:limit])
+
+    def set_ranking(
+        self,
+        user_id: str,
+        time_window_hours: int,
+        limit: int,
+        items: List[Any],
+        variant: Tuple = ()
+    ) -> None:
+        key = self._ranking_key(user_id, time_window_hours, variant)
+        existing = self._cache.peek(key)
+        if existing is not None and existing[0] > limit:
+            return  # Keep the larger ranking; it already covers this limit
+        self._cache.set(key, (limit, list(items)))
+
+    def get(self, key: Hashable) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._cache.set(key, value)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Forget everything computed for a user (called after ingestion)"""
+        return self._cache.invalidate_where(
+            lambda key: isinstance(key, tuple) and len(key) > 1 and key[1] == user_id
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+trending_cache = TrendingCache(
+    ttl_seconds=float(os.getenv("TRENDING_CACHE_TTL_SECONDS", "300")),
+    max_entries=int(os.getenv("TRENDING_CACHE_MAX_ENTRIES", "512"))
+)
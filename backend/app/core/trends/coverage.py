@@ -0,0 +1,217 @@
+"""
+Cross-source coverage index: how many independent publishers and users
+are covering the same story right now
+"""
+
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from app.core.trends.keywords import extract_terms
+from app.core.trends.authority import DomainAuthorityRegistry
+
+logger = logging.getLogger(__name__)
+
+# Distinct publishers at which a story counts as fully "everywhere"
+COVERAGE_SATURATION = 5
+
+# Neutral component value used until the index covers its whole window
+NEUTRAL_COVERAGE = 0.5
+
+# Most recent items read when warming the index from the database
+COVERAGE_WARM_LIMIT = 20000
+WARM_PAGE_SIZE = 1000
+
+
+def story_keys(title: Optional[str]) -> List[str]:
+    """Key terms identifying a story: title bigrams, or unigrams for one-word titles"""
+    terms = extract_terms(title or "")
+    bigrams = [term for term in terms if " " in term]
+    return list(dict.fromkeys(bigrams or terms))
+
+
+class _KeyBucket:
+    __slots__ = ("publishers", "users")
+
+    def __init__(self):
+        self.publishers: Set[str] = set()
+        self.users: Set[str] = set()
+
+
+class CoverageIndex:
+    """
+    Sliding-window counts of distinct publishers and users per story key.
+
+    Counts are kept in hourly buckets per key and updated at ingest time.
+    A lookup reads a constant number of buckets for each of an item's few
+    title keys, so scoring stays O(1) per item regardless of item volume.
+
+    Until the index is warm - rebuilt from the database, or running for a
+    whole retention period so it has seen every item in it - scores are
+    neutral, so a restart doesn't turn every story's coverage to zero.
+    """
+
+    def __init__(self, window_hours: int = 6):
+        self.window_hours = window_hours
+        self.retention_hours = 2 * window_hours
+        self._keys: Dict[str, Dict[int, _KeyBucket]] = {}
+        self._keys_by_hour: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._warmed = False
+
+    def is_warm(self) -> bool:
+        return self._warmed or time.monotonic() - self._started >= self.retention_hours * 3600
+
+    def warm(self, items: List[Dict[str, Any]]) -> None:
+        """Record items from before this process started (``user_id``, ``url``, ``title``, ``published_at``)"""
+        # Counts are sets, so items also seen at ingest aren't double counted
+        for item in items:
+            self.record_item(item["user_id"], item.get("url"), item.get("title"), item.get("published_at"))
+        self._warmed = True
+
+    @staticmethod
+    def _hour(timestamp: Optional[Any] = None) -> int:
+        if timestamp is None:
+            moment = datetime.now(timezone.utc)
+        elif isinstance(timestamp, str):
+            moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        else:
+            moment = timestamp
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return int(moment.timestamp() // 3600)
+
+    def _expire(self, now_hour: int) -> None:
+        oldest = now_hour - self.retention_hours
+        for hour in [h for h in self._keys_by_hour if h <= oldest]:
+            for key in self._keys_by_hour.pop(hour):
+                buckets = self._keys.get(key)
+                if buckets is None:
+                    continue
+                buckets.pop(hour, None)
+                if not buckets:
+                    del self._keys[key]
+
+    def record_item(
+        self,
+        user_id: str,
+        url: Any,
+        title: Optional[str],
+        published_at: Optional[Any] = None
+    ) -> None:
+        """Register one newly ingested item"""
+        now_hour = self._hour()
+        try:
+            hour = min(self._hour(published_at), now_hour) if published_at else now_hour
+        except (TypeError, ValueError):
+            hour = now_hour
+        if hour <= now_hour - self.retention_hours:
+            return
+
+        publisher = DomainAuthorityRegistry.host_of(url)
+        if publisher.startswith("www."):
+            publisher = publisher[4:]
+
+        with self._lock:
+            for key in story_keys(title):
+                bucket = self._keys.setdefault(key, {}).get(hour)
+                if bucket is None:
+                    bucket = _KeyBucket()
+                    self._keys[key][hour] = bucket
+                    self._keys_by_hour.setdefault(hour, set()).add(key)
+                bucket.publishers.add(publisher)
+                bucket.users.add(user_id)
+            self._expire(now_hour)
+
+    def _window_counts(self, buckets: Dict[int, _KeyBucket], start: int, end: int) -> Tuple[int, int]:
+        publishers: Set[str] = set()
+        users: Set[str] = set()
+        for hour in range(start + 1, end + 1):
+            bucket = buckets.get(hour)
+            if bucket is not None:
+                publishers |= bucket.publishers
+                users |= bucket.users
+        return len(publishers), len(users)
+
+    def coverage(self, title: Optional[str]) -> Dict[str, Any]:
+        """Current and previous-window coverage of the best-covered title key"""
+        now_hour = self._hour()
+        current_start = now_hour - self.window_hours
+        best = {"publishers": 0, "users": 0, "previous_publishers": 0}
+
+        with self._lock:
+            for key in story_keys(title):
+                buckets = self._keys.get(key)
+                if not buckets:
+                    continue
+                publishers, users = self._window_counts(buckets, current_start, now_hour)
+                if publishers > best["publishers"]:
+                    previous, _ = self._window_counts(
+                        buckets, current_start - self.window_hours, current_start
+                    )
+                    best = {"publishers": publishers, "users": users, "previous_publishers": previous}
+
+        return best
+
+    def coverage_score(self, title: Optional[str]) -> float:
+        """
+        Normalised coverage velocity in [0, 1].
+
+        Breadth (distinct publishers, saturating at COVERAGE_SATURATION) is
+        scaled by growth versus the previous window, with a small lift for
+        stories that several users' feeds picked up independently.
+        """
+        if not self.is_warm():
+            return NEUTRAL_COVERAGE
+
+        counts = self.coverage(title)
+        publishers = counts["publishers"]
+        if publishers == 0:
+            return 0.0
+
+        breadth = 1 - math.exp(-publishers / (COVERAGE_SATURATION / 2))
+        previous = counts["previous_publishers"]
+        growth = (publishers - previous) / (publishers + previous)  # in [-1, 1]
+        user_lift = min(counts["users"] - 1, 4) * 0.05
+
+        return min(max(breadth * (0.5 + 0.5 * growth) + user_lift, 0.0), 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"keys": len(self._keys), "hours": len(self._keys_by_hour), "warm": self.is_warm()}
+
+
+async def warm_coverage_index(supabase: Any, index: Optional["CoverageIndex"] = None) -> int:
+    """
+    Load every user's items from the index's retention window into it.
+
+    Needs a client that can read all users' items (service role); returns
+    the number of items loaded.
+    """
+    from app.core.database import apply_keyset, run_query
+
+    index = index or coverage_index
+    since = datetime.now(timezone.utc) - timedelta(hours=index.retention_hours)
+    items: List[Dict[str, Any]] = []
+    cursor = None
+    while len(items) < COVERAGE_WARM_LIMIT:
+        query = supabase.table("items").select("id, user_id, url, title, published_at").gte(
+            "published_at", since.isoformat()
+        )
+        page = (await run_query(apply_keyset(query, "published_at", cursor).limit(WARM_PAGE_SIZE))).data or []
+        items.extend(page)
+        if len(page) < WARM_PAGE_SIZE:
+            break
+        cursor = (page[-1]["published_at"], page[-1]["id"])
+
+    index.warm(items)
+    logger.info(f"Warmed coverage index with {len(items)} items")
+    return len(items)
+
+
+# Process-wide index fed by ingestion and read by trend scoring
+coverage_index = CoverageIndex()
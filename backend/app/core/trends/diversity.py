@@ -0,0 +1,92 @@
+"""
+Diversity-aware re-ranking: maximal marginal relevance over TF-IDF vectors
+"""
+
+import math
+from collections import Counter
+from typing import List, Dict, Sequence
+
+from app.core.trends.keywords import extract_terms
+
+SparseVector = Dict[str, float]
+
+
+def build_tfidf_vectors(texts: Sequence[str]) -> List[SparseVector]:
+    """L2-normalised sparse TF-IDF vectors for a batch of documents"""
+    term_counts = [Counter(extract_terms(text)) for text in texts]
+
+    document_frequency: Counter = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+
+    total = len(texts)
+    vectors = []
+    for counts in term_counts:
+        vector = {
+            term: (1 + math.log(count)) * math.log((1 + total) / (1 + document_frequency[term]) + 1)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {term: weight / norm for term, weight in vector.items()}
+        vectors.append(vector)
+
+    return vectors
+
+
+def cosine_similarity(a: SparseVector, b: SparseVector) -> float:
+    """Dot product of two normalised sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def mmr_select(
+    relevance: Sequence[float],
+    vectors: Sequence[SparseVector],
+    k: int,
+    lambda_: float = 0.7
+) -> List[int]:
+    """
+    Pick k indexes by maximal marginal relevance.
+
+    Each step takes the candidate maximising
+    ``lambda_ * relevance - (1 - lambda_) * max_similarity_to_selected``.
+    The running max similarity is updated only against the newest pick, so
+    the whole selection costs O(k * n) sparse dot products.
+    """
+    remaining = set(range(len(relevance)))
+    max_similarity = [0.0] * len(relevance)
+    selected: List[int] = []
+
+    while remaining and len(selected) < k:
+        best = max(
+            remaining,
+            key=lambda i: (lambda_ * relevance[i] - (1 - lambda_) * max_similarity[i], -i)
+        )
+        selected.append(best)
+        remaining.discard(best)
+        for i in remaining:
+            similarity = cosine_similarity(vectors[best], vectors[i])
+            if similarity > max_similarity[i]:
+                max_similarity[i] = similarity
+
+    return selected
+
+
+def diversify(items: List, k: int, diversity: float) -> List:
+    """
+    Re-rank scored items so near-duplicate stories don't crowd the top k.
+
+    ``diversity`` is in [0, 1]: 0 keeps the pure score order, higher values
+    trade relevance for novelty (MMR lambda = 1 - diversity).
+    """
+    if diversity <= 0 or len(items) <= 1:
+        return items[:k]
+
+    texts = [f"{item.title or ''}. {item.summary or ''}" for item in items]
+    vectors = build_tfidf_vectors(texts)
+    relevance = [item.trend_score or 0.0 for item in items]
+
+    order = mmr_select(relevance, vectors, k, lambda_=1.0 - min(diversity, 1.0))
+    return [items[i] for i in order]
@@ -0,0 +1,302 @@
+"""
+Streaming trending-keyword engine with hourly buckets and velocity
+"""
+
+import hashlib
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Words that never make a useful trending keyword on their own
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for from
+further get gets got had has have having he her here hers him his how i if in into is it its
+itself just let like make makes many may me might more most much must my new news no nor not
+now of off on once one only or other our out over own said same says she should so some such
+than that the their them then there these they this those through to too under until up upon
+us use using very via was we were what when where which while who whom why will with within
+without would year years you your week today first last next more amp quot nbsp http https www
+com read full story continue reading
+""".split())
+
+# Lowercase tokens: words, numbers with letters (5g, gpt-4), and tech spellings (c++, c#)
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#'\-]*[a-z0-9+#]|[a-z]")
+
+
+# Bigrams never span punctuation that separates clauses
+PHRASE_BREAK = re.compile(r"[.,;:!?|()\[\]\n\"]+")
+
+
+def extract_terms(text: str) -> List[str]:
+    """Extract candidate keywords (unigrams and bigrams) from free text"""
+    terms = []
+    for phrase in PHRASE_BREAK.split((text or "").lower()):
+        previous = None
+        for token in TOKEN_PATTERN.findall(phrase):
+            token = token.strip("'-")
+            if len(token) < 2 or token in STOPWORDS or token.isdigit():
+                previous = None
+                continue
+            terms.append(token)
+            if previous:
+                terms.append(f"{previous} {token}")
+            previous = token
+
+    return terms
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch with conservative updates"""
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        # One flat array of 16-bit counters keeps a bucket at width * depth * 2 bytes
+        self._table = array('H', bytes(2 * width * depth))
+
+    def _indexes(self, term: str) -> List[int]:
+        # Kirsch-Mitzenmacher double hashing from one 64-bit digest. Not the
+        # built-in hash(), which is salted per process (PYTHONHASHSEED)
+        h = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, term: str, count: int = 1) -> int:
+        """Add occurrences of a term and return its new estimated count"""
+        indexes = self._indexes(term)
+        estimate = min(self._table[i] for i in indexes) + count
+        estimate = min(estimate, 0xFFFF)
+        for i in indexes:
+            if self._table[i] < estimate:
+                self._table[i] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, term: str) -> int:
+        """Estimated count for a term (never underestimates)"""
+        return min(self._table[i] for i in self._indexes(term))
+
+
+class _HourBucket:
+    """Sketch plus heavy-hitter candidates for one hour of one user's items"""
+
+    __slots__ = ("sketch", "top")
+
+    def __init__(self, width: int, depth: int):
+        self.sketch = CountMinSketch(width, depth)
+        self.top: Dict[str, int] = {}
+
+    def add(self, term: str, top_k: int) -> None:
+        self.sketch.add(term)
+        top = self.top
+        if term in top:
+            top[term] += 1
+        elif len(top) < top_k:
+            top[term] = 1
+        else:
+            # Space-Saving: a newcomer always takes the weakest slot with its
+            # count + 1, so a common term arriving after the set fills up
+            # isn't shut out by whichever terms happened to come first
+            weakest = min(top, key=top.get)
+            top[term] = top.pop(weakest) + 1
+
+
+class KeywordTrendEngine:
+    """
+    Per-user trending keyword counts kept in hourly buckets.
+
+    Each bucket holds a count-min sketch and a top-K candidate set, so memory
+    per user is bounded by the retention window rather than by item volume,
+    and a query only touches the K candidates of each bucket in the window.
+    """
+
+    def __init__(
+        self,
+        retention_hours: int = 96,
+        top_k: int = 64,
+        sketch_width: int = 1024,
+        sketch_depth: int = 4,
+        max_users: int = 1000
+    ):
+        self.retention_hours = retention_hours
+        self.top_k = top_k
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.max_users = max_users
+        self._users: "OrderedDict[str, Dict[int, _HourBucket]]" = OrderedDict()
+        # Users whose counts were rebuilt from the database; ingest alone
+        # only covers items seen since this process started
+        self._warmed: set = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hour(timestamp: Optional[Any] = None) -> int:
+        """Hour index (hours since epoch) for a datetime or ISO string"""
+        if timestamp is None:
+            moment = datetime.now(timezone.utc)
+        elif isinstance(timestamp, str):
+            moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        else:
+            moment = timestamp
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return int(moment.timestamp() // 3600)
+
+    def _user_buckets(self, user_id: str) -> Dict[int, _HourBucket]:
+        buckets = self._users.get(user_id)
+        if buckets is None:
+            buckets = {}
+            self._users[user_id] = buckets
+            if len(self._users) > self.max_users:
+                evicted, _ = self._users.popitem(last=False)
+                self._warmed.discard(evicted)
+        else:
+            self._users.move_to_end(user_id)
+        return buckets
+
+    def _expire(self, buckets: Dict[int, _HourBucket], now_hour: int) -> None:
+        oldest = now_hour - self.retention_hours
+        for hour in [h for h in buckets if h <= oldest]:
+            del buckets[hour]
+
+    def is_warm(self, user_id: str) -> bool:
+        """Whether the user's counts include their items from before this process started"""
+        with self._lock:
+            return user_id in self._warmed
+
+    def record_item(
+        self,
+        user_id: str,
+        title: Optional[str],
+        summary: Optional[str] = None,
+        published_at: Optional[Any] = None
+    ) -> None:
+        """Count the keywords of one newly ingested item"""
+        try:
+            now_hour = self._hour()
+            hour = min(self._hour(published_at), now_hour) if published_at else now_hour
+        except (TypeError, ValueError):
+            hour = now_hour = self._hour()
+
+        if hour <= now_hour - self.retention_hours:
+            return  # Too old to influence any supported window
+
+        terms = extract_terms(f"{title or ''}. {summary or ''}")
+        if not terms:
+            return
+
+        with self._lock:
+            buckets = self._user_buckets(user_id)
+            bucket = buckets.get(hour)
+            if bucket is None:
+                bucket = _HourBucket(self.sketch_width, self.sketch_depth)
+                buckets[hour] = bucket
+            # Count each term once per item so long summaries don't dominate
+            for term in dict.fromkeys(terms):
+                bucket.add(term, self.top_k)
+            self._expire(buckets, now_hour)
+
+    def rebuild_user(self, user_id: str, items: Iterable[Dict[str, Any]]) -> None:
+        """Replace a user's counts with the given items (cold-start warmup)"""
+        with self._lock:
+            self._users.pop(user_id, None)
+            self._user_buckets(user_id)
+            self._warmed.add(user_id)
+        for item in items:
+            self.record_item(
+                user_id,
+                item.get("title"),
+                item.get("summary"),
+                item.get("published_at")
+            )
+
+    def _window_counts(
+        self,
+        buckets: Dict[int, _HourBucket],
+        terms: Iterable[str],
+        start_hour: int,
+        end_hour: int
+    ) -> Dict[str, int]:
+        window = [b for h, b in buckets.items() if start_hour < h <= end_hour]
+        return {term: sum(b.sketch.estimate(term) for b in window) for term in terms}
+
+    def get_trending(
+        self,
+        user_id: str,
+        limit: int = 10,
+        time_window_hours: int = 24
+    ) -> List[Dict[str, Any]]:
+        """Top keywords in the current window with velocity against the previous one"""
+        window = max(1, min(time_window_hours, self.retention_hours // 2))
+        now_hour = self._hour()
+
+        with self._lock:
+            buckets = self._users.get(user_id)
+            if not buckets:
+                return []
+            self._expire(buckets, now_hour)
+
+            current_start = now_hour - window
+            candidates = set()
+            for hour, bucket in buckets.items():
+                if hour > current_start:
+                    candidates.update(bucket.top)
+
+            current = self._window_counts(buckets, candidates, current_start, now_hour)
+            previous = self._window_counts(buckets, candidates, current_start - window, current_start)
+
+        # On equal counts prefer the bigram: "machine learning" over "machine"
+        ranked = sorted(current.items(), key=lambda kv: (-kv[1], -kv[0].count(" "), kv[0]))
+        results = []
+        kept_words = []
+        for term, frequency in ranked:
+            # A bigram and its parts are redundant: keep whichever ranked first
+            words = set(term.split())
+            if any(words <= kept or kept <= words for kept in kept_words):
+                continue
+            kept_words.append(words)
+            velocity, trend = self._velocity(frequency, previous.get(term, 0))
+            results.append({
+                "keyword": term,
+                "frequency": frequency,
+                "trend": trend,
+                "velocity": velocity
+            })
+            if len(results) >= limit:
+                break
+
+        return results
+
+    @staticmethod
+    def _velocity(current: int, previous: int) -> Tuple[float, str]:
+        """Relative change between windows and its up/down/stable label"""
+        if previous == 0:
+            return (1.0, "up") if current > 0 else (0.0, "stable")
+        velocity = round((current - previous) / previous, 3)
+        if velocity > 0.2:
+            return velocity, "up"
+        if velocity < -0.2:
+            return velocity, "down"
+        return velocity, "stable"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bucket_count = sum(len(b) for b in self._users.values())
+        return {
+            "users": len(self._users),
+            "buckets": bucket_count,
+            "approx_memory_bytes": bucket_count * self.sketch_width * self.sketch_depth * 2
+        }
+
+
+# Process-wide engine shared by ingestion (writes) and trend analysis (reads)
+keyword_engine = KeywordTrendEngine()
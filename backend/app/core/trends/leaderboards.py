@@ -0,0 +1,153 @@
+"""
+Per-topic trending leaderboards kept fresh at ingest time
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.models.schemas import Item
+
+Scorer = Callable[[Item], float]
+
+
+def normalize_topic(topic: Optional[str]) -> Optional[str]:
+    topic = (topic or "").strip().lower()
+    return topic or None
+
+
+def _published_at(item: Item) -> datetime:
+    published_at = item.published_at
+    if isinstance(published_at, str):
+        published_at = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return published_at
+
+
+class _Board:
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        # item id -> (item, last computed score)
+        self.entries: Dict[str, Tuple[Item, float]] = {}
+
+
+class TopicLeaderboards:
+    """
+    Bounded top-K trending items per (user, topic).
+
+    Ingestion offers each new item to its source topic's board; a full
+    board keeps the item only if it beats the current minimum. Reads
+    rescore the K entries (scores decay with age) and sort them, so serving
+    a topic costs O(K) no matter how many items the user has.
+    """
+
+    def __init__(self, capacity: int = 50, retention_hours: int = 168, max_boards: int = 5000):
+        self.capacity = capacity
+        self.retention_hours = retention_hours
+        self.max_boards = max_boards
+        # Boards only ever exist once rebuilt from the database, so one
+        # never holds just the items ingested since a restart
+        self._boards: Dict[Tuple[str, str], _Board] = {}
+        self._lock = threading.Lock()
+
+    def is_warm(self, user_id: str, topic: str) -> bool:
+        """Whether the board has been built from the database (and not evicted since)"""
+        return (user_id, normalize_topic(topic)) in self._boards
+
+    def _expire(self, board: _Board) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+        for item_id in [i for i, (item, _) in board.entries.items() if _published_at(item) < cutoff]:
+            del board.entries[item_id]
+
+    def _offer(self, board: _Board, item: Item, scorer: Scorer) -> None:
+        score = scorer(item)
+        if item.id in board.entries or len(board.entries) < self.capacity:
+            board.entries[item.id] = (item, score)
+            return
+
+        # Full: refresh the stored scores (they decay with age) and evict
+        # the weakest entry if the newcomer beats it
+        for item_id, (entry, _) in board.entries.items():
+            board.entries[item_id] = (entry, scorer(entry))
+        weakest = min(board.entries, key=lambda item_id: board.entries[item_id][1])
+        if score > board.entries[weakest][1]:
+            del board.entries[weakest]
+            board.entries[item.id] = (item, score)
+
+    def record_item(self, user_id: str, topic: Optional[str], item: Item, scorer: Scorer) -> None:
+        """
+        Offer a newly ingested item to its topic board.
+
+        Items for a board that isn't warm are dropped: the warmup reads
+        them from the database along with everything older.
+        """
+        topic = normalize_topic(topic)
+        if topic is None or _published_at(item) < datetime.now(timezone.utc) - timedelta(hours=self.retention_hours):
+            return
+        with self._lock:
+            board = self._boards.get((user_id, topic))
+            if board is None:
+                return
+            self._expire(board)
+            self._offer(board, item, scorer)
+
+    def rebuild(self, user_id: str, topic: str, items: List[Item], scorer: Scorer) -> None:
+        """Replace a board with the best of ``items`` (cold start)"""
+        topic = normalize_topic(topic)
+        board = _Board()
+        scored = sorted(((scorer(item), item) for item in items), key=lambda pair: pair[0], reverse=True)
+        for score, item in scored[:self.capacity]:
+            board.entries[item.id] = (item, score)
+        with self._lock:
+            self._boards.pop((user_id, topic), None)
+            if len(self._boards) >= self.max_boards:
+                # Drop the oldest board; it is rebuilt from the DB on next read
+                self._boards.pop(next(iter(self._boards)))
+            self._boards[(user_id, topic)] = board
+
+    def top(
+        self,
+        user_id: str,
+        topic: str,
+        limit: int,
+        time_window_hours: int,
+        scorer: Scorer
+    ) -> Optional[List[Item]]:
+        """Highest-scoring items inside the window, or None if there is no board"""
+        with self._lock:
+            board = self._boards.get((user_id, normalize_topic(topic)))
+            if board is None:
+                return None
+            self._expire(board)
+
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
+            ranked = []
+            for item_id, (item, _) in board.entries.items():
+                score = scorer(item)
+                board.entries[item_id] = (item, score)
+                if _published_at(item) >= cutoff:
+                    ranked.append((score, item))
+
+        ranked.sort(key=lambda pair: pair[0], reverse=True)
+        return [item.model_copy(update={"trend_score": score}) for score, item in ranked[:limit]]
+
+    def topics(self, user_id: str) -> List[str]:
+        with self._lock:
+            return sorted(topic for board_user, topic in self._boards if board_user == user_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "boards": len(self._boards),
+                "entries": sum(len(board.entries) for board in self._boards.values()),
+                "capacity": self.capacity
+            }
+
+
+# Process-wide boards fed by ingestion and read by trend analysis
+topic_leaderboards = TopicLeaderboards(
+    capacity=int(os.getenv("TOPIC_LEADERBOARD_SIZE", "50"))
+)
@@ -4,46 +4,109 @@ Trend analysis service for content scoring and ranking
 
 import math
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import logging
 
-from app.core.database import get_supabase, get_user_supabase
+from postgrest.exceptions import APIError
+
+from app.core.database import get_supabase, get_user_supabase, run_query, apply_keyset, MISSING_FUNCTION_CODES
 from app.models.schemas import Item
+from app.core.trends.keywords import keyword_engine
+from app.core.trends.cache import trending_cache
+from app.core.trends.authority import authority_registry, DomainAuthority
+from app.core.trends.diversity import diversify
+from app.core.trends.coverage import coverage_index
+from app.core.trends.leaderboards import topic_leaderboards, normalize_topic
+from app.core.trends.weights import learned_weights, normalize_state, learn_from_reaction
 
 logger = logging.getLogger(__name__)
 
+# Default relative weight of each trend signal; must sum to 1. Users'
+# weights then drift from these as they react to drafts (see weights.py)
+TREND_WEIGHTS = {
+    "recency": 0.35,
+    "quality": 0.20,
+    "relevance": 0.20,
+    "authority": 0.10,
+    "engagement": 0.05,
+    "coverage": 0.10,  # Distinct publishers covering the story right now
+}
+
+# Keyset page size and the only columns scoring needs when rescoring in bulk
+RECALC_PAGE_SIZE = 500
+RECALC_COLUMNS = "id, source_id, title, url, summary, published_at, created_at, trend_score"
+
+# Most recent items scored when rebuilding a cold topic leaderboard
+TOPIC_WARM_LIMIT = 1000
+
+# Re-reads allowed when another request updates the same weights first
+WEIGHT_WRITE_ATTEMPTS = 5
+
 class TrendService:
     def __init__(self, jwt_token: str = None):
         if jwt_token:
             self.supabase = get_user_supabase(jwt_token)
         else:
             self.supabase = get_supabase()
+        
+        # Per-user domain authority overrides and learned signal weights,
+        # loaded alongside a ranking
+        self.authority_overrides: Dict[str, float] = {}
+        self.trend_weights: Dict[str, float] = TREND_WEIGHTS
     
     async def get_trending_items(
         self, 
         user_id: str, 
         time_window_hours: int = 48, 
-        limit: int = 20
+        limit: int = 20,
+        diversity: Optional[float] = None,
+        topic: Optional[str] = None
     ) -> List[Item]:
-        """Get trending items for a user within specified time window"""
+        """
+        Get trending items for a user within specified time window.
+        
+        With ``diversity`` > 0 the scored candidates are re-ranked by maximal
+        marginal relevance so near-duplicate stories don't fill the top slots.
+        With ``topic`` the ranking is served from that topic's leaderboard.
+        """
         try:
+            diversity = round(diversity or 0.0, 2)
+            if topic:
+                items = await self.get_topic_trending_items(
+                    user_id, topic, time_window_hours, limit * 4 if diversity > 0 else limit
+                )
+                return diversify(items, limit, diversity) if diversity > 0 else items
+            
+            cache_variant = ("diversity", diversity) if diversity > 0 else ()
+            cached = trending_cache.get_ranking(user_id, time_window_hours, limit, cache_variant)
+            if cached is not None:
+                return cached
+            
             # Get items from user's sources within time window
             from datetime import timezone
             cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
             
             # First get user's sources
-            sources_response = self.supabase.table("sources").select("id").eq("user_id", user_id).execute()
+            sources_response = await run_query(
+                self.supabase.table("sources").select("id").eq("user_id", user_id)
+            )
             source_ids = [source["id"] for source in sources_response.data]
             
             if not source_ids:
                 return []
             
+            self.authority_overrides = await self._load_authority_overrides(user_id)
+            await self.load_trend_weights(user_id)
+            
             # Then get items from those sources
-            response = self.supabase.table("items").select("*").in_(
+            response = await run_query(self.supabase.table("items").select("*").in_(
                 "source_id", source_ids
             ).gte(
                 "published_at", cutoff_time.isoformat()
-            ).order("published_at", desc=True).limit(limit * 2).execute()
+            ).order("published_at", desc=True).limit(
+                # Re-ranking needs a wider pool to find distinct stories
+                limit * 4 if diversity > 0 else limit * 2
+            ))
             
             # Convert trend_score to float if it's a string
             for item_data in response.data:
@@ -59,61 +122,147 @@ class TrendService:
             
             # Sort by trend score and return top items
             items.sort(key=lambda x: x.trend_score or 0, reverse=True)
+            if diversity > 0:
+                items = diversify(items, limit, diversity)
+            trending_cache.set_ranking(user_id, time_window_hours, limit, items[:limit], cache_variant)
             return items[:limit]
             
         except Exception as e:
             logger.error(f"Error getting trending items: {e}")
             raise
     
-    async def _calculate_trend_score(self, item: Item) -> float:
-        """Calculate comprehensive trend score for an item"""
+    async def get_items_by_ids(self, user_id: str, item_ids: List[str]) -> List[Item]:
+        """
+        The user's items with these IDs, in the order given, from one query.
+        
+        No trend scoring: ``trend_score`` is the stored value. IDs that don't
+        exist or belong to another user's sources are skipped.
+        """
         try:
-            # 1. Recency Score (40% weight)
-            # Handle both string and datetime types for published_at
-            if isinstance(item.published_at, str):
-                published_at = datetime.fromisoformat(item.published_at.replace('Z', '+00:00'))
-            else:
-                published_at = item.published_at
+            item_ids = list(dict.fromkeys(item_ids))
+            if not item_ids:
+                return []
             
-            # Make both datetimes timezone-aware for comparison
-            from datetime import timezone
-            now_utc = datetime.now(timezone.utc)
-            if published_at.tzinfo is None:
-                published_at = published_at.replace(tzinfo=timezone.utc)
-            
-            hours_ago = (now_utc - published_at).total_seconds() / 3600
-            
-            # Exponential decay with different time windows
-            if hours_ago <= 1:
-                recency_score = 1.0  # Very recent (last hour)
-            elif hours_ago <= 6:
-                recency_score = 0.9  # Recent (last 6 hours)
-            elif hours_ago <= 24:
-                recency_score = math.exp(-hours_ago / 12)  # Decay over 12 hours
-            elif hours_ago <= 72:
-                recency_score = math.exp(-hours_ago / 36)  # Decay over 36 hours
-            else:
-                recency_score = math.exp(-hours_ago / 168)  # Decay over 7 days
+            # Join on sources to scope the IDs to this user's items
+            response = await run_query(self.supabase.table("items").select(
+                "*, sources!inner(user_id)"
+            ).in_("id", item_ids).eq("sources.user_id", user_id))
             
-            # 2. Content Quality Score (25% weight)
-            quality_score = self._calculate_content_quality(item)
+            by_id = {}
+            for item_data in response.data:
+                item_data.pop("sources", None)
+                if isinstance(item_data.get("trend_score"), str):
+                    item_data["trend_score"] = float(item_data["trend_score"])
+                by_id[item_data["id"]] = Item(**item_data)
             
-            # 3. Keyword Relevance Score (20% weight)
-            relevance_score = self._calculate_keyword_relevance(item)
+            missing = [item_id for item_id in item_ids if item_id not in by_id]
+            if missing:
+                logger.warning(f"{len(missing)} requested items not found for user {user_id}")
             
-            # 4. Source Authority Score (10% weight)
-            authority_score = self._calculate_source_authority(item)
+            return [by_id[item_id] for item_id in item_ids if item_id in by_id]
             
-            # 5. Engagement Prediction Score (5% weight)
-            engagement_score = self._predict_engagement(item)
+        except Exception as e:
+            logger.error(f"Error getting items by ID: {e}")
+            raise
+    
+    async def get_topic_trending_items(
+        self,
+        user_id: str,
+        topic: str,
+        time_window_hours: int = 48,
+        limit: int = 20
+    ) -> List[Item]:
+        """Top items from sources tagged with ``topic``, read from its leaderboard"""
+        try:
+            if limit > topic_leaderboards.capacity:
+                # Deeper than the board keeps: rank the topic's items directly
+                return await self._rank_topic_items(user_id, topic, time_window_hours, limit)
+            
+            self.authority_overrides = await self._load_authority_overrides(user_id)
+            await self.load_trend_weights(user_id)
+            if not topic_leaderboards.is_warm(user_id, topic):
+                await self._warm_topic_leaderboard(user_id, topic)
+            
+            return topic_leaderboards.top(
+                user_id, topic, limit, time_window_hours, self._trend_score
+            ) or []
+            
+        except Exception as e:
+            logger.error(f"Error getting trending items for topic {topic}: {e}")
+            raise
+    
+    async def _fetch_topic_items(
+        self,
+        user_id: str,
+        topic: str,
+        time_window_hours: int,
+        limit: int
+    ) -> List[Item]:
+        """Newest items from the user's sources tagged with a topic"""
+        from datetime import timezone
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
+        
+        source_ids = await self._topic_source_ids(user_id, topic)
+        if not source_ids:
+            return []
+        
+        response = await run_query(self.supabase.table("items").select("*").in_(
+            "source_id", source_ids
+        ).gte(
+            "published_at", cutoff_time.isoformat()
+        ).order("published_at", desc=True).limit(limit))
+        
+        return [Item(**item) for item in response.data]
+    
+    async def _topic_source_ids(self, user_id: str, topic: str) -> List[str]:
+        """
+        Ids of the user's sources tagged with ``topic``.
+        
+        Compared after ``normalize_topic`` rather than with ``ilike`` so the
+        match is exact (no ``%``/``_`` wildcards) and agrees with the keys of
+        the in-memory topic boards.
+        """
+        response = await run_query(self.supabase.table("sources").select("id, topic").eq(
+            "user_id", user_id
+        ).not_.is_("topic", "null"))
+        wanted = normalize_topic(topic)
+        return [source["id"] for source in response.data if normalize_topic(source["topic"]) == wanted]
+    
+    async def _warm_topic_leaderboard(self, user_id: str, topic: str) -> None:
+        """Build a topic board from the database after a restart or eviction"""
+        items = await self._fetch_topic_items(
+            user_id, topic, topic_leaderboards.retention_hours, TOPIC_WARM_LIMIT
+        )
+        topic_leaderboards.rebuild(user_id, topic, items, self._trend_score)
+        logger.info(f"Warmed topic leaderboard {topic!r} for user {user_id} with {len(items)} items")
+    
+    async def _rank_topic_items(
+        self,
+        user_id: str,
+        topic: str,
+        time_window_hours: int,
+        limit: int
+    ) -> List[Item]:
+        self.authority_overrides = await self._load_authority_overrides(user_id)
+        await self.load_trend_weights(user_id)
+        items = await self._fetch_topic_items(user_id, topic, time_window_hours, limit * 2)
+        for item in items:
+            item.trend_score = self._trend_score(item)
+        items.sort(key=lambda x: x.trend_score or 0, reverse=True)
+        return items[:limit]
+    
+    async def _calculate_trend_score(self, item: Item) -> float:
+        """Calculate comprehensive trend score for an item"""
+        return self._trend_score(item)
+    
+    def _trend_score(self, item: Item) -> float:
+        """Synchronous trend score, usable as a leaderboard scorer"""
+        try:
+            components = self._score_components(item)
             
             # Weighted combination
-            trend_score = (
-                recency_score * 0.40 +
-                quality_score * 0.25 +
-                relevance_score * 0.20 +
-                authority_score * 0.10 +
-                engagement_score * 0.05
+            trend_score = sum(
+                components.get(name, 0.5) * weight for name, weight in self.trend_weights.items()
             )
             
             # Apply trending boost for items with high scores
@@ -127,7 +276,57 @@ class TrendService:
             logger.error(f"Item data: id={item.id}, title={item.title}, published_at={item.published_at}, type={type(item.published_at)}")
             return 0.5  # Default score
     
-    def _calculate_content_quality(self, item: Item) -> float:
+    def score_components(self, item: Item, as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Rounded trend signals for an item, as recorded with drafts for learning"""
+        return {
+            name: round(value, 4) for name, value in self._score_components(item, as_of).items()
+        }
+    
+    def _score_components(self, item: Item, as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Individual trend signals for an item, each in [0, 1]"""
+        # One registry probe serves both the quality and authority checks
+        authority = authority_registry.lookup(item.url, self.authority_overrides)
+        
+        return {
+            "recency": self._calculate_recency(item, as_of),
+            "quality": self._calculate_content_quality(item, authority),
+            "relevance": self._calculate_keyword_relevance(item),
+            "authority": self._calculate_source_authority(item, authority),
+            "engagement": self._predict_engagement(item),
+            "coverage": coverage_index.coverage_score(item.title)
+        }
+    
+    def _calculate_recency(self, item: Item, as_of: Optional[datetime] = None) -> float:
+        """Calculate recency score with stepped exponential decay"""
+        # Handle both string and datetime types for published_at
+        if isinstance(item.published_at, str):
+            published_at = datetime.fromisoformat(item.published_at.replace('Z', '+00:00'))
+        else:
+            published_at = item.published_at
+        
+        # Make both datetimes timezone-aware for comparison
+        from datetime import timezone
+        now_utc = as_of or datetime.now(timezone.utc)
+        if now_utc.tzinfo is None:
+            now_utc = now_utc.replace(tzinfo=timezone.utc)
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        
+        hours_ago = (now_utc - published_at).total_seconds() / 3600
+        
+        # Exponential decay with different time windows
+        if hours_ago <= 1:
+            return 1.0  # Very recent (last hour)
+        elif hours_ago <= 6:
+            return 0.9  # Recent (last 6 hours)
+        elif hours_ago <= 24:
+            return math.exp(-hours_ago / 12)  # Decay over 12 hours
+        elif hours_ago <= 72:
+            return math.exp(-hours_ago / 36)  # Decay over 36 hours
+        else:
+            return math.exp(-hours_ago / 168)  # Decay over 7 days
+    
+    def _calculate_content_quality(self, item: Item, authority: Optional[DomainAuthority] = None) -> float:
         """Calculate content quality score based on title and summary"""
         try:
             score = 0.5  # Base score
@@ -147,8 +346,9 @@ class TrendService:
                 score += 0.1
             
             # URL quality indicators
-            url = item.url or ""
-            if any(domain in url.lower() for domain in ['techcrunch.com', 'cnn.com', 'bbc.com', 'reuters.com']):
+            if authority is None:
+                authority = authority_registry.lookup(item.url, self.authority_overrides)
+            if authority.quality:
                 score += 0.1  # Known quality sources
             
             return min(score, 1.0)
@@ -186,35 +386,107 @@ class TrendService:
         except Exception:
             return 0.5
     
-    def _calculate_source_authority(self, item: Item) -> float:
+    def _calculate_source_authority(self, item: Item, authority: Optional[DomainAuthority] = None) -> float:
         """Calculate source authority score"""
         try:
-            url = item.url or ""
-            domain = url.split('/')[2].lower() if '//' in url else ""
-            
-            # Authority scores for known domains
-            authority_map = {
-                'techcrunch.com': 0.95,
-                'cnn.com': 0.90,
-                'bbc.com': 0.90,
-                'reuters.com': 0.95,
-                'bloomberg.com': 0.90,
-                'wsj.com': 0.90,
-                'nytimes.com': 0.85,
-                'wired.com': 0.85,
-                'theverge.com': 0.80,
-                'arstechnica.com': 0.80,
-                'engadget.com': 0.75,
-                'mashable.com': 0.70,
-                'medium.com': 0.60,
-                'substack.com': 0.65,
-            }
-            
-            return authority_map.get(domain, 0.5)  # Default for unknown domains
+            if authority is None:
+                authority = authority_registry.lookup(item.url, self.authority_overrides)
+            return authority.score
             
         except Exception:
             return 0.5
     
+    async def _load_authority_overrides(self, user_id: str) -> Dict[str, float]:
+        """Read per-user domain authority overrides from profile preferences"""
+        try:
+            response = await run_query(
+                self.supabase.table("user_profiles").select("preferences").eq("id", user_id)
+            )
+            if not response.data:
+                return {}
+            overrides = (response.data[0].get("preferences") or {}).get("domain_authority") or {}
+            return {domain.lower(): float(score) for domain, score in overrides.items()}
+        except Exception as e:
+            logger.warning(f"Could not load domain authority overrides for {user_id}: {e}")
+            return {}
+    
+    async def load_trend_weights(self, user_id: str) -> Dict[str, Any]:
+        """Load a user's learned weight state (cached) and use it for scoring"""
+        state = learned_weights.get(user_id)
+        if state is None:
+            stored = None
+            try:
+                _, stored = await self._read_trend_weights(user_id)
+            except Exception as e:
+                # Database without migration 00000000000008: default weights
+                logger.warning(f"Could not load trend weights for {user_id}: {e}")
+            state = normalize_state(stored, TREND_WEIGHTS)
+            learned_weights.set(user_id, state)
+        
+        self.trend_weights = state["weights"]
+        return state
+    
+    async def learn_from_feedback(
+        self,
+        user_id: str,
+        item_components: List[Dict[str, float]],
+        liked: bool
+    ) -> Dict[str, Any]:
+        """
+        Apply one 👍/👎 to a user's weights and persist the result.
+        
+        The step is applied to the stored state and written back only if
+        its ``updates`` counter hasn't moved since the read, so concurrent
+        reactions for one user each land instead of overwriting each other.
+        """
+        try:
+            for _ in range(WEIGHT_WRITE_ATTEMPTS):
+                found, stored = await self._read_trend_weights(user_id)
+                current = normalize_state(stored, TREND_WEIGHTS)
+                state = learn_from_reaction(
+                    {**current, "weights": dict(current["weights"])}, item_components, liked
+                )
+                if not found or await self._write_trend_weights(user_id, state, stored):
+                    break
+                logger.info(f"Trend weights for {user_id} changed concurrently, retrying")
+            else:
+                raise RuntimeError(
+                    f"Trend weights for {user_id} kept changing; gave up after {WEIGHT_WRITE_ATTEMPTS} attempts"
+                )
+            
+            learned_weights.set(user_id, state)
+            trending_cache.invalidate_user(user_id)
+            self.trend_weights = state["weights"]
+            return state
+            
+        except Exception as e:
+            logger.error(f"Error learning trend weights: {e}")
+            raise
+    
+    async def _read_trend_weights(self, user_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Whether the user has a profile row, and its stored ``trend_weights``"""
+        response = await run_query(
+            self.supabase.table("user_profiles").select("trend_weights").eq("id", user_id)
+        )
+        if not response.data:
+            return False, None
+        return True, response.data[0].get("trend_weights")
+    
+    async def _write_trend_weights(
+        self,
+        user_id: str,
+        state: Dict[str, Any],
+        previous: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Compare-and-set on the ``updates`` counter; False if someone else wrote first"""
+        query = self.supabase.table("user_profiles").update({"trend_weights": state}).eq("id", user_id)
+        if previous is None:
+            query = query.is_("trend_weights", "null")
+        else:
+            query = query.eq("trend_weights->>updates", str(int(previous.get("updates", 0))))
+        response = await run_query(query)
+        return bool(response.data)
+    
     def _predict_engagement(self, item: Item) -> float:
         """Predict engagement based on content characteristics"""
         try:
@@ -262,44 +534,44 @@ class TrendService:
             logger.error(f"Error getting item score: {e}")
             raise
     
-    async def recalculate_all_scores(self, user_id: str) -> Dict[str, Any]:
-        """Recalculate trend scores for all items from user's sources"""
+    async def recalculate_all_scores(self, user_id: str, page_size: int = RECALC_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Recalculate trend scores for all items from user's sources.
+        
+        Items are streamed page by page and each page is scored and written
+        back before the next is fetched, so memory stays bounded by the page
+        size rather than by how many items the user has.
+        """
         from datetime import timezone
         start_time = datetime.now(timezone.utc)
         
         try:
-            # Get all items from user's sources
-            response = self.supabase.table("items").select("""
-                *,
-                sources!inner(user_id)
-            """).eq("sources.user_id", user_id).execute()
-            
-            # Convert trend_score to float if it's a string
-            for item_data in response.data:
-                if 'trend_score' in item_data and item_data['trend_score'] is not None:
-                    if isinstance(item_data['trend_score'], str):
-                        item_data['trend_score'] = float(item_data['trend_score'])
-            
-            items = [Item(**item) for item in response.data]
+            self.authority_overrides = await self._load_authority_overrides(user_id)
+            await self.load_trend_weights(user_id)
             processed_count = 0
-            
-            # Update scores for each item
-            for item in items:
-                new_score = await self._calculate_trend_score(item)
-                
-                # Update in database
-                self.supabase.table("items").update({
-                    "trend_score": new_score,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }).eq("id", item.id).execute()
+            pages = 0
+            
+            async for page in self._iter_item_pages(user_id, page_size):
+                scores = []
+                for item_data in page:
+                    item = Item(**item_data)
+                    scores.append({
+                        "id": item.id,
+                        "trend_score": round(await self._calculate_trend_score(item), 4)
+                    })
                 
-                processed_count += 1
+                await self._write_scores(scores)
+                processed_count += len(scores)
+                pages += 1
+            
+            trending_cache.invalidate_user(user_id)
             
             end_time = datetime.now(timezone.utc)
             time_taken = (end_time - start_time).total_seconds()
             
             return {
                 "items_processed": processed_count,
+                "pages": pages,
                 "time_taken": time_taken
             }
             
@@ -307,50 +579,126 @@ class TrendService:
             logger.error(f"Error recalculating scores: {e}")
             raise
     
-    async def get_trending_keywords(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    async def _iter_item_pages(
+        self,
+        user_id: str,
+        page_size: int = RECALC_PAGE_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield a user's items newest-first using keyset pagination on (published_at, id).
+        
+        Items without a ``published_at`` are skipped on purpose: recency is
+        part of the score and ``Item`` can't be built without a date.
+        """
+        cursor = None
+        while True:
+            query = self.supabase.table("items").select(RECALC_COLUMNS).eq(
+                "user_id", user_id
+            ).not_.is_("published_at", "null")
+            
+            response = await run_query(apply_keyset(query, "published_at", cursor).limit(page_size))
+            
+            page = response.data or []
+            if not page:
+                return
+            
+            for item_data in page:
+                if isinstance(item_data.get('trend_score'), str):
+                    item_data['trend_score'] = float(item_data['trend_score'])
+            
+            yield page
+            
+            if len(page) < page_size:
+                return
+            cursor = (page[-1]["published_at"], page[-1]["id"])
+    
+    async def _write_scores(self, scores: List[Dict[str, Any]]) -> None:
+        """Write a page of scores back in one round trip"""
+        try:
+            await run_query(self.supabase.rpc('bulk_update_trend_scores', {'scores': scores}))
+        except APIError as e:
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            # Database without migration 00000000000007: update row by row
+            logger.warning(f"bulk_update_trend_scores RPC unavailable, updating per item: {e}")
+            for score in scores:
+                await run_query(self.supabase.table("items").update({
+                    "trend_score": score["trend_score"]
+                }).eq("id", score["id"]))
+    
+    async def get_trending_keywords(
+        self,
+        user_id: str,
+        limit: int = 10,
+        time_window_hours: int = 24
+    ) -> List[Dict[str, Any]]:
         """Get trending keywords across user's content"""
         try:
-            # This would implement keyword extraction and frequency analysis
-            # For now, return mock data
-            return [
-                {"keyword": "AI", "frequency": 15, "trend": "up"},
-                {"keyword": "machine learning", "frequency": 12, "trend": "up"},
-                {"keyword": "blockchain", "frequency": 8, "trend": "down"},
-                {"keyword": "cloud computing", "frequency": 10, "trend": "stable"},
-                {"keyword": "cybersecurity", "frequency": 7, "trend": "up"},
-            ][:limit]
+            # Counts are maintained at ingest time; only a cold engine
+            # (e.g. after a restart) needs to be rebuilt from the database
+            if not keyword_engine.is_warm(user_id):
+                await self._warm_keyword_engine(user_id)
+            
+            return keyword_engine.get_trending(
+                user_id,
+                limit=limit,
+                time_window_hours=time_window_hours
+            )
             
         except Exception as e:
             logger.error(f"Error getting trending keywords: {e}")
             raise
     
+    async def _warm_keyword_engine(self, user_id: str) -> None:
+        """Rebuild a user's keyword counts from items inside the retention window"""
+        from datetime import timezone
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=keyword_engine.retention_hours)
+        
+        response = await run_query(self.supabase.table("items").select(
+            "title, summary, published_at"
+        ).eq("user_id", user_id).gte(
+            "published_at", cutoff_time.isoformat()
+        ))
+        
+        keyword_engine.rebuild_user(user_id, response.data or [])
+        logger.info(f"Warmed keyword engine for user {user_id} with {len(response.data or [])} items")
+    
     async def get_analysis_metadata(
         self, 
         user_id: str, 
-        time_window_hours: int
+        time_window_hours: int,
+        topic: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get metadata about the trend analysis"""
+        """Get metadata about the trend analysis (over one topic's sources if given)"""
+        topic = normalize_topic(topic)
+        cache_key = ("metadata", user_id, time_window_hours, topic)
+        cached = trending_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            cutoff_time = datetime.utcnow() - timedelta(hours=time_window_hours)
-            
-            # Get statistics
-            response = self.supabase.table("items").select("""
-                *,
-                sources!inner(user_id)
-            """).eq("sources.user_id", user_id).gte(
-                "published_at", cutoff_time.isoformat()
-            ).execute()
+            from datetime import timezone
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
             
-            total_items = len(response.data)
-            avg_score = sum(item.get("trend_score", 0.5) for item in response.data) / max(total_items, 1)
+            if topic:
+                source_ids = await self._topic_source_ids(user_id, topic)
+                stats = await self._aggregate_item_stats(user_id, cutoff_time, source_ids)
+            else:
+                # Aggregate in the database so no item rows cross the wire
+                stats = await self._fetch_analysis_stats(user_id, cutoff_time)
             
-            return {
+            metadata = {
                 "analysis_time": datetime.utcnow().isoformat(),
                 "time_window_hours": time_window_hours,
-                "total_items_analyzed": total_items,
-                "average_trend_score": round(avg_score, 3),
+                **({"topic": topic} if topic else {}),
+                "total_items_analyzed": stats["total_items"],
+                "average_trend_score": round(stats["average_trend_score"], 3),
+                "score_percentiles": stats["score_percentiles"],
+                "source_counts": stats["source_counts"],
                 "analysis_version": "1.0"
             }
+            trending_cache.set(cache_key, metadata)
+            return metadata
             
         except Exception as e:
             logger.error(f"Error getting analysis metadata: {e}")
@@ -359,3 +707,71 @@ class TrendService:
                 "time_window_hours": time_window_hours,
                 "error": str(e)
             }
+    
+    async def _fetch_analysis_stats(self, user_id: str, cutoff_time: datetime) -> Dict[str, Any]:
+        """Count, average, percentiles and per-source counts of windowed item scores"""
+        try:
+            response = self.supabase.rpc('get_trend_analysis_stats', {
+                'user_uuid': user_id,
+                'since': cutoff_time.isoformat()
+            }).execute()
+            stats = response.data or {}
+            return {
+                "total_items": int(stats.get("total_items", 0)),
+                "average_trend_score": float(stats.get("average_trend_score", 0)),
+                "score_percentiles": {
+                    key: round(float(value), 3)
+                    for key, value in (stats.get("score_percentiles") or {}).items()
+                },
+                "source_counts": stats.get("source_counts") or {}
+            }
+        except Exception as e:
+            # Database without migration 00000000000006: aggregate a
+            # two-column projection locally instead of full item rows
+            logger.warning(f"get_trend_analysis_stats RPC unavailable, aggregating locally: {e}")
+        
+        return await self._aggregate_item_stats(user_id, cutoff_time)
+    
+    async def _aggregate_item_stats(
+        self,
+        user_id: str,
+        cutoff_time: datetime,
+        source_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Same stats as the RPC, from a two-column projection (optionally limited to some sources)"""
+        rows: List[Dict[str, Any]] = []
+        if source_ids is None or source_ids:
+            query = self.supabase.table("items").select("source_id, trend_score").eq(
+                "user_id", user_id
+            ).gte("published_at", cutoff_time.isoformat())
+            if source_ids:
+                query = query.in_("source_id", source_ids)
+            rows = (await run_query(query)).data or []
+        
+        scores = sorted(
+            float(row["trend_score"]) if row.get("trend_score") is not None else 0.5
+            for row in rows
+        )
+        source_counts: Dict[str, int] = {}
+        for row in rows:
+            source_counts[row["source_id"]] = source_counts.get(row["source_id"], 0) + 1
+        
+        def percentile(fraction: float) -> float:
+            # Linear interpolation, matching PostgreSQL's percentile_cont
+            if not scores:
+                return 0.0
+            position = fraction * (len(scores) - 1)
+            lower = int(position)
+            upper = min(lower + 1, len(scores) - 1)
+            return scores[lower] + (scores[upper] - scores[lower]) * (position - lower)
+        
+        return {
+            "total_items": len(scores),
+            "average_trend_score": sum(scores) / max(len(scores), 1),
+            "score_percentiles": {
+                "p50": round(percentile(0.5), 3),
+                "p90": round(percentile(0.9), 3),
+                "p99": round(percentile(0.99), 3)
+            },
+            "source_counts": source_counts
+        }
@@ -0,0 +1,95 @@
+"""
+Per-user trend weights learned online from 👍/👎 feedback
+"""
+
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import TTLCache
+
+LEARNING_RATE = 0.01
+
+# Slope of the logistic link: how sharply a score difference maps to
+# a change in predicted approval
+SHARPNESS = 8.0
+
+# Floor applied before renormalising, so no signal is ever switched off
+MIN_WEIGHT = 0.02
+
+
+def _sigmoid(value: float) -> float:
+    if value < -30:
+        return 0.0
+    if value > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+def initial_state(defaults: Dict[str, float]) -> Dict[str, Any]:
+    return {"weights": dict(defaults), "bias": 0.5, "updates": 0}
+
+
+def normalize_state(state: Optional[Dict[str, Any]], defaults: Dict[str, float]) -> Dict[str, Any]:
+    """Fill in a stored state so it matches the current signal set"""
+    if not state or not isinstance(state.get("weights"), dict):
+        return initial_state(defaults)
+
+    weights = {name: float(state["weights"].get(name, default)) for name, default in defaults.items()}
+    total = sum(weights.values()) or 1.0
+    return {
+        "weights": {name: value / total for name, value in weights.items()},
+        "bias": float(state.get("bias", 0.5)),
+        "updates": int(state.get("updates", 0))
+    }
+
+
+def sgd_update(state: Dict[str, Any], components: Dict[str, float], liked: bool, learning_rate: float = LEARNING_RATE) -> None:
+    """
+    One logistic SGD step on a single item's score components, in place.
+
+    The model predicts approval as ``sigmoid(SHARPNESS * (w . x - bias))``.
+    Weights must stay a convex combination so scores stay in [0, 1], so the
+    gradient is centred (its components sum to zero) before the step, then
+    clipped at MIN_WEIGHT and renormalised. Costs O(features).
+    """
+    weights = state["weights"]
+    names = list(weights)
+    values = [float(components.get(name, 0.5)) for name in names]
+
+    score = sum(weights[name] * value for name, value in zip(names, values))
+    error = (1.0 if liked else 0.0) - _sigmoid(SHARPNESS * (score - state["bias"]))
+    step = learning_rate * SHARPNESS * error
+
+    mean = sum(values) / len(values)
+    for name, value in zip(names, values):
+        weights[name] = max(weights[name] + step * (value - mean), MIN_WEIGHT)
+
+    total = sum(weights.values())
+    for name in names:
+        weights[name] /= total
+
+    state["bias"] = min(max(state["bias"] - step, 0.0), 1.0)
+
+
+def learn_from_reaction(
+    state: Dict[str, Any],
+    item_components: List[Dict[str, float]],
+    liked: bool
+) -> Dict[str, Any]:
+    """Apply one draft reaction, spread evenly over the draft's items"""
+    if not item_components:
+        return state
+
+    learning_rate = LEARNING_RATE / len(item_components)
+    for components in item_components:
+        sgd_update(state, components, liked, learning_rate)
+    state["updates"] += 1
+    return state
+
+
+# Learned states per user, so scoring doesn't read the profile every call
+learned_weights = TTLCache(
+    max_entries=int(os.getenv("TREND_WEIGHTS_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("TREND_WEIGHTS_CACHE_TTL_SECONDS", "600"))
+)
@@ -92,6 +92,7 @@ class ItemCreate(ItemBase):
 class Item(ItemBase):
     id: str
     trend_score: Optional[float] = None
+    key_points: Optional[List[str]] = None  # Extractive summary computed at ingest
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -132,6 +133,20 @@ class Draft(DraftBase):
     created_at: datetime
     updated_at: datetime
 
+class DraftSummary(BaseSchema):
+    """A draft list row; expandable fields are present only when requested"""
+    id: str
+    user_id: str
+    title: Optional[str] = None
+    status: str = "draft"
+    sent_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    body_md: Optional[str] = None
+    email_subject: Optional[str] = None
+    generation_metadata: Optional[Dict[str, Any]] = None
+    credits_used: Optional[int] = None
+
 # Feedback schemas
 class FeedbackBase(BaseSchema):
     draft_id: str
@@ -159,6 +174,16 @@ class IngestionResponse(BaseSchema):
 class TrendAnalysisRequest(BaseSchema):
     time_window_hours: int = 48
     limit: int = 20
+    diversity: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Re-rank for story diversity (0 = pure score order, 1 = maximum novelty)"
+    )
+    topic: Optional[str] = Field(
+        default=None,
+        description="Only rank items from sources tagged with this topic"
+    )
 
 class TrendAnalysisResponse(BaseSchema):
     trending_items: List[Item]
@@ -173,8 +198,15 @@ class StyleTrainingResponse(BaseSchema):
     confidence_score: float
 
 class GenerationRequest(BaseSchema):
-    trending_items: List[str] = []  # Item IDs (optional, will use trending if empty)
+    trending_items: List[str] = []  # Item IDs to feature, in order (optional, will use trending if empty)
     custom_prompt: Optional[str] = None
+    topics: List[str] = []  # Fill picks from each of these source topics in turn
+    bypass_cache: bool = False  # Force fresh LLM calls for an identical prompt
+    background: bool = False  # Queue the job and return its ID immediately
+    parallel_sections: bool = False  # Write section groups concurrently and stitch them
+
+class SectionRegenerateRequest(BaseSchema):
+    feedback: Optional[str] = None
 
 class GenerationResponse(BaseSchema):
     draft: Draft
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load-test newsletter generation offline against the local LLM backend.
+
+    python benchmark_generation.py --requests 200 --concurrency 20
+    python benchmark_generation.py --mode sections --failure-rate 0.05
+    LLM_PROVIDER=replay python benchmark_generation.py   # replay recorded responses
+
+Drives the same prompt building, rate-limited client, retries and section
+stitching as the API, with synthetic items instead of the database. Uses
+LLM_PROVIDER=local unless another provider is set.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline generation benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="newsletters to generate")
+    parser.add_argument("--concurrency", type=int, default=10, help="newsletters generated at once")
+    parser.add_argument("--mode", choices=["single", "sections"], default="single", help="generation mode")
+    parser.add_argument("--latency-ms", type=float, default=200, help="local backend time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="local backend output speed")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of local calls that fail")
+    parser.add_argument("--same-input", action="store_true", help="identical prompts (exercises the LLM cache)")
+    parser.add_argument("--tpm", type=int, help="tokens-per-minute limit (default: OPENAI_TPM_LIMIT)")
+    parser.add_argument("--rpm", type=int, help="requests-per-minute limit (default: OPENAI_RPM_LIMIT)")
+    return parser.parse_args()
+
+
+def synthetic_items(seed: int, count: int = 5):
+    return [
+        SimpleNamespace(
+            id=f"item-{seed}-{index}",
+            title=f"Story {seed}-{index}: new model release lifts benchmark scores",
+            url=f"https://example.com/{seed}/{index}",
+            summary="A lab released a new model. It beats earlier versions on public benchmarks. Pricing drops.",
+            key_points=None,
+            image_url=None
+        )
+        for index in range(count)
+    ]
+
+
+async def generate_one(service, index: int, args) -> float:
+    from app.core.generation.templates import NewsletterTemplate
+
+    seed = 0 if args.same_input else index
+    items = synthetic_items(seed)
+    keywords = [{"keyword": "models"}, {"keyword": "benchmarks"}]
+    prompt = NewsletterTemplate.build_budgeted_prompt(items, ["analytical"], keywords)["prompt"]
+
+    started = time.perf_counter()
+    title_task = asyncio.create_task(service._generate_newsletter_title(items, keywords))
+    if args.mode == "sections":
+        body = await service._generate_sections(prompt)
+    else:
+        body = await service._generate_with_llm(prompt)
+    await title_task
+    if not NewsletterTemplate.validate_newsletter_structure(body)["is_valid"]:
+        raise ValueError("Generated newsletter failed validation")
+    return time.perf_counter() - started
+
+
+async def run(args) -> int:
+    os.environ.setdefault("LLM_PROVIDER", "local")
+    os.environ.setdefault("LOCAL_LLM_LATENCY_MS", str(args.latency_ms))
+    os.environ.setdefault("LOCAL_LLM_TOKENS_PER_SECOND", str(args.tokens_per_second))
+    os.environ.setdefault("LOCAL_LLM_FAILURE_RATE", str(args.failure_rate))
+    if args.tpm:
+        os.environ["OPENAI_TPM_LIMIT"] = str(args.tpm)
+    if args.rpm:
+        os.environ["OPENAI_RPM_LIMIT"] = str(args.rpm)
+
+    from app.core.generation.llm_cache import llm_cache
+    from app.core.generation.llm_client import init_llm_client, close_llm_client
+    from app.core.generation.service import GenerationService
+
+    client = init_llm_client()
+    if client is None:
+        return 1
+
+    # Only the LLM side is exercised; no database client is needed
+    service = object.__new__(GenerationService)
+    service.openai_client = client
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def worker(index: int):
+        nonlocal failures
+        async with semaphore:
+            try:
+                latencies.append(await generate_one(service, index, args))
+            except Exception as e:
+                failures += 1
+                print(f"❌ Request {index} failed: {e}")
+
+    print(f"🏁 {args.requests} newsletters ({args.mode}) via {client.provider.name}, {args.concurrency} at a time")
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*[worker(index) for index in range(args.requests)])
+    finally:
+        await close_llm_client()
+    seconds = time.perf_counter() - started
+
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"✅ {len(latencies)} generated, {failures} failed in {seconds:.1f}s "
+              f"({len(latencies) / seconds * 60:.1f} newsletters/min)")
+        print(f"📊 Latency p50 {statistics.median(latencies):.2f}s, p95 {p95:.2f}s, max {latencies[-1]:.2f}s")
+    stats = client.stats()
+    print(f"🔁 {stats['requests']} LLM calls, {stats['retries']} retries, {stats['rejected']} rejected, "
+          f"{stats['wait_seconds']}s waiting for rate limit capacity")
+    cache = llm_cache.stats()
+    print(f"💾 LLM cache: {cache['hits']} hits, {cache['coalesced']} coalesced in flight")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,34 @@
+-- Migration: Server-side aggregation for trend analysis metadata
+-- Lets the API fetch counts, averages and percentiles without transferring item rows
+
+-- Composite index for per-user time-window scans (also serves keyset pagination)
+CREATE INDEX IF NOT EXISTS idx_items_user_published ON items(user_id, published_at DESC, id DESC);
+
+-- Aggregate trend statistics for a user's items published since a cutoff
+CREATE OR REPLACE FUNCTION get_trend_analysis_stats(user_uuid UUID, since TIMESTAMPTZ)
+RETURNS JSONB AS $$
+  WITH windowed AS (
+    SELECT source_id, COALESCE(trend_score, 0.5) AS trend_score
+    FROM items
+    WHERE user_id = user_uuid
+      AND published_at >= since
+  )
+  SELECT jsonb_build_object(
+    'total_items', (SELECT COUNT(*) FROM windowed),
+    'average_trend_score', (SELECT COALESCE(AVG(trend_score), 0) FROM windowed),
+    'score_percentiles', (
+      SELECT jsonb_build_object(
+        'p50', COALESCE(percentile_cont(0.5) WITHIN GROUP (ORDER BY trend_score), 0),
+        'p90', COALESCE(percentile_cont(0.9) WITHIN GROUP (ORDER BY trend_score), 0),
+        'p99', COALESCE(percentile_cont(0.99) WITHIN GROUP (ORDER BY trend_score), 0)
+      )
+      FROM windowed
+    ),
+    'source_counts', COALESCE((
+      SELECT jsonb_object_agg(source_id, item_count)
+      FROM (SELECT source_id, COUNT(*) AS item_count FROM windowed GROUP BY source_id) per_source
+    ), '{}'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_trend_analysis_stats(UUID, TIMESTAMPTZ) IS 'Trend analysis metadata (count, average, percentiles, per-source counts) computed in the database';
@@ -0,0 +1,20 @@
+-- Migration: Bulk trend score write-back
+-- Lets score recalculation update a whole page of items in one round trip
+
+-- scores: JSON array of {"id": <item uuid>, "trend_score": <number>}
+CREATE OR REPLACE FUNCTION bulk_update_trend_scores(scores JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  updated_count INTEGER;
+BEGIN
+  UPDATE items
+  SET trend_score = (score->>'trend_score')::DECIMAL(5,4)
+  FROM jsonb_array_elements(scores) AS score
+  WHERE items.id = (score->>'id')::UUID;
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION bulk_update_trend_scores(JSONB) IS 'Set trend_score for many items at once; runs with the caller''s RLS policies';
@@ -0,0 +1,8 @@
+-- Migration: Per-user trend weights learned from draft feedback
+-- Each 👍/👎 nudges the user's signal weights with one online SGD step;
+-- the scorer reads them instead of the built-in defaults
+
+ALTER TABLE user_profiles
+ADD COLUMN IF NOT EXISTS trend_weights JSONB;
+
+COMMENT ON COLUMN user_profiles.trend_weights IS 'Learned trend signal weights: {"weights": {signal: weight}, "bias": float, "updates": int}';
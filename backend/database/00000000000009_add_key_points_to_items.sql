@@ -0,0 +1,9 @@
+-- Migration: Extractive key points per item
+-- Computed once at ingest (TextRank over the item's text); generation
+-- prompts quote these instead of a truncated raw summary. Items ingested
+-- before this migration keep NULL and fall back to the summary.
+
+ALTER TABLE items
+ADD COLUMN IF NOT EXISTS key_points JSONB;
+
+COMMENT ON COLUMN items.key_points IS 'Most central sentences of the item text, in reading order: ["...", "..."]';
@@ -0,0 +1,31 @@
+-- Migration: Transactional draft creation
+-- Inserts a draft and all of its item links in one round trip; either both land or neither does
+
+-- draft: JSON object with the drafts columns to set (user_id, title, body_md, ...)
+-- item_ids: items in newsletter order; position is the array index (0-based)
+CREATE OR REPLACE FUNCTION create_draft_with_items(draft JSONB, item_ids UUID[])
+RETURNS drafts AS $$
+DECLARE
+  new_draft drafts;
+BEGIN
+  INSERT INTO drafts (user_id, title, body_md, status, credits_used, generation_metadata, created_at)
+  VALUES (
+    (draft->>'user_id')::UUID,
+    draft->>'title',
+    draft->>'body_md',
+    COALESCE(draft->>'status', 'draft'),
+    COALESCE((draft->>'credits_used')::INTEGER, 1),
+    COALESCE(draft->'generation_metadata', '{}'::jsonb),
+    COALESCE((draft->>'created_at')::TIMESTAMPTZ, NOW())
+  )
+  RETURNING * INTO new_draft;
+
+  INSERT INTO draft_items (draft_id, item_id, position)
+  SELECT new_draft.id, linked.item_id, (linked.ordinality - 1)::INTEGER
+  FROM unnest(item_ids) WITH ORDINALITY AS linked(item_id, ordinality);
+
+  RETURN new_draft;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION create_draft_with_items(JSONB, UUID[]) IS 'Create a draft and link its items atomically; runs with the caller''s RLS policies';
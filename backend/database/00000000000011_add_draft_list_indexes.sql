@@ -0,0 +1,9 @@
+-- Migration: Indexes for keyset-paginated draft lists
+-- Serve /generation/drafts and /delivery/history pages without sorting a user's whole draft history
+
+-- Drafts newest-first on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_drafts_user_created ON drafts(user_id, created_at DESC, id DESC);
+
+-- Sent drafts most-recent-first on (sent_at, id)
+CREATE INDEX IF NOT EXISTS idx_drafts_user_sent ON drafts(user_id, sent_at DESC, id DESC)
+  WHERE status = 'sent';
@@ -11,7 +11,11 @@ import os
 from dotenv import load_dotenv
 
 from app.api.v1 import ingestion, trends, style, generation, delivery, feedback, health, credits
-from app.core.database import init_db
+from app.core.database import init_db, get_service_supabase
+from app.core.generation.jobs import generation_jobs
+from app.core.generation.llm_client import init_llm_client, close_llm_client
+from app.core.ingestion.summarizer import shutdown_summarizer
+from app.core.trends.coverage import warm_coverage_index
 
 # Load environment variables
 load_dotenv()
@@ -77,6 +81,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Add trusted host middleware for production
@@ -99,11 +104,24 @@ app.include_router(credits.router, prefix="/api/v1", tags=["credits"])
 async def startup_event():
     """Initialize database and services on startup"""
     await init_db()
+    # Coverage is cross-user, so warming it needs the service role key;
+    # without one the index warms itself after a full retention window
+    service_client = get_service_supabase()
+    if service_client is not None:
+        try:
+            await warm_coverage_index(service_client)
+        except Exception as e:
+            print(f"⚠️ Coverage index not warmed: {e}")
+    init_llm_client()
+    await generation_jobs.start()
     print("🚀 EchoWrite API started successfully!")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    await generation_jobs.stop()
+    await close_llm_client()
+    shutdown_summarizer()
     print("🛑 EchoWrite API shutting down...")
 
 @app.get("/")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Draft a newsletter every morning for users who opted in
+(``user_profiles.preferences.morning_draft.enabled``), at their local time.
+
+    python morning_batch.py                  # run continuously, checking every 15 minutes
+    python morning_batch.py --once           # one pass for whoever is due now
+    python morning_batch.py --once --dry-run # list who is due without generating
+
+Requires SUPABASE_SERVICE_ROLE_KEY and OPENAI_API_KEY.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from app.core.database import init_db
+from app.core.generation.llm_client import init_llm_client, close_llm_client
+from app.core.generation.morning import MorningBatchRunner, start_scheduler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Morning newsletter batch")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--dry-run", action="store_true", help="only list users who are due")
+    parser.add_argument("--users", nargs="*", help="only consider these user IDs")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("MORNING_BATCH_CONCURRENCY", "4")),
+                        help="generations running at once")
+    parser.add_argument("--max-attempts", type=int, default=int(os.getenv("MORNING_BATCH_MAX_ATTEMPTS", "3")),
+                        help="tries per user before giving up")
+    parser.add_argument("--catchup-hours", type=float,
+                        default=float(os.getenv("MORNING_BATCH_CATCHUP_HOURS", "6")),
+                        help="how long after a user's local time a missed draft is still made")
+    parser.add_argument("--interval-minutes", type=float,
+                        default=float(os.getenv("MORNING_BATCH_INTERVAL_MINUTES", "15")),
+                        help="how often to look for due users")
+    return parser.parse_args()
+
+
+async def run(args) -> int:
+    await init_db(use_service_role=True)
+    runner = MorningBatchRunner(
+        concurrency=args.concurrency, max_attempts=args.max_attempts, catchup_hours=args.catchup_hours
+    )
+
+    if args.dry_run:
+        due = await runner.due_users(user_ids=args.users)
+        print(f"🌅 {len(due)} users due")
+        for profile, local_date in due:
+            print(f"   {profile['id']} ({profile.get('timezone') or 'UTC'}, {local_date})")
+        return 0
+
+    if not init_llm_client():
+        return 1
+    try:
+        if args.once:
+            totals = await runner.run_once(user_ids=args.users)
+            print(f"✅ Drafted {totals['completed']}/{totals['total']} newsletters "
+                  f"({totals['skipped']} skipped, {totals['retries']} retries)")
+            if totals["failed"]:
+                print(f"❌ {totals['failed']} users failed")
+            if totals.get("seconds"):
+                print(f"📊 {totals['seconds']}s, {totals['drafts_per_minute']} drafts/min")
+            return 1 if totals["failed"] else 0
+
+        print(f"🌅 Morning batch running every {args.interval_minutes} minutes "
+              f"({args.concurrency} generations at a time)")
+        scheduler = start_scheduler(runner, args.interval_minutes)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            scheduler.shutdown(wait=False)
+        return 0
+    finally:
+        await close_llm_client()
+
+
+def main():
+    try:
+        return asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
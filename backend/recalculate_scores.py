@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Rescore every user's items in batch (e.g. nightly after a weight change).
+
+    python recalculate_scores.py --processes 4 --db-concurrency 4
+    python recalculate_scores.py --users <uuid> <uuid>
+    python recalculate_scores.py --restart
+
+Progress is checkpointed per user, so re-running after a crash resumes
+where the previous run stopped; a run that rescores everyone clears the
+checkpoint. Requires SUPABASE_SERVICE_ROLE_KEY.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.database import init_db
+from app.core.trends.batch import default_checkpoint_dir, list_user_ids, run_batch
+from app.core.trends.service import RECALC_PAGE_SIZE
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batch trend score recalculation")
+    parser.add_argument("--processes", type=int, default=4, help="worker processes (user shards)")
+    parser.add_argument("--db-concurrency", type=int, default=4, help="users rescored at once per process")
+    parser.add_argument("--page-size", type=int, default=RECALC_PAGE_SIZE, help="items fetched per page")
+    parser.add_argument("--checkpoint-dir", default=default_checkpoint_dir(), help="where progress is recorded")
+    parser.add_argument("--users", nargs="*", help="only rescore these user IDs")
+    parser.add_argument("--restart", action="store_true", help="ignore and clear any existing checkpoint")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    user_ids = args.users
+    if not user_ids:
+        asyncio.run(init_db(use_service_role=True))
+        user_ids = asyncio.run(list_user_ids())
+
+    print(f"🔄 Rescoring {len(user_ids)} users with {args.processes} processes "
+          f"x {args.db_concurrency} concurrent users")
+
+    totals = run_batch(
+        user_ids,
+        checkpoint_dir=args.checkpoint_dir,
+        processes=args.processes,
+        db_concurrency=args.db_concurrency,
+        page_size=args.page_size,
+        resume=not args.restart
+    )
+
+    print(f"✅ Rescored {totals['users']} users ({totals['skipped']} already done from checkpoint)")
+    if not totals["complete"]:
+        print(f"❌ {totals['failed']} users failed or were not reached; re-run to retry them")
+    print(f"📊 {totals['items']} items in {totals['seconds']}s "
+          f"({totals['items_per_second']} items/s)")
+
+    return 0 if totals["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Test domain authority registry lookups (no database required)
+"""
+
+from app.core.trends.authority import DomainAuthorityRegistry, authority_registry
+
+
+def test_subdomains_resolve_to_registered_domain():
+    print("\n🌐 Testing subdomain resolution...")
+    assert authority_registry.lookup("https://www.techcrunch.com/2024/ai").score == 0.95
+    assert authority_registry.lookup("http://feeds.bbc.co.uk/news/rss.xml").domain == "bbc.co.uk"
+    assert authority_registry.lookup("https://techcrunch.com").quality is True
+    # Label boundaries matter: this is not bbc.com
+    assert authority_registry.lookup("https://notbbc.com").score == 0.5
+    print("   ✅ Subdomains inherit their domain's authority")
+
+
+def test_user_overrides_take_precedence():
+    print("\n👤 Testing per-user overrides...")
+    registry = DomainAuthorityRegistry()
+    registry.register("example.com", 0.7)
+
+    assert registry.lookup("https://blog.example.com").score == 0.7
+    assert registry.lookup("https://blog.example.com", {"example.com": 0.9}).score == 0.9
+    assert registry.lookup("https://blog.example.com", {"blog.example.com": 0.2}).score == 0.2
+    print("   ✅ Overrides win over registry entries")
+
+
+if __name__ == "__main__":
+    test_subdomains_resolve_to_registered_domain()
+    test_user_overrides_take_precedence()
+    print("\n✅ Domain authority tests completed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test transactional draft creation and its fallback (no database required)
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from postgrest.exceptions import APIError
+
+from app.core.generation import service as generation_service
+from app.core.generation.service import GenerationService
+
+DRAFT = {"user_id": "user-1", "title": "Weekly", "body_md": "# Weekly"}
+ITEM_IDS = ["item-1", "item-2"]
+
+
+class FakeQuery:
+    def __init__(self, client, kind, name, payload):
+        self.client, self.kind, self.name, self.payload = client, kind, name, payload
+
+
+class FakeSupabase:
+    """Records calls; the RPC raises ``rpc_error`` and item links fail if ``links_fail``"""
+
+    def __init__(self, rpc_error=None, links_fail=False):
+        self.rpc_error = rpc_error
+        self.links_fail = links_fail
+        self.calls = []
+
+    def rpc(self, name, params):
+        return FakeQuery(self, "rpc", name, params)
+
+    def table(self, name):
+        return SimpleNamespace(insert=lambda payload: FakeQuery(self, "insert", name, payload))
+
+
+async def fake_run_query(query):
+    client = query.client
+    client.calls.append((query.kind, query.name))
+    if query.kind == "rpc":
+        if client.rpc_error is not None:
+            raise client.rpc_error
+        return SimpleNamespace(data={"id": "draft-rpc", **query.payload["draft"]})
+    if query.name == "draft_items" and client.links_fail:
+        raise APIError({"code": "23503", "message": "insert violates foreign key constraint"})
+    return SimpleNamespace(data=[{"id": "draft-fallback"}])
+
+
+def _create(supabase):
+    service = GenerationService.__new__(GenerationService)
+    service.supabase = supabase
+    with mock.patch.object(generation_service, "run_query", fake_run_query):
+        return asyncio.run(service._create_draft(DRAFT, ITEM_IDS))
+
+
+def test_rpc_creates_draft_in_one_call():
+    print("\n🧾 Testing transactional draft creation...")
+    supabase = FakeSupabase()
+    assert _create(supabase) == "draft-rpc"
+    assert supabase.calls == [("rpc", "create_draft_with_items")]
+    print("   ✅ Draft and item links saved by a single RPC")
+
+
+def test_missing_function_falls_back():
+    print("\n🪜 Testing fallback for databases without the RPC...")
+    for code in ("PGRST202", "42883"):
+        supabase = FakeSupabase(rpc_error=APIError({"code": code, "message": "function not found"}))
+        assert _create(supabase) == "draft-fallback"
+        assert supabase.calls == [
+            ("rpc", "create_draft_with_items"), ("insert", "drafts"), ("insert", "draft_items")
+        ]
+    print("   ✅ PGRST202 and 42883 insert the draft and links separately")
+
+
+def test_other_errors_do_not_fall_back():
+    print("\n🚫 Testing other RPC errors...")
+    for error in (
+        APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+        APIError({"code": "42501", "message": "permission denied"}),
+        TimeoutError("read timed out")
+    ):
+        supabase = FakeSupabase(rpc_error=error)
+        try:
+            _create(supabase)
+        except type(error):
+            pass
+        else:
+            raise AssertionError(f"{error!r} was swallowed")
+        # A second insert could duplicate a draft the RPC already committed
+        assert supabase.calls == [("rpc", "create_draft_with_items")]
+    print("   ✅ Timeouts and permission errors are raised, not retried as inserts")
+
+
+def test_fallback_keeps_draft_when_links_fail():
+    print("\n🔗 Testing fallback link failure...")
+    supabase = FakeSupabase(rpc_error=APIError({"code": "PGRST202", "message": "function not found"}), links_fail=True)
+    assert _create(supabase) == "draft-fallback"
+    print("   ✅ The draft is kept rather than deleted and regenerated")
+
+
+if __name__ == "__main__":
+    test_rpc_creates_draft_in_one_call()
+    test_missing_function_falls_back()
+    test_other_errors_do_not_fall_back()
+    test_fallback_keeps_draft_when_links_fail()
+    print("\n✅ Draft creation tests completed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the background generation job queue (no API calls)
+"""
+
+import asyncio
+from unittest import mock
+
+from app.core.generation import service as generation_service
+from app.core.generation.jobs import GenerationJobQueue
+
+
+class FakeGenerationService:
+    """Streams a short draft; records how many runs per user overlap"""
+
+    running = {}
+    peak = {}
+
+    def __init__(self, jwt_token=None):
+        self.jwt_token = jwt_token
+
+    async def stream_newsletter(self, user_id, outcome="success", **kwargs):
+        running = FakeGenerationService.running
+        running[user_id] = running.get(user_id, 0) + 1
+        FakeGenerationService.peak[user_id] = max(FakeGenerationService.peak.get(user_id, 0), running[user_id])
+        try:
+            yield {"event": "start"}
+            await asyncio.sleep(0.05)
+            yield {"event": "token", "text": "Hello "}
+            if outcome == "crash":
+                raise RuntimeError("model went away")
+            yield {"event": "token", "text": "world"}
+            if outcome == "no_credits":
+                yield {"event": "done", "success": False, "message": "Insufficient credits"}
+            else:
+                yield {"event": "done", "success": True, "draft_id": f"draft-{user_id}"}
+        finally:
+            running[user_id] -= 1
+
+
+async def _run_jobs(queue, submissions):
+    await queue.start()
+    try:
+        jobs = [await queue.submit(user_id, "token", params) for user_id, params in submissions]
+        while any(job.status not in ("completed", "failed") for job in jobs):
+            await asyncio.sleep(0.01)
+        return jobs
+    finally:
+        await queue.stop()
+
+
+def _run(queue, submissions):
+    FakeGenerationService.running = {}
+    FakeGenerationService.peak = {}
+    with mock.patch.object(generation_service, "GenerationService", FakeGenerationService):
+        return asyncio.run(_run_jobs(queue, submissions))
+
+
+def test_job_lifecycle():
+    print("\n🗂️  Testing job lifecycle...")
+    queue = GenerationJobQueue(workers=2)
+    [job] = _run(queue, [("user-1", {})])
+
+    status = job.to_status()
+    assert status["status"] == status["stage"] == "completed"
+    assert status["partial_output"] == "Hello world"
+    assert status["draft_id"] == "draft-user-1"
+    assert status["started_at"] and status["finished_at"]
+    assert job.jwt_token is None
+    assert queue.get(job.id) is job
+    print("   ✅ queued → running → completed with output and draft id")
+
+
+def test_failures_are_reported():
+    print("\n💥 Testing failed jobs...")
+    queue = GenerationJobQueue(workers=2)
+    crashed, refused = _run(queue, [("user-1", {"outcome": "crash"}), ("user-2", {"outcome": "no_credits"})])
+
+    assert crashed.status == "failed" and crashed.error == "model went away"
+    assert crashed.to_status()["partial_output"] == "Hello "
+    assert refused.status == "failed" and refused.error == "Insufficient credits"
+    assert queue.stats()["jobs"] == {"failed": 2}
+    print("   ✅ Exceptions and unsuccessful drafts both end as failed with a reason")
+
+
+def test_per_user_limit():
+    print("\n🚦 Testing per-user concurrency...")
+    queue = GenerationJobQueue(workers=3, per_user_limit=1)
+    jobs = _run(queue, [("user-1", {}), ("user-1", {}), ("user-2", {})])
+
+    assert all(job.status == "completed" for job in jobs)
+    assert FakeGenerationService.peak == {"user-1": 1, "user-2": 1}
+    # user-2 wasn't held up behind user-1's second job
+    assert jobs[2].started_at < jobs[1].started_at
+    print("   ✅ One job per user at a time; other users are not blocked")
+
+
+def test_finished_jobs_are_pruned():
+    print("\n🧹 Testing retention...")
+    queue = GenerationJobQueue(workers=1, max_finished=2)
+    jobs = _run(queue, [("user-1", {}), ("user-2", {}), ("user-3", {})])
+    # Pruning happens on submit, so submit once more after they finished
+    with mock.patch.object(generation_service, "GenerationService", FakeGenerationService):
+        asyncio.run(_run_jobs(queue, [("user-4", {})]))
+
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[2].id) is not None
+    print("   ✅ Only the newest finished jobs are kept")
+
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_failures_are_reported()
+    test_per_user_limit()
+    test_finished_jobs_are_pruned()
+    print("\n✅ Generation job tests completed!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the dependency-ordered generation stage pipeline (no API calls)
+"""
+
+import asyncio
+
+from app.core.generation.pipeline import StageAbort, StagePipeline
+
+
+def _stage(log, name, delay=0.0, result=None, error=None):
+    async def run(inputs):
+        log.append(("start", name, sorted(inputs)))
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        log.append(("end", name))
+        return result if result is not None else name
+    return run
+
+
+def test_stages_wait_for_dependencies_and_overlap():
+    print("\n🧩 Testing stage ordering...")
+    log = []
+    pipeline = StagePipeline()
+    pipeline.add("items", _stage(log, "items", 0.2, result=["a", "b"]))
+    pipeline.add("style", _stage(log, "style", 0.2))
+    pipeline.add("prompt", _stage(log, "prompt"), depends_on=["items", "style"])
+
+    results = asyncio.run(pipeline.run())
+
+    assert results["items"] == ["a", "b"]
+    # Independent stages start together; the dependent one only after both end
+    assert {entry[1] for entry in log[:2]} == {"items", "style"}
+    assert log.index(("start", "prompt", ["items", "style"])) > log.index(("end", "items"))
+    assert log.index(("start", "prompt", ["items", "style"])) > log.index(("end", "style"))
+    assert pipeline.timings["total"]["duration_ms"] < 350  # 400 if run one after the other
+    assert set(pipeline.timings) == {"items", "style", "prompt", "total"}
+    print(f"   ✅ Ran in {pipeline.timings['total']['duration_ms']}ms with independent stages overlapping")
+
+
+def test_only_runs_requested_stages_and_their_dependencies():
+    print("\n✂️  Testing partial runs...")
+    log = []
+    pipeline = StagePipeline()
+    pipeline.add("items", _stage(log, "items"))
+    pipeline.add("style", _stage(log, "style"))
+    pipeline.add("prompt", _stage(log, "prompt"), depends_on=["items"])
+
+    results = asyncio.run(pipeline.run(only=["prompt"]))
+
+    assert set(results) == {"items", "prompt"}
+    assert ("start", "style", []) not in log
+    print("   ✅ Unneeded stages are skipped")
+
+
+def test_abort_cancels_running_stages():
+    print("\n🛑 Testing abort...")
+    log = []
+    pipeline = StagePipeline()
+    pipeline.add("credits", _stage(log, "credits", error=StageAbort({"success": False, "message": "No credits"})))
+    pipeline.add("items", _stage(log, "items", 1.0))
+    pipeline.add("prompt", _stage(log, "prompt"), depends_on=["items"])
+
+    try:
+        asyncio.run(pipeline.run())
+    except StageAbort as abort:
+        assert abort.result["message"] == "No credits"
+    else:
+        raise AssertionError("Abort was swallowed")
+
+    assert ("end", "items") not in log
+    assert ("start", "prompt", ["items"]) not in log
+    print("   ✅ The first failure cancels the other stages and reaches the caller")
+
+
+def test_unknown_dependency_is_rejected():
+    print("\n❓ Testing graph validation...")
+    try:
+        StagePipeline().add("prompt", _stage([], "prompt"), depends_on=["items"])
+    except ValueError:
+        print("   ✅ Stages must be added after their dependencies")
+        return
+    raise AssertionError("Accepted an unknown dependency")
+
+
+if __name__ == "__main__":
+    test_stages_wait_for_dependencies_and_overlap()
+    test_only_runs_requested_stages_and_their_dependencies()
+    test_abort_cancels_running_stages()
+    test_unknown_dependency_is_rejected()
+    print("\n✅ Generation pipeline tests completed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Server-Sent Events framing of streamed generation (no API calls)
+"""
+
+import json
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import generation
+from app.api.v1.auth import get_current_user_id, get_jwt_token
+
+
+class FakeGenerationService:
+    """Yields canned events; raises part-way if ``fail_after`` is set"""
+
+    closed = False
+
+    def __init__(self, events, fail_after=None):
+        self.events = events
+        self.fail_after = fail_after
+
+    async def stream_newsletter(self, **kwargs):
+        try:
+            for index, event in enumerate(self.events):
+                if index == self.fail_after:
+                    raise RuntimeError("model went away")
+                yield dict(event)
+        finally:
+            FakeGenerationService.closed = True
+
+
+def _client(service):
+    app = FastAPI()
+    app.include_router(generation.router, prefix="/api/v1")
+    app.dependency_overrides[get_current_user_id] = lambda: "user-1"
+    app.dependency_overrides[get_jwt_token] = lambda: "token"
+    patcher = mock.patch.object(generation, "GenerationService", lambda jwt_token: service)
+    patcher.start()
+    return TestClient(app, base_url="http://localhost"), patcher
+
+
+def _parse(body):
+    frames = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        frames.append((lines["event"], json.loads(lines["data"])))
+    return frames
+
+
+EVENTS = [
+    {"event": "start", "items_included": 2},
+    {"event": "token", "text": "Hello\nworld"},
+    {"event": "token", "text": "!"},
+    {"event": "done", "success": True, "draft_id": "d-1"}
+]
+
+
+def test_events_are_framed_in_order():
+    print("\n📡 Testing SSE framing...")
+    client, patcher = _client(FakeGenerationService(EVENTS))
+    try:
+        response = client.post("/api/v1/generation/newsletter/stream", json={})
+    finally:
+        patcher.stop()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text.endswith("\n\n")
+
+    frames = _parse(response.text)
+    assert [name for name, _ in frames] == ["start", "token", "token", "done"]
+    # Newlines in a token stay inside one JSON data line
+    assert frames[1][1] == {"text": "Hello\nworld"}
+    assert frames[3][1]["draft_id"] == "d-1"
+    print(f"   ✅ {len(frames)} events framed as event/data pairs")
+
+
+def test_failure_becomes_error_event():
+    print("\n💥 Testing mid-stream failure...")
+    FakeGenerationService.closed = False
+    client, patcher = _client(FakeGenerationService(EVENTS, fail_after=2))
+    try:
+        response = client.post("/api/v1/generation/newsletter/stream", json={})
+    finally:
+        patcher.stop()
+
+    frames = _parse(response.text)
+    assert [name for name, _ in frames] == ["start", "token", "error"]
+    assert "model went away" in frames[-1][1]["detail"]
+    assert FakeGenerationService.closed
+    print("   ✅ Errors end the stream with an error event and close the generator")
+
+
+if __name__ == "__main__":
+    test_events_are_framed_in_order()
+    test_failure_becomes_error_event()
+    print("\n✅ Generation stream tests completed!")
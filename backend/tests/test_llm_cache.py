@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the LLM completion cache and request coalescing (no API calls)
+"""
+
+import asyncio
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core.generation import service as generation_service
+from app.core.generation.llm_cache import LLMResponseCache, completion_key
+from app.core.generation.service import GenerationService
+
+MESSAGES = [{"role": "user", "content": "Write the newsletter"}]
+
+
+class FakeLLMClient:
+    """Counts calls; each takes ``delay`` seconds and then answers or raises ``error``"""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def chat_completion(self, **kwargs):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content=f"answer {call}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _service(client):
+    service = GenerationService.__new__(GenerationService)
+    service.openai_client = client
+    return service
+
+
+def _complete_together(service, count, bypass_cache=False):
+    async def run():
+        return await asyncio.gather(
+            *(service._chat_completion(MESSAGES, temperature=0.7, max_tokens=100, bypass_cache=bypass_cache)
+              for _ in range(count)),
+            return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+def test_identical_requests_share_one_call():
+    print("\n🤝 Testing request coalescing...")
+    client = FakeLLMClient()
+    cache = LLMResponseCache()
+    with mock.patch.object(generation_service, "llm_cache", cache):
+        results = _complete_together(_service(client), 3)
+        # Afterwards the answer comes from the cache
+        again = _complete_together(_service(client), 1)
+
+    assert results == ["answer 1"] * 3
+    assert again == ["answer 1"]
+    assert client.calls == 1
+    stats = cache.stats()
+    assert stats["coalesced"] == 2 and stats["inflight"] == 0 and stats["hits"] == 1
+    print(f"   ✅ 4 identical requests, {client.calls} provider call")
+
+
+def test_waiters_get_the_leaders_error():
+    print("\n⚠️  Testing coalesced failures...")
+    client = FakeLLMClient(error=RuntimeError("provider down"))
+    cache = LLMResponseCache()
+    with mock.patch.object(generation_service, "llm_cache", cache):
+        results = _complete_together(_service(client), 3)
+
+    assert client.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.stats()["inflight"] == 0 and cache.stats()["stores"] == 0
+    print("   ✅ One failure is shared, not retried by every waiter or cached")
+
+
+def test_bypass_skips_cache_and_coalescing():
+    print("\n🚫 Testing cache bypass...")
+    client = FakeLLMClient()
+    cache = LLMResponseCache()
+    with mock.patch.object(generation_service, "llm_cache", cache):
+        results = _complete_together(_service(client), 2, bypass_cache=True)
+
+    assert client.calls == 2
+    assert sorted(results) == ["answer 1", "answer 2"]
+    assert cache.stats()["bypasses"] == 2
+    print("   ✅ Bypassed requests always call the provider")
+
+
+def test_disk_tier_survives_a_new_cache():
+    print("\n💾 Testing disk tier...")
+    key = completion_key("gpt-4o-mini", MESSAGES, 0.7, 100)
+    # Message order and content are part of the key; dict key order is not
+    assert key == completion_key("gpt-4o-mini", [{"content": "Write the newsletter", "role": "user"}], 0.7, 100)
+    assert key != completion_key("gpt-4o-mini", MESSAGES, 0.2, 100)
+
+    with tempfile.TemporaryDirectory() as disk_dir:
+        LLMResponseCache(disk_dir=disk_dir).set(key, "cached body")
+        fresh = LLMResponseCache(disk_dir=disk_dir)
+        assert fresh.contains(key)
+        assert fresh.get(key) == "cached body"
+        assert fresh.stats()["disk_hits"] == 1
+
+        expired = LLMResponseCache(disk_dir=disk_dir, ttl_seconds=-1)
+        expired.set(key, "stale")
+        assert LLMResponseCache(disk_dir=disk_dir).get(key) is None
+    print("   ✅ Entries persist across instances until they expire")
+
+
+if __name__ == "__main__":
+    test_identical_requests_share_one_call()
+    test_waiters_get_the_leaders_error()
+    test_bypass_skips_cache_and_coalescing()
+    test_disk_tier_survives_a_new_cache()
+    print("\n✅ LLM cache tests completed!")
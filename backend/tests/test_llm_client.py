@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test the rate-limited LLM client: token budget, retries and backoff (no API calls)
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from openai import RateLimitError
+
+from app.core.generation.llm_client import LLMQueueFullError, RateLimitedLLMClient, estimate_tokens
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]
+MAX_TOKENS = 500
+ESTIMATED = estimate_tokens(MESSAGES, MAX_TOKENS)
+
+
+def _rate_limited(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, request=request, headers=headers or {})
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def _usage(total_tokens):
+    return SimpleNamespace(total_tokens=total_tokens, prompt_tokens=total_tokens - 50, completion_tokens=50)
+
+
+class FlakyProvider:
+    """Fails with the given errors first, then returns a response using ``total_tokens``"""
+
+    name = "fake"
+
+    def __init__(self, errors=(), total_tokens=300):
+        self.errors = list(errors)
+        self.total_tokens = total_tokens
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(usage=_usage(self.total_tokens))
+
+
+def _client(provider, **kwargs):
+    options = {"tokens_per_minute": 10000, "requests_per_minute": 100, "base_backoff_seconds": 0.001}
+    return RateLimitedLLMClient(provider, **{**options, **kwargs})
+
+
+def test_retries_refund_their_reservation():
+    print("\n🔁 Testing 429 retries...")
+    provider = FlakyProvider(errors=[_rate_limited(), _rate_limited()])
+    client = _client(provider)
+
+    asyncio.run(client.chat_completion(MESSAGES, max_tokens=MAX_TOKENS))
+
+    assert provider.calls == 3
+    assert client.stats_counters["retries"] == 2
+    # Only the successful call's actual usage is spent, not three estimates
+    client.tokens._refill()
+    assert abs(client.tokens._tokens - (10000 - 300)) < 1
+    assert client.stats_counters["prompt_tokens"] == 250
+    print(f"   ✅ 3 attempts, {10000 - round(client.tokens._tokens)} tokens spent (estimate {ESTIMATED})")
+
+
+def test_gives_up_after_max_retries():
+    print("\n🧱 Testing retry limit...")
+    provider = FlakyProvider(errors=[_rate_limited() for _ in range(5)])
+    client = _client(provider, max_retries=2)
+    try:
+        asyncio.run(client.chat_completion(MESSAGES, max_tokens=MAX_TOKENS))
+    except RateLimitError:
+        pass
+    else:
+        raise AssertionError("Expected the last RateLimitError")
+
+    assert provider.calls == 3
+    client.tokens._refill()
+    assert abs(client.tokens._tokens - 10000) < 1
+    print("   ✅ Raises after max_retries with the whole budget returned")
+
+
+def test_other_errors_are_not_retried():
+    print("\n🙅 Testing non-retryable errors...")
+    provider = FlakyProvider(errors=[ValueError("bad request")])
+    client = _client(provider)
+    try:
+        asyncio.run(client.chat_completion(MESSAGES, max_tokens=MAX_TOKENS))
+    except ValueError:
+        pass
+    assert provider.calls == 1 and client.stats_counters["retries"] == 0
+    print("   ✅ Only 429s, timeouts, connection errors and 5xx are retried")
+
+
+def test_backoff_honours_retry_after():
+    print("\n⏱️  Testing backoff...")
+    client = _client(FlakyProvider(), base_backoff_seconds=1.0, max_backoff_seconds=30.0)
+    for attempt in range(4):
+        assert 0 <= client._backoff(attempt, _rate_limited()) <= 2 ** attempt
+    assert client._backoff(0, _rate_limited({"retry-after": "7"})) >= 7
+    assert client._backoff(0, _rate_limited({"retry-after-ms": "2500"})) >= 2.5
+    # HTTP-date form falls back to our own jittered delay
+    assert client._backoff(0, _rate_limited({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) <= 1
+    print("   ✅ Full jitter, never sooner than Retry-After")
+
+
+def test_stream_usage_settles_the_reservation():
+    print("\n🌊 Testing streamed usage...")
+    client = _client(FlakyProvider())
+    client.tokens._tokens -= ESTIMATED  # What chat_completion reserved for the stream
+
+    summary = client.record_usage(_usage(300), reserved=ESTIMATED)
+
+    client.tokens._refill()
+    assert abs(client.tokens._tokens - (10000 - 300)) < 1
+    assert summary == {"prompt_tokens": 250, "cached_tokens": 0, "completion_tokens": 50}
+    print("   ✅ The final usage chunk refunds the over-estimate")
+
+
+def test_timeout_returns_the_request_slot():
+    print("\n⌛ Testing admission timeout...")
+    client = _client(FlakyProvider(), tokens_per_minute=600, max_wait_seconds=0.05)
+    client.tokens._tokens = 0  # No token budget for the next minute
+    try:
+        asyncio.run(client.chat_completion(MESSAGES, max_tokens=MAX_TOKENS))
+    except LLMQueueFullError:
+        pass
+    else:
+        raise AssertionError("Expected LLMQueueFullError")
+
+    client.requests._refill()
+    assert abs(client.requests._tokens - 100) < 1
+    assert client.stats_counters["rejected"] == 1
+    print("   ✅ Timed-out calls don't keep their request slot")
+
+
+def test_full_queue_rejects_immediately():
+    print("\n🚪 Testing queue bound...")
+    provider = FlakyProvider()
+    client = _client(provider, max_waiters=0)
+    try:
+        asyncio.run(client.chat_completion(MESSAGES, max_tokens=MAX_TOKENS))
+    except LLMQueueFullError:
+        assert provider.calls == 0
+        print("   ✅ Calls beyond max_waiters are refused without waiting")
+        return
+    raise AssertionError("Expected LLMQueueFullError")
+
+
+if __name__ == "__main__":
+    test_retries_refund_their_reservation()
+    test_gives_up_after_max_retries()
+    test_other_errors_are_not_retried()
+    test_backoff_honours_retry_after()
+    test_stream_usage_settles_the_reservation()
+    test_timeout_returns_the_request_slot()
+    test_full_queue_rejects_immediately()
+    print("\n✅ LLM client tests completed!")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test newsletter section parsing and section-parallel stitching (no API calls)
+"""
+
+from app.core.generation.templates import NewsletterTemplate, SECTION_GROUPS, _section_templates
+
+LAYOUTS = _section_templates("2")
+
+
+def _group_output(section_ids):
+    return "\n\n---\n\n".join(LAYOUTS[section_id].strip().rstrip("-").strip() for section_id in section_ids)
+
+
+def test_template_layout_passes_validation():
+    print("\n🧾 Testing section parsing...")
+    content = "\n".join(LAYOUTS.values())
+    validation = NewsletterTemplate.validate_newsletter_structure(content)
+    assert validation["is_valid"], validation["missing_sections"]
+    assert validation["section_count"] == len(NewsletterTemplate.get_standard_sections())
+
+    sections = NewsletterTemplate.parse_newsletter_sections(content)
+    assert sections["trends_to_watch"].startswith("| 🔖 Trend")
+    print("   ✅ Every standard section is recognised by its header")
+
+
+def test_stitch_keeps_order_and_drops_strays():
+    print("\n🧵 Testing section stitching...")
+    parts = [(group["sections"], _group_output(group["sections"])) for group in SECTION_GROUPS]
+    # Writers finish in any order, but parts are stitched in document order;
+    # one writer strays into a section that belongs to another group
+    sections, text = parts[1]
+    parts[1] = (sections, text + "\n\n## 🌐 Trends to Watch\nDuplicate table")
+
+    stitched = NewsletterTemplate.stitch_sections(parts)
+    assert stitched.count("Trends to Watch") == 1
+    assert "Duplicate table" not in stitched
+    assert NewsletterTemplate.validate_newsletter_structure(stitched)["is_valid"]
+
+    order = [section_id for section_id, _ in NewsletterTemplate.split_sections(stitched)]
+    assert order == [section["id"] for section in NewsletterTemplate.get_standard_sections()]
+    print("   ✅ Sections are stitched once each, in template order")
+
+
+if __name__ == "__main__":
+    test_template_layout_passes_validation()
+    test_stitch_keeps_order_and_drops_strays()
+    print("\n✅ Newsletter section tests completed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test keyset cursors and draft list projections (no database calls)
+"""
+
+from app.core.database import (
+    DRAFT_EXPANDABLE_FIELDS, DRAFT_LIST_COLUMNS, decode_cursor, encode_cursor, select_columns
+)
+
+
+def test_cursor_round_trip_and_rejects_tampering():
+    print("\n🔖 Testing keyset cursors...")
+    row = {"id": "3f2b8f4e-9c1d-4e4a-8a57-0d6f1c2b7e90", "created_at": "2025-01-02T07:00:00.123456+00:00"}
+    cursor = encode_cursor(row, "created_at")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (row["created_at"], row["id"])
+    print("   ✅ Cursor decodes back to (created_at, id)")
+
+    forged = encode_cursor({"id": "x),id.gt.(0", "created_at": "2025-01-02"}, "created_at")
+    for bad in ["not-a-cursor", forged, ""]:
+        try:
+            decode_cursor(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Accepted invalid cursor {bad!r}")
+    print("   ✅ Malformed and forged cursors are rejected")
+
+
+def test_projection_expands_only_known_fields():
+    print("\n🪶 Testing draft list projection...")
+    default = select_columns(DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS)
+    assert "body_md" not in default and "generation_metadata" not in default
+
+    expanded = select_columns(DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS, "body_md, email_subject,body_md")
+    assert expanded.count("body_md") == 1
+    assert expanded.endswith("email_subject:generation_metadata->>email_subject")
+
+    try:
+        select_columns(DRAFT_LIST_COLUMNS, DRAFT_EXPANDABLE_FIELDS, "user_id,password")
+    except ValueError:
+        print("   ✅ Heavy fields only on request; unknown fields rejected")
+        return
+    raise AssertionError("Accepted unknown field")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip_and_rejects_tampering()
+    test_projection_expands_only_known_fields()
+    print("\n✅ Pagination tests completed!")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test online trend weight learning (no database required)
+"""
+
+from app.core.trends.service import TREND_WEIGHTS
+from app.core.trends.weights import MIN_WEIGHT, initial_state, learn_from_reaction, normalize_state
+
+AUTHORITATIVE = {"recency": 0.9, "quality": 0.5, "relevance": 0.3, "authority": 0.9, "engagement": 0.5, "coverage": 0.2}
+BUZZWORDY = {"recency": 0.9, "quality": 0.5, "relevance": 0.9, "authority": 0.2, "engagement": 0.5, "coverage": 0.2}
+
+
+def test_feedback_shifts_weights_towards_liked_signals():
+    print("\n🎯 Testing weight updates...")
+    state = initial_state(TREND_WEIGHTS)
+    for _ in range(20):
+        learn_from_reaction(state, [AUTHORITATIVE], liked=True)
+        learn_from_reaction(state, [BUZZWORDY], liked=False)
+
+    weights = state["weights"]
+    assert weights["authority"] > TREND_WEIGHTS["authority"]
+    assert weights["relevance"] < TREND_WEIGHTS["relevance"]
+    assert abs(sum(weights.values()) - 1.0) < 1e-9
+    assert min(weights.values()) > MIN_WEIGHT / 2  # No signal is switched off
+    assert state["updates"] == 40
+    print("   ✅ Liked signals gain weight, weights stay a convex combination")
+
+
+def test_stored_state_is_normalised():
+    print("\n🧹 Testing stored state normalisation...")
+    assert normalize_state(None, TREND_WEIGHTS)["weights"] == TREND_WEIGHTS
+
+    # A state saved before a signal existed picks up its default weight
+    stored = {"weights": {"recency": 0.5, "quality": 0.5}, "bias": 0.4, "updates": 3}
+    state = normalize_state(stored, TREND_WEIGHTS)
+    assert set(state["weights"]) == set(TREND_WEIGHTS)
+    assert abs(sum(state["weights"].values()) - 1.0) < 1e-9
+    print("   ✅ Stored states are completed and renormalised")
+
+
+if __name__ == "__main__":
+    test_feedback_shifts_weights_towards_liked_signals()
+    test_stored_state_is_normalised()
+    print("\n✅ Trend weight tests completed!")
@@ -48,7 +48,8 @@ export default function Dashboard() {
   const { data: recentDrafts } = useQuery({
     queryKey: ['recent-drafts'],
     queryFn: async () => {
-      return await apiService.getDrafts()
+      // List rows stay small; the preview loads the body when opened
+      return await apiService.getDrafts('email_subject')
     }
   })
 
@@ -366,9 +367,14 @@ function NewsletterPreviewModal({
   draft: any
   onClose: () => void
 }) {
+  const { data: fullDraft, isLoading: bodyLoading } = useQuery({
+    queryKey: ['draft', draft.id],
+    queryFn: () => apiService.getDraft(draft.id)
+  })
+  const body: string = fullDraft?.body_md || ''
 
   // Calculate reading time
-  const wordCount = draft.body_md.split(/\s+/).length
+  const wordCount = body.split(/\s+/).length
   const readingTime = Math.ceil(wordCount / 200)
 
   return (
@@ -430,7 +436,7 @@ function NewsletterPreviewModal({
           </div>
           
           {/* Email Subject Preview */}
-          {draft.generation_metadata?.email_subject && (
+          {draft.email_subject && (
             <div className="mx-8 -mt-4 mb-8">
               <div className="bg-white rounded-xl shadow-lg border border-slate-200 p-4">
                 <div className="flex items-center gap-3 mb-2">
@@ -439,18 +445,22 @@ function NewsletterPreviewModal({
                   </div>
                   <span className="text-sm font-semibold text-slate-700 uppercase tracking-wide">Email Subject</span>
                 </div>
-                <p className="text-slate-800 font-medium text-lg">{draft.generation_metadata.email_subject}</p>
+                <p className="text-slate-800 font-medium text-lg">{draft.email_subject}</p>
               </div>
             </div>
           )}
           
           {/* Newsletter Content using unified component */}
           <div className="px-8 pb-8">
-            <NewsletterRenderer 
-              content={draft.body_md} 
-              variant="preview"
-              className="bg-transparent shadow-none border-none p-0"
-            />
+            {bodyLoading ? (
+              <p className="text-center text-slate-500 py-12">Loading newsletter...</p>
+            ) : (
+              <NewsletterRenderer 
+                content={body} 
+                variant="preview"
+                className="bg-transparent shadow-none border-none p-0"
+              />
+            )}
           </div>
         </div>
       </div>
@@ -23,7 +23,7 @@ import NewsletterRenderer from '../components/NewsletterRenderer'
 interface Draft {
   id: string
   title: string
-  body_md: string
+  email_subject?: string
   status: 'draft' | 'sent' | 'published'
   created_at: string
   sent_at?: string
@@ -31,9 +31,6 @@ interface Draft {
     reaction: '👍' | '👎'
     created_at: string
   } | null
-  generation_metadata?: {
-    email_subject?: string
-  }
 }
 
 export default function Drafts() {
@@ -60,7 +57,8 @@ export default function Drafts() {
     queryKey: ['drafts'],
     queryFn: async () => {
       try {
-        const apiDrafts = await apiService.getDrafts()
+        // List rows stay small; the preview loads the body when opened
+        const apiDrafts = await apiService.getDrafts('email_subject')
         
         // Fetch feedback for each draft
         const draftsWithFeedback = await Promise.all(
@@ -73,7 +71,7 @@ export default function Drafts() {
               return {
                 id: draft.id,
                 title: draft.title || 'Untitled Newsletter',
-                body_md: draft.body_md || '',
+                email_subject: draft.email_subject,
                 status: draft.status || 'draft',
                 created_at: draft.created_at,
                 updated_at: draft.updated_at,
@@ -88,7 +86,7 @@ export default function Drafts() {
               return {
                 id: draft.id,
                 title: draft.title || 'Untitled Newsletter',
-                body_md: draft.body_md || '',
+                email_subject: draft.email_subject,
                 status: draft.status || 'draft',
                 created_at: draft.created_at,
                 updated_at: draft.updated_at,
@@ -575,8 +573,14 @@ function NewsletterPreviewModal({
   onSend: (id: string) => void
   isSending: boolean
 }) {
+  const { data: fullDraft, isLoading: bodyLoading } = useQuery({
+    queryKey: ['draft', draft.id],
+    queryFn: () => apiService.getDraft(draft.id)
+  })
+  const body: string = fullDraft?.body_md || ''
+
   // Calculate reading time
-  const wordCount = draft.body_md.split(/\s+/).length
+  const wordCount = body.split(/\s+/).length
   const readingTime = Math.ceil(wordCount / 200)
 
   return (
@@ -611,13 +615,13 @@ function NewsletterPreviewModal({
         {/* Content */}
         <div className="flex-1 overflow-y-auto p-6 bg-white">
           {/* Email Subject Preview */}
-          {draft.generation_metadata?.email_subject && (
+          {draft.email_subject && (
             <div className="mb-4 p-3 bg-slate-50 rounded-md border border-slate-200">
               <div className="flex items-center gap-2 mb-1">
                 <EnvelopeIcon className="h-4 w-4 text-slate-500" />
                 <span className="text-xs font-medium text-slate-600 uppercase tracking-wide">Email Subject</span>
               </div>
-              <p className="text-slate-800 text-sm font-medium">{draft.generation_metadata.email_subject}</p>
+              <p className="text-slate-800 text-sm font-medium">{draft.email_subject}</p>
             </div>
           )}
           
@@ -644,11 +648,15 @@ function NewsletterPreviewModal({
           </div>
 
           {/* Newsletter Content using unified component */}
-          <NewsletterRenderer 
-            content={draft.body_md} 
-            variant="draft"
-            className="bg-transparent shadow-none border-none p-0"
-          />
+          {bodyLoading ? (
+            <p className="text-center text-slate-500 py-12">Loading newsletter...</p>
+          ) : (
+            <NewsletterRenderer 
+              content={body} 
+              variant="draft"
+              className="bg-transparent shadow-none border-none p-0"
+            />
+          )}
 
         </div>
       </div>
@@ -73,6 +73,7 @@ export const endpoints = {
   // Generation
   generateNewsletter: '/generation/newsletter',
   getDrafts: '/generation/drafts',
+  getDraft: (draftId: string) => `/generation/drafts/${draftId}`,
   deleteDraft: (draftId: string) => `/generation/drafts/${draftId}`,
   
   // Delivery
@@ -182,8 +183,17 @@ export const apiService = {
     return response.data
   },
 
-  async getDrafts() {
-    const response = await api.get(endpoints.getDrafts)
+  // Rows carry id, title, status and dates; `fields` adds e.g. 'body_md,email_subject'
+  async getDrafts(fields?: string) {
+    const response = await api.get(endpoints.getDrafts, {
+      params: fields ? { fields } : undefined
+    })
+    return response.data
+  },
+
+  // Full draft, including body_md
+  async getDraft(draftId: string) {
+    const response = await api.get(endpoints.getDraft(draftId))
     return response.data
   },
 